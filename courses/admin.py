@@ -3,5 +3,6 @@ from .models import Course
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
-    list_display = ('title', 'link')
-    search_fields = ('title',)
\ No newline at end of file
+    list_display = ('title', 'link', 'slug')
+    search_fields = ('title', 'slug')
+    readonly_fields = ('slug',)
\ No newline at end of file
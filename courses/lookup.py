@@ -0,0 +1,44 @@
+"""
+Read-through cache for resolving course_detail slugs.
+
+Hits cache the Course instance itself; misses cache a sentinel for a
+shorter time so bots hammering non-existent URLs do not reach the
+database either. Entries are dropped by the signals in courses.signals.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Course, normalize_slug
+
+CACHE_TIMEOUT = getattr(settings, 'COURSE_SLUG_CACHE_TIMEOUT', 60 * 60)
+MISSING_TIMEOUT = getattr(settings, 'COURSE_SLUG_MISSING_TIMEOUT', 5 * 60)
+MISSING = 'missing'
+
+
+def cache_key(slug):
+    return 'course_slug:' + hashlib.md5(slug.encode('utf-8')).hexdigest()
+
+
+def get_course_by_slug(value):
+    """Return the Course for a URL segment, or None if there is none."""
+    slug = normalize_slug(value)
+    key = cache_key(slug)
+    course = cache.get(key)
+    if course == MISSING:
+        return None
+    if course is not None:
+        return course
+
+    course = Course.objects.filter(slug=slug).first()
+    if course is None:
+        cache.set(key, MISSING, MISSING_TIMEOUT)
+    else:
+        cache.set(key, course, CACHE_TIMEOUT)
+    return course
+
+
+def invalidate(*slugs):
+    cache.delete_many([cache_key(slug) for slug in slugs if slug])
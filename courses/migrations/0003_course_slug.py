@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+def normalize_slug(value):
+    return value.strip().lower().replace(' ', '-').replace('/', '')
+
+
+def populate_slugs(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    used = set()
+    for course in Course.objects.order_by('pk'):
+        base = normalize_slug(course.link or course.title)[:190] or 'course'
+        slug = base
+        n = 2
+        while slug in used:
+            slug = f'{base}-{n}'
+            n += 1
+        used.add(slug)
+        course.slug = slug
+        course.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_alter_course_link'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, editable=False, max_length=200, null=True),
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='course',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, editable=False, max_length=200, unique=True),
+        ),
+    ]
@@ -1,9 +1,35 @@
 from django.db import models
 
+
+def normalize_slug(value):
+    """Normalise a course link or URL segment the same way course_detail always has."""
+    return value.strip().lower().replace(' ', '-').replace('/', '')
+
+
 class Course(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     link = models.CharField(max_length=200, blank=True)
+    slug = models.SlugField(max_length=200, unique=True, editable=False, allow_unicode=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+    def save(self, *args, update_fields=None, **kwargs):
+        slug = self.unique_slug()
+        if update_fields is not None and slug != self.slug:
+            # e.g. save(update_fields=['title']) must store the new slug too
+            update_fields = {*update_fields, 'slug'}
+        self.slug = slug
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def unique_slug(self):
+        base = normalize_slug(self.link or self.title)[:190] or 'course'
+        slug = base
+        others = Course.objects.exclude(pk=self.pk)
+        n = 2
+        while others.filter(slug=slug).exists():
+            slug = f'{base}-{n}'
+            n += 1
+        return slug
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .lookup import invalidate
+from .models import Course
+
+
+@receiver(pre_save, sender=Course)
+def remember_old_slug(sender, instance, **kwargs):
+    # Keep the previous slug so a renamed course stops resolving under it
+    if instance.pk:
+        instance._old_slug = Course.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Course)
+def invalidate_on_save(sender, instance, **kwargs):
+    invalidate(instance.slug, getattr(instance, '_old_slug', None))
+
+
+@receiver(post_delete, sender=Course)
+def invalidate_on_delete(sender, instance, **kwargs):
+    invalidate(instance.slug)
@@ -0,0 +1,301 @@
+"""
+SQLite-backed cache shared by every worker process on one host.
+
+LocMemCache gives each gunicorn worker its own copy of the cache, so
+entries are warmed once per worker and invalidations made by one worker
+are invisible to the others. This backend keeps entries in a single
+SQLite file in WAL mode, which lets any number of processes read
+concurrently while writes are serialised by SQLite itself.
+
+Settings::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'dictchannel.cache.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache.sqlite3',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 10000, 'CULL_FREQUENCY': 3},
+        }
+    }
+
+Eviction is approximately least-recently-used: reads refresh an entry's
+access time at most once every ``TOUCH_INTERVAL`` seconds so cache hits
+stay read-only in the common case, and that refresh is skipped rather
+than waited for when a writer holds the lock. The entry count is checked
+against ``MAX_ENTRIES`` on a random ``CULL_PROBABILITY`` share of writes,
+so the cache can briefly run over it. Integers that fit in SQLite's
+64-bit column are stored natively so ``incr``/``decr`` are single atomic
+UPDATE statements; a result outside that range raises ``ValueError``.
+
+Entries can be grouped under tags with ``set(..., tags=[...])`` and dropped
+together with ``delete_tags``. Tags are specific to this backend; the
+page cache instead versions its tag keys (see ``pages.page_cache``) so it
+works on any backend and invalidates with a single write.
+"""
+
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS cache_entry (
+        key TEXT PRIMARY KEY,
+        value BLOB,
+        expires REAL,
+        accessed REAL NOT NULL
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS cache_entry_accessed ON cache_entry (accessed)",
+    "CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires)",
+    """CREATE TABLE IF NOT EXISTS cache_tag (
+        tag TEXT NOT NULL,
+        key TEXT NOT NULL,
+        PRIMARY KEY (tag, key)
+    ) WITHOUT ROWID""",
+]
+# SQLite INTEGER range; other ints are pickled
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class SQLiteCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        options = params.get('OPTIONS', {})
+        self._touch_interval = options.get('TOUCH_INTERVAL', 30)
+        self._mmap_size = options.get('MMAP_SIZE', 64 * 1024 * 1024)
+        self._busy_timeout = options.get('BUSY_TIMEOUT', 5)
+        self._cull_probability = options.get('CULL_PROBABILITY', 0.02)
+        self._local = threading.local()
+
+    # Connection handling
+
+    @property
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        # A connection must not be shared with a forked child process
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self._path, timeout=self._busy_timeout, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(f'PRAGMA mmap_size={int(self._mmap_size)}')
+            for statement in SCHEMA:
+                db.execute(statement)
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _write(self):
+        return _Transaction(self._db)
+
+    # Value encoding: ints are stored natively so incr can run in SQL
+
+    def _encode(self, value):
+        if type(value) is int and INT_MIN <= value <= INT_MAX:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _decode(self, value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    # Cache API
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, tags=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        with self._write() as db:
+            db.execute('DELETE FROM cache_entry WHERE key = ? AND expires <= ?', (key, now))
+            added = db.execute(
+                'INSERT OR IGNORE INTO cache_entry (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                (key, self._encode(value), self.get_backend_timeout(timeout), now),
+            ).rowcount == 1
+            if added:
+                self._tag(db, key, tags)
+                self._cull(db)
+        return added
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        row = self._db.execute(
+            'SELECT value, accessed FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, now),
+        ).fetchone()
+        if row is None:
+            return default
+        if now - row[1] > self._touch_interval:
+            self._touch_accessed(key, now)
+        return self._decode(row[0])
+
+    def _touch_accessed(self, key, now):
+        # Best effort: a read neither waits for nor fails on a busy writer
+        db = self._db
+        db.execute('PRAGMA busy_timeout = 0')
+        try:
+            db.execute('UPDATE cache_entry SET accessed = ? WHERE key = ?', (now, key))
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            db.execute(f'PRAGMA busy_timeout = {int(self._busy_timeout * 1000)}')
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, tags=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write() as db:
+            self._set(db, key, value, timeout, tags)
+            self._cull(db)
+
+    def _set(self, db, key, value, timeout, tags):
+        db.execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+            (key, self._encode(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        self._tag(db, key, tags)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        with self._write() as db:
+            return db.execute(
+                'UPDATE cache_entry SET expires = ?, accessed = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), now, key, now),
+            ).rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write() as db:
+            db.execute('DELETE FROM cache_tag WHERE key = ?', (key,))
+            return db.execute('DELETE FROM cache_entry WHERE key = ?', (key,)).rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._db.execute(
+            'SELECT 1 FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        if not INT_MIN <= delta <= INT_MAX:
+            raise ValueError(f'incr delta {delta} is outside the 64-bit integer range.')
+        now = time.time()
+        with self._write() as db:
+            # SQLite turns an overflowing integer sum into a REAL; leave the row alone then
+            rows = db.execute(
+                'UPDATE cache_entry SET value = value + ?, accessed = ? '
+                "WHERE key = ? AND (expires IS NULL OR expires > ?) AND typeof(value) = 'integer' "
+                "AND typeof(value + ?) = 'integer' "
+                'RETURNING value',
+                (delta, now, key, now, delta),
+            ).fetchall()
+            if not rows:
+                row = db.execute(
+                    'SELECT typeof(value) FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                    (key, now),
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Key '{key}' not found.")
+                if row[0] == 'integer':
+                    raise ValueError(f"Incrementing key '{key}' by {delta} leaves the 64-bit integer range.")
+                raise TypeError(f"Key '{key}' does not hold an integer.")
+        return rows[0][0]
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not key_map:
+            return {}
+        placeholders = ','.join('?' * len(key_map))
+        rows = self._db.execute(
+            f'SELECT key, value FROM cache_entry WHERE key IN ({placeholders}) AND (expires IS NULL OR expires > ?)',
+            (*key_map, time.time()),
+        ).fetchall()
+        return {key_map[key]: self._decode(value) for key, value in rows}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, tags=None):
+        with self._write() as db:
+            for key, value in data.items():
+                key = self.make_and_validate_key(key, version=version)
+                self._set(db, key, value, timeout, tags)
+            self._cull(db)
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if not keys:
+            return
+        placeholders = ','.join('?' * len(keys))
+        with self._write() as db:
+            db.execute(f'DELETE FROM cache_tag WHERE key IN ({placeholders})', keys)
+            db.execute(f'DELETE FROM cache_entry WHERE key IN ({placeholders})', keys)
+
+    def clear(self):
+        with self._write() as db:
+            db.execute('DELETE FROM cache_tag')
+            db.execute('DELETE FROM cache_entry')
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests
+        pass
+
+    # Tags
+
+    def _tag(self, db, key, tags):
+        if tags:
+            db.executemany('INSERT OR IGNORE INTO cache_tag (tag, key) VALUES (?, ?)', [(tag, key) for tag in tags])
+
+    def delete_tags(self, *tags):
+        """Delete every entry stored under any of ``tags``. Returns the number removed."""
+        if not tags:
+            return 0
+        placeholders = ','.join('?' * len(tags))
+        with self._write() as db:
+            removed = db.execute(
+                f'DELETE FROM cache_entry WHERE key IN (SELECT key FROM cache_tag WHERE tag IN ({placeholders}))',
+                tags,
+            ).rowcount
+            db.execute(f'DELETE FROM cache_tag WHERE tag IN ({placeholders})', tags)
+        return removed
+
+    # Eviction
+
+    def _cull(self, db):
+        # Counting scans the table, so only a share of writes check the size
+        if random.random() >= self._cull_probability:
+            return
+        count = db.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        now = time.time()
+        db.execute('DELETE FROM cache_entry WHERE expires <= ?', (now,))
+        count = db.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        if count > self._max_entries:
+            if self._cull_frequency == 0:
+                db.execute('DELETE FROM cache_entry')
+            else:
+                db.execute(
+                    'DELETE FROM cache_entry WHERE key IN '
+                    '(SELECT key FROM cache_entry ORDER BY accessed LIMIT ?)',
+                    (count // self._cull_frequency,),
+                )
+        db.execute('DELETE FROM cache_tag WHERE key NOT IN (SELECT key FROM cache_entry)')
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT so writers queue on SQLite's lock instead of failing mid-way."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
@@ -0,0 +1,38 @@
+"""
+WhiteNoise middleware that can run in an async middleware chain.
+
+WhiteNoiseMiddleware is sync-only, and a single sync-only middleware makes
+Django run the whole request under ASGI in a worker thread, async views
+included. This subclass declares itself async-capable: under ASGI it looks
+the path up in the in-memory file table and only hops to a thread to serve
+an actual static file; every other request goes straight on to the async
+handler. Under WSGI it behaves exactly like WhiteNoiseMiddleware.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -39,7 +39,9 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     'compressor',
+    'django_crontab',
     'pages',
     'courses',
     'testimonials',
@@ -99,11 +101,16 @@ AUTH_USER_MODEL = 'pages.Student'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Static files are answered here, before GZipMiddleware, from the
+    # gzip/brotli copies built at collectstatic (async-capable for ASGI)
+    'dictchannel.middleware.AsyncWhiteNoiseMiddleware',
+    'pages.query_budget.QueryBudgetMiddleware',
     'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # AuthenticationMiddleware that keeps the loaded user in the cache
+    'pages.user_cache.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -136,9 +143,22 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections (and their page cache) across requests
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a writer waits for the lock before "database is locked"
+            'timeout': 20,
+            # Transactions take the write lock up front, so concurrent writers
+            # queue on the busy timeout instead of failing on lock upgrade
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Every new SQLite connection gets dictchannel.db.DEFAULT_PRAGMAS; set
+# SQLITE_PRAGMAS to a dict of pragma -> value to replace them
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -158,6 +178,21 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (see pages.hashers). The first hasher is used for new and
+# upgraded hashes; the others still verify older ones. Time the costs on the
+# host with `manage.py benchmark_hashers`; a changed hasher or cost is applied
+# to each stored hash on its next successful login.
+PASSWORD_HASHERS = [
+    'pages.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'pages.hashers.TunedArgon2PasswordHasher',
+    'pages.hashers.TunedBCryptSHA256PasswordHasher',
+    'pages.hashers.TunedScryptPasswordHasher',
+]
+PASSWORD_HASHER_COSTS = {
+    'pbkdf2_sha256': 1_000_000,
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -181,10 +216,29 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Hashed, precompressed static files served by WhiteNoise with immutable
+# cache headers; collectstatic also writes WebP/resized variants of static/img
+# (see dictchannel/storage.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'dictchannel.storage.OptimizedStaticFilesStorage'},
+    # Uploads stored once per distinct content, see pages/blobs.py
+    'blobs': {'BACKEND': 'dictchannel.storage.ContentAddressedStorage'},
+}
+# Manifest-hashed files, compressor bundles and image variants all carry a
+# 12-character content hash, so they can be cached forever
+WHITENOISE_IMMUTABLE_FILE_TEST = r'\.[0-9a-f]{12}\.\w+$'
+STATIC_IMAGE_PREFIXES = ['img/']
+STATIC_IMAGE_WIDTHS = [480, 768, 1200, 1920]
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Static copies of the public pages written by the prerender command,
+# for the front proxy to serve without reaching Django
+PRERENDER_ROOT = BASE_DIR / 'prerendered'
+
 
 # for production
 # MEDIA_URL = '/media/'
@@ -201,16 +255,70 @@ MEDIA_ROOT = BASE_DIR / 'media'
     
 # ]
 
-# STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Caching configuration
+# One SQLite file shared by every worker on the host, see dictchannel/cache.py
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'dictchannel.cache.SQLiteCache',
+        'LOCATION': BASE_DIR / 'cache.sqlite3',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 3,
+        },
     }
 }
 
+# To share the cache across hosts, point it at a Redis-protocol server instead
+# (requires the redis package; `manage.py redis_standin` runs a local stand-in)
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#         'LOCATION': 'redis://127.0.0.1:6379',
+#     }
+# }
+
+# Query accounting (pages.query_budget); on by default only in development.
+# dictchannel/test_settings.py turns on QUERY_BUDGET_STRICT, so an exceeded
+# budget fails the test suite (pages/tests/test_query_budget.py).
+QUERY_BUDGET_ENABLED = DEBUG
+QUERY_BUDGET_STRICT = False
+QUERY_N_PLUS_ONE_THRESHOLD = 5
+QUERY_BUDGETS = {
+    'home': 3,
+    'services': 1,
+    'courses': 1,
+    'course_detail': 1,
+    'events': 1,
+    'team': 1,
+    'testimonial': 1,
+    'student_dashboard': 4,
+}
+
+# Sessions are read from the cache and written through to the database;
+# flash messages travel in a signed cookie so redirects don't write the session
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+# How long a logged-in user stays cached (see pages.user_cache). Entries are
+# evicted when a Student is saved or deleted; a QuerySet.update() or raw SQL
+# (e.g. setting is_active=False) leaves the cached user logged in until this
+# runs out, so change accounts through save() or lower it.
+USER_CACHE_TIMEOUT = 60 * 15
+
+# Login and form POSTs are throttled per IP and per email (see pages.throttle);
+# THROTTLE_RATES overrides the per-scope limits there
+THROTTLE_CLIENT_IP_META = 'REMOTE_ADDR'
+# Behind N proxies that append to it, use 'HTTP_X_FORWARDED_FOR' above and
+# THROTTLE_TRUSTED_PROXIES = N; the client-supplied entries are ignored
+
+# Full-page cache for the public pages (see pages.page_cache)
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+# Seconds a proxy or CDN may reuse a public page (Cache-Control s-maxage)
+PAGE_CACHE_SHARED_MAX_AGE = 60 * 5
+
+# Domain the sitemaps build their URLs on, instead of the request's Host header
+SITE_DOMAIN = 'dictchannels.com'
+
 # Django Compressor settings
 COMPRESS_ENABLED = True
 COMPRESS_CSS_FILTERS = [
@@ -220,9 +328,12 @@ COMPRESS_CSS_FILTERS = [
 COMPRESS_JS_FILTERS = [
     'compressor.filters.jsmin.JSMinFilter',
 ]
-COMPRESS_STORAGE = 'compressor.storage.GzipCompressorFileStorage'
+COMPRESS_STORAGE = 'dictchannel.storage.PrecompressedCompressorFileStorage'
 COMPRESS_URL = STATIC_URL
 COMPRESS_OFFLINE = True
+# Body elements treated as above the fold by build_critical_css, which
+# runs after compress and inlines each page template's critical CSS
+CRITICAL_CSS_FOLD_ELEMENTS = 250
 
 # Cache settings for static files
 STATIC_URL = '/static/'
@@ -265,4 +376,26 @@ EMAIL_USE_TLS=False
 EMAIL_HOST_USER='info@kennylass.com.ng'
 EMAIL_HOST_PASSWORD='CeroW4xDByI%'
 DEFAULT_FROM_EMAIL='D-ICT Channels <info@kennylass.com.ng>'
-ADMIN_EMAIL = 'carksonniit@gmail.com'
\ No newline at end of file
+ADMIN_EMAIL = 'carksonniit@gmail.com'
+
+# Outbox delivery: form views queue emails, the send_outbox command drains them
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_BACKOFF_SECONDS = 60
+OUTBOX_BATCH_SIZE = 50
+# Seconds a claimed email stays reserved for its worker before another may retry it
+OUTBOX_LEASE_SECONDS = 60 * 10
+
+CRONJOBS = [
+    ('* * * * *', 'django.core.management.call_command', ['send_outbox']),
+    ('*/10 * * * *', 'django.core.management.call_command', ['build_image_variants']),
+    ('30 3 * * *', 'django.core.management.call_command', ['gc_media']),
+]
+
+# Student IDs and certificate numbers reserved per worker in one round trip
+SEQUENCE_BLOCK_SIZE = 20
+
+# Widths of the WebP/JPEG derivatives built for team and testimonial photos
+IMAGE_VARIANT_WIDTHS = [160, 320, 480, 640, 960]
+
+# Unreferenced media blobs younger than this survive gc_media
+MEDIA_GC_GRACE_SECONDS = 60 * 60 * 24
@@ -0,0 +1,214 @@
+"""
+Storage backends.
+
+OptimizedStaticFilesStorage is WhiteNoise's compressed manifest storage
+(hashed file names, gzip and brotli copies built once at collectstatic)
+that also builds optimised image variants. PrecompressedCompressorFileStorage
+gives django-compressor's offline bundles the same gzip and brotli copies.
+
+For every JPEG or PNG under ``STATIC_IMAGE_PREFIXES`` the post-processing
+step writes recompressed, EXIF-free copies at each of
+``STATIC_IMAGE_WIDTHS`` (never upscaling) in both WebP and the source's
+own format, under ``<prefix>variants/``. The files are named after the
+source's content hash and listed in ``img-variants.json`` in
+``STATIC_ROOT``, which ``{% responsive_static %}`` reads to emit
+``<picture>`` markup.
+
+Images whose content hash matches the existing manifest are skipped, so
+repeated collectstatic runs only pay for images that actually changed.
+
+ContentAddressedStorage stores uploads as ``<upload_to>/<aa>/<sha256>.<ext>``,
+so identical uploads share one file. Each blob has a ``pages.MediaBlob``
+row whose reference count is kept by signals (see ``pages.blobs``); the
+``gc_media`` command recounts references and deletes unreferenced blobs.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+from functools import lru_cache
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, storages
+from django.utils import timezone
+from compressor.storage import CompressorFileStorage
+from PIL import Image, ImageOps
+from whitenoise.compress import Compressor
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+IMAGE_MANIFEST_NAME = 'img-variants.json'
+IMAGE_MANIFEST_VERSION = 1
+IMAGE_EXTENSIONS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG'}
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == 'JPEG':
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=getattr(settings, 'STATIC_IMAGE_JPEG_QUALITY', 80),
+                   optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        image.save(buffer, 'WEBP', quality=getattr(settings, 'STATIC_IMAGE_WEBP_QUALITY', 75), method=4)
+    return buffer.getvalue()
+
+
+class ImageVariantsMixin:
+    image_manifest_name = IMAGE_MANIFEST_NAME
+
+    def load_image_manifest(self):
+        try:
+            with self.open(self.image_manifest_name) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if manifest.get('version') != IMAGE_MANIFEST_VERSION:
+            return {}
+        return manifest.get('images', {})
+
+    def save_image_manifest(self, images):
+        content = json.dumps({'version': IMAGE_MANIFEST_VERSION, 'images': images}, indent=1, sort_keys=True)
+        if self.exists(self.image_manifest_name):
+            self.delete(self.image_manifest_name)
+        self._save(self.image_manifest_name, ContentFile(content.encode()))
+        image_manifest.cache_clear()
+
+    def is_variant_source(self, path):
+        prefixes = getattr(settings, 'STATIC_IMAGE_PREFIXES', ['img/'])
+        return (
+            path.startswith(tuple(prefixes))
+            and '/variants/' not in path
+            and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+        )
+
+    def build_image_variants(self, path, content, digest):
+        image = Image.open(BytesIO(content))
+        image.load()
+        image = ImageOps.exif_transpose(image)
+        image.info = {}
+
+        fmt = IMAGE_EXTENSIONS[os.path.splitext(path)[1].lower()]
+        if fmt == 'PNG' and 'A' not in image.getbands():
+            fmt = 'JPEG'  # Opaque PNG photos are much smaller as JPEG
+        ext = 'jpg' if fmt == 'JPEG' else 'png'
+
+        widths = getattr(settings, 'STATIC_IMAGE_WIDTHS', [480, 768, 1200, 1920])
+        directory, filename = posixpath.split(path)
+        stem = os.path.splitext(filename)[0]
+        entry = {
+            'hash': digest,
+            'width': image.width,
+            'height': image.height,
+            'type': f'image/{"jpeg" if fmt == "JPEG" else "png"}',
+            'webp': {},
+            'fallback': {},
+        }
+        for width in sorted({w for w in widths if w < image.width} | {min(image.width, max(widths))}):
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            for kind, kind_fmt, kind_ext in (('webp', 'WEBP', 'webp'), ('fallback', fmt, ext)):
+                name = posixpath.join(directory, 'variants', f'{stem}-{width}.{digest[:12]}.{kind_ext}')
+                if not self.exists(name):
+                    self._save(name, ContentFile(_encode(resized, kind_fmt)))
+                entry[kind][str(width)] = name
+        return entry
+
+    def variant_files(self, entry):
+        return set(entry.get('webp', {}).values()) | set(entry.get('fallback', {}).values())
+
+    def post_process(self, paths, dry_run=False, **options):
+        parent = getattr(super(), 'post_process', None)
+        if parent is not None:
+            yield from parent(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        previous = self.load_image_manifest()
+        images = {}
+        for path, (storage, source_path) in paths.items():
+            if not self.is_variant_source(path):
+                continue
+            with storage.open(source_path) as f:
+                content = f.read()
+            digest = hashlib.sha256(content).hexdigest()
+            entry = previous.get(path)
+            if entry and entry['hash'] == digest and all(self.exists(n) for n in self.variant_files(entry)):
+                images[path] = entry
+                continue
+            try:
+                images[path] = self.build_image_variants(path, content, digest)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                yield path, None, e
+                continue
+            yield path, path, True
+
+        # Variants of images that changed or disappeared are no longer referenced
+        current = set().union(*(self.variant_files(e) for e in images.values()))
+        for entry in previous.values():
+            for name in self.variant_files(entry) - current:
+                if self.exists(name):
+                    self.delete(name)
+        self.save_image_manifest(images)
+
+
+class OptimizedStaticFilesStorage(ImageVariantsMixin, CompressedManifestStaticFilesStorage):
+    # Variants are named by content hash and listed in their own manifest
+    manifest_strict = False
+
+
+class PrecompressedCompressorFileStorage(CompressorFileStorage):
+    """Write ``.gz`` and ``.br`` copies of each offline bundle for WhiteNoise to serve."""
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        compressor = Compressor(quiet=True)
+        if compressor.should_compress(name):
+            compressor.compress(self.path(name))
+        return name
+
+
+@lru_cache(maxsize=None)
+def image_manifest():
+    """The variant manifest of the configured static storage, loaded once per process."""
+    loader = getattr(staticfiles_storage, 'load_image_manifest', None)
+    return loader() if loader else {}
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def blob_name(self, name, digest):
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+    def _save(self, name, content):
+        sha = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks():
+            sha.update(chunk)
+            size += len(chunk)
+        name = self.blob_name(name, sha.hexdigest())
+
+        if not self.exists(name):
+            stored = super()._save(name, content)
+            if stored != name:
+                # Another upload of the same content won the race
+                super().delete(stored)
+
+        MediaBlob = apps.get_model('pages', 'MediaBlob')
+        blob, created = MediaBlob.objects.get_or_create(name=name, defaults={'size': size})
+        if not created:
+            # Keep a reused blob out of the garbage collector's grace window
+            MediaBlob.objects.filter(pk=blob.pk).update(uploaded_at=timezone.now())
+        return name
+
+
+def blob_storage():
+    return storages['blobs']
@@ -0,0 +1,43 @@
+"""
+Settings for the test suite; `manage.py test` picks them up by default.
+
+Query budgets are enforced, so a view that runs more queries than
+``QUERY_BUDGETS`` allows fails its test instead of logging a warning.
+"""
+
+import tempfile
+from pathlib import Path
+
+from .settings import *  # noqa: F401,F403
+
+# Exceeded budgets raise QueryBudgetExceeded
+QUERY_BUDGET_ENABLED = True
+QUERY_BUDGET_STRICT = True
+
+# Keep the suite away from the development cache file
+CACHES = {
+    'default': {
+        'BACKEND': 'dictchannel.cache.SQLiteCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'dictchannel-test-cache.sqlite3',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 3,
+        },
+    }
+}
+
+# Templates render without the offline compress manifest or collectstatic
+COMPRESS_ENABLED = False
+COMPRESS_OFFLINE = False
+STORAGES = {
+    **STORAGES,  # noqa: F405
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+MEDIA_ROOT = Path(tempfile.gettempdir()) / 'dictchannel-test-media'
+STATIC_ROOT = Path(tempfile.gettempdir()) / 'dictchannel-test-static'
+# WhiteNoise warns about a STATIC_ROOT that does not exist
+STATIC_ROOT.mkdir(exist_ok=True)
+
+# Hashing at the production cost would dominate the run time
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -18,12 +18,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
+
+from pages import sitemaps
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('pages.urls')),
-    path('sitemap.xml', serve, {'document_root': settings.BASE_DIR, 'path': 'sitemap.xml'}),
+    path('sitemap.xml', sitemaps.index, {'sitemap_url_name': 'sitemap_section'}, name='sitemap_index'),
+    path('sitemap-<section>.xml', sitemaps.section, name='sitemap_section'),
 ]
 
 # Serve media and static files during development
@@ -4,6 +4,7 @@ class Event(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     link = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dictchannel.settings')
+    # The test suite runs with its own settings (query budgets enforced)
+    default = 'dictchannel.test_settings' if sys.argv[1:2] == ['test'] else 'dictchannel.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -3,8 +3,13 @@ from django.contrib.auth.admin import UserAdmin
 from .models import (
     Student, TeamMember, ContactSubmission, NewsletterSubscription,
     QuoteSubmission, ServiceInquiry, Enrollment, Assignment,
-    AssignmentSubmission, Certificate, Announcement, Message, Payment
+    AssignmentSubmission, Certificate, Announcement, Message, Payment,
+    OutboxEmail, Sequence, StudentStats, MediaBlob
 )
+from .admin_mixins import PerformanceAdminMixin
+from .exports import export_csv, export_jsonl
+from .outbox import requeue
+from .stats import rebuild as rebuild_stats
 
 @admin.register(Student)
 class StudentAdmin(UserAdmin):
@@ -12,6 +17,7 @@ class StudentAdmin(UserAdmin):
     list_filter = ['is_active', 'course', 'enrollment_date']
     search_fields = ['student_id', 'username', 'email', 'first_name', 'last_name']
     ordering = ['-enrollment_date']
+    actions = [export_csv, export_jsonl]
 
     fieldsets = UserAdmin.fieldsets + (
         ('Student Information', {
@@ -58,6 +64,7 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
     readonly_fields = ['submitted_at']
     list_editable = ['is_read']
     ordering = ['-submitted_at']
+    actions = [export_csv, export_jsonl]
 
     fieldsets = (
         ('Contact Information', {
@@ -72,13 +79,18 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
     )
 
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
+class EnrollmentAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['student', 'course', 'enrolled_at', 'progress_percentage', 'is_completed']
     list_filter = ['is_completed', 'enrolled_at', 'course']
     search_fields = ['student__student_id', 'student__username', 'course__title']
     list_editable = ['progress_percentage', 'is_completed']
     ordering = ['-enrolled_at']
 
+    def after_bulk_update(self, request, objs):
+        # bulk_update skips the signals that keep StudentStats current
+        for pk in {obj.student_id for obj in objs}:
+            rebuild_stats(pk)
+
 @admin.register(Assignment)
 class AssignmentAdmin(admin.ModelAdmin):
     list_display = ['title', 'course', 'due_date', 'max_score', 'created_at']
@@ -87,15 +99,20 @@ class AssignmentAdmin(admin.ModelAdmin):
     ordering = ['due_date']
 
 @admin.register(AssignmentSubmission)
-class AssignmentSubmissionAdmin(admin.ModelAdmin):
+class AssignmentSubmissionAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['assignment', 'student', 'submitted_at', 'score', 'status']
     list_filter = ['status', 'submitted_at', 'assignment__course']
     search_fields = ['assignment__title', 'student__student_id', 'student__username']
     list_editable = ['score', 'status']
     ordering = ['-submitted_at']
 
+    def after_bulk_update(self, request, objs):
+        # bulk_update skips the signals that keep StudentStats current
+        for pk in {obj.student_id for obj in objs}:
+            rebuild_stats(pk)
+
 @admin.register(Certificate)
-class CertificateAdmin(admin.ModelAdmin):
+class CertificateAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['student', 'course', 'issued_at', 'certificate_number']
     list_filter = ['issued_at', 'course']
     search_fields = ['student__student_id', 'student__username', 'course__title', 'certificate_number']
@@ -109,21 +126,40 @@ class AnnouncementAdmin(admin.ModelAdmin):
     list_editable = ['is_important']
     ordering = ['-created_at']
 
+class MessageBodySearchFilter(admin.SimpleListFilter):
+    title = 'search in'
+    parameter_name = 'search_bodies'
+
+    def lookups(self, request, model_admin):
+        return [('1', 'Message bodies too')]
+
+    def queryset(self, request, queryset):
+        # Only changes what a search looks at, see MessageAdmin.get_search_fields
+        return queryset
+
+
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['sender', 'recipient', 'subject', 'sent_at', 'is_read']
-    list_filter = ['is_read', 'sent_at']
-    search_fields = ['sender__username', 'recipient__username', 'subject', 'content']
+    list_filter = ['is_read', 'sent_at', MessageBodySearchFilter]
+    search_fields = ['sender__username', 'recipient__username', 'subject']
     list_editable = ['is_read']
     ordering = ['-sent_at']
 
+    def get_search_fields(self, request):
+        # An icontains over the bodies scans the whole table, so it is opt-in
+        if request.GET.get(MessageBodySearchFilter.parameter_name) == '1':
+            return [*self.search_fields, 'content']
+        return self.search_fields
+
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['student', 'amount', 'description', 'payment_date', 'status']
     list_filter = ['status', 'payment_date']
     search_fields = ['student__student_id', 'student__username', 'description', 'transaction_id']
     list_editable = ['status']
     ordering = ['-payment_date']
+    actions = [export_csv, export_jsonl]
 
 @admin.register(NewsletterSubscription)
 class NewsletterSubscriptionAdmin(admin.ModelAdmin):
@@ -142,6 +178,7 @@ class QuoteSubmissionAdmin(admin.ModelAdmin):
     readonly_fields = ['submitted_at']
     list_editable = ['is_read']
     ordering = ['-submitted_at']
+    actions = [export_csv, export_jsonl]
 
     fieldsets = (
         ('Contact Information', {
@@ -163,6 +200,7 @@ class ServiceInquiryAdmin(admin.ModelAdmin):
     readonly_fields = ['submitted_at']
     list_editable = ['is_read']
     ordering = ['-submitted_at']
+    actions = [export_csv, export_jsonl]
 
     fieldsets = (
         ('Contact Information', {
@@ -174,4 +212,49 @@ class ServiceInquiryAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('is_read', 'submitted_at')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['created_at', 'sent_at', 'locked_until', 'last_error']
+    ordering = ['-created_at']
+    actions = ['requeue_emails']
+
+    @admin.action(description='Requeue selected dead-letter emails')
+    def requeue_emails(self, request, queryset):
+        count = requeue(queryset)
+        self.message_user(request, f'{count} email(s) moved back to the outbox.')
+
+
+@admin.register(Sequence)
+class SequenceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value']
+    search_fields = ['name']
+    ordering = ['name']
+
+
+@admin.register(StudentStats)
+class StudentStatsAdmin(admin.ModelAdmin):
+    list_display = ['student', 'enrolled_courses', 'pending_assignments', 'certificates_count', 'updated_at']
+    search_fields = ['student__student_id', 'student__username']
+    list_select_related = ['student']
+    readonly_fields = ['updated_at']
+    actions = ['rebuild_selected']
+
+    @admin.action(description='Rebuild selected stats from source tables')
+    def rebuild_selected(self, request, queryset):
+        for pk in queryset.values_list('student_id', flat=True):
+            rebuild_stats(pk)
+        self.message_user(request, f'{queryset.count()} stats row(s) rebuilt.')
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'refcount', 'uploaded_at']
+    list_filter = ['uploaded_at']
+    search_fields = ['name']
+    readonly_fields = ['name', 'size', 'refcount', 'uploaded_at']
+    ordering = ['-uploaded_at']
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PagesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pages'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from dictchannel import db  # noqa: F401
@@ -0,0 +1,126 @@
+"""
+Reference counting for content-addressed uploads.
+
+Upload fields in ``BLOB_FIELDS`` store their files through
+``dictchannel.storage.ContentAddressedStorage``. Saving or deleting a row
+adjusts the ``MediaBlob.refcount`` of the names it gained or lost; the
+``gc_media`` command recounts from the database, adopts files uploaded
+before content addressing, and deletes blobs nobody references.
+"""
+
+import os
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from dictchannel.storage import blob_storage
+from testimonials.models import Testimonial
+
+from .models import AssignmentSubmission, Certificate, MediaBlob, TeamMember
+
+GRACE_SECONDS = getattr(settings, 'MEDIA_GC_GRACE_SECONDS', 60 * 60 * 24)
+
+# Models with content-addressed file fields: model -> field names
+BLOB_FIELDS = {
+    TeamMember: ['image'],
+    Testimonial: ['image'],
+    AssignmentSubmission: ['file'],
+    Certificate: ['file'],
+}
+
+BLOB_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{64}(?:\.\w+)?$')
+
+
+def is_blob_name(name):
+    return bool(name and BLOB_NAME_RE.search(name))
+
+
+def adjust(added=(), removed=()):
+    """Count references to ``added`` names and release ``removed`` ones."""
+    for name, n in Counter(added).items():
+        MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + n)
+    for name, n in Counter(removed).items():
+        MediaBlob.objects.filter(name=name).update(refcount=Greatest(F('refcount') - n, 0))
+
+
+def references():
+    """How many rows reference each stored name."""
+    counts = Counter()
+    for model, field_names in BLOB_FIELDS.items():
+        for field_name in field_names:
+            names = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            counts.update(names.values_list(field_name, flat=True).iterator())
+    return counts
+
+
+def recount():
+    """Reset every blob's refcount from the database; returns how many were wrong."""
+    counts = references()
+    fixed = 0
+    for pk, name, refcount in MediaBlob.objects.values_list('pk', 'name', 'refcount').iterator():
+        if counts.get(name, 0) != refcount:
+            MediaBlob.objects.filter(pk=pk).update(refcount=counts.get(name, 0))
+            fixed += 1
+    return fixed
+
+
+def adopt_legacy(dry_run=False):
+    """
+    Move files stored under their upload names into content-addressed
+    blobs, so existing duplicates collapse into one file.
+    """
+    adopted, legacy = 0, set()
+    for model, field_names in BLOB_FIELDS.items():
+        for field_name in field_names:
+            storage = model._meta.get_field(field_name).storage
+            rows = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for pk, name in rows.values_list('pk', field_name).iterator():
+                if is_blob_name(name) or not storage.exists(name):
+                    continue
+                legacy.add((storage, name))
+                adopted += 1
+                if dry_run:
+                    continue
+                with storage.open(name) as f:
+                    blob = storage.save(name, File(f))
+                model._default_manager.filter(pk=pk, **{field_name: name}).update(**{field_name: blob})
+    if not dry_run:
+        recount()
+        for storage, name in legacy:
+            storage.delete(name)
+    return adopted
+
+
+def collect(grace_seconds=GRACE_SECONDS, dry_run=False):
+    """Delete unreferenced blobs and stray blob files older than the grace period."""
+    cutoff = timezone.now() - timedelta(seconds=grace_seconds)
+    removed = []
+    storage = blob_storage()
+
+    for pk, name in MediaBlob.objects.filter(refcount=0, uploaded_at__lt=cutoff).values_list('pk', 'name'):
+        # Re-checked in the DELETE so a blob reused meanwhile survives
+        if dry_run or MediaBlob.objects.filter(pk=pk, refcount=0, uploaded_at__lt=cutoff).delete()[0]:
+            removed.append(name)
+            if not dry_run:
+                storage.delete(name)
+
+    # Files whose blob row was never written, e.g. after a crash mid-upload
+    known = set(MediaBlob.objects.values_list('name', flat=True))
+    for upload_to in {model._meta.get_field(f).upload_to for model, fields in BLOB_FIELDS.items() for f in fields}:
+        if not storage.exists(upload_to):
+            continue
+        for shard in storage.listdir(upload_to)[0]:
+            shard_dir = os.path.join(upload_to, shard)
+            for filename in storage.listdir(shard_dir)[1]:
+                name = f'{shard_dir}/{filename}'
+                if is_blob_name(name) and name not in known and storage.get_modified_time(name) < cutoff:
+                    removed.append(name)
+                    if not dry_run:
+                        storage.delete(name)
+    return removed
@@ -0,0 +1,221 @@
+"""
+Critical CSS for public page templates.
+
+The ``build_critical_css`` command renders every public route, records the
+elements among the first ``CRITICAL_CSS_FOLD_ELEMENTS`` of each page's
+body, and keeps only the rules of the site's CSS bundle whose selectors can
+match them. The result is stored per template in ``critical-css.json`` in
+``STATIC_ROOT`` together with the bundle it was cut from and the bundle's
+content hash, so later runs only redo templates whose CSS or markup changed.
+
+``{% critical_css %}`` in base.html inlines that CSS and loads the bundle
+without blocking rendering. When a template has no entry, or the bundle
+has changed since the entry was built, the stylesheet stays render-blocking.
+
+Matching is deliberately generous: pseudo-classes are ignored and every
+part of a selector only has to match some element above the fold, so the
+inlined CSS may contain a few rules too many but should not miss any.
+"""
+
+import json
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+
+MANIFEST_NAME = 'critical-css.json'
+MANIFEST_VERSION = 1
+FOLD_ELEMENTS = getattr(settings, 'CRITICAL_CSS_FOLD_ELEMENTS', 250)
+
+BUNDLE_RE = re.compile(r'<link\b[^>]*\bhref="([^"]*/CACHE/css/[^"]+\.css)"')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+ATTRIBUTE_RE = re.compile(r'\[\s*([\w-]+)[^\]]*\]')
+PARENS_RE = re.compile(r'\([^()]*\)')
+PSEUDO_RE = re.compile(r'::?[\w-]+')
+COMBINATOR_RE = re.compile(r'\s*[>+~]\s*|\s+')
+KEYFRAMES_NAME_RE = re.compile(r'@(?:-\w+-)?keyframes\s+([\w-]+)')
+
+# At-rules whose block holds ordinary rules
+GROUPING_RULES = {'media', 'supports', 'layer', 'container'}
+
+
+def bundle_urls(html):
+    """The compressed stylesheet URLs linked from ``html``, in order."""
+    # dict.fromkeys drops the <noscript> fallback of an async stylesheet
+    return list(dict.fromkeys(BUNDLE_RE.findall(html)))
+
+
+class FoldParser(HTMLParser):
+    """Collect ``(tag, classes, id, attribute names)`` for the elements above the fold."""
+
+    def __init__(self, limit=FOLD_ELEMENTS):
+        super().__init__()
+        self.limit = limit
+        self.count = 0
+        self.in_body = False
+        self.elements = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.in_body = True
+        elif tag != 'html' and not self.in_body:
+            return
+        if self.count >= self.limit:
+            return
+        if self.in_body:
+            self.count += 1
+        attrs = dict(attrs)
+        self.elements.add((
+            tag,
+            frozenset((attrs.get('class') or '').split()),
+            attrs.get('id'),
+            frozenset(attrs),
+        ))
+
+
+def fold_elements(html, limit=FOLD_ELEMENTS):
+    parser = FoldParser(limit)
+    parser.feed(html)
+    parser.close()
+    return parser.elements
+
+
+def split_selectors(prelude):
+    """Split a selector list on the commas that are not inside brackets."""
+    selectors, depth, start = [], 0, 0
+    for i, ch in enumerate(prelude):
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            selectors.append(prelude[start:i].strip())
+            start = i + 1
+    selectors.append(prelude[start:].strip())
+    return [s for s in selectors if s]
+
+
+def _compound(text):
+    tag = re.match(r'[\w-]+|\*', text)
+    ids = re.findall(r'#((?:[\w-]|\\.)+)', text)
+    return (
+        tag.group().lower() if tag and tag.group() != '*' else None,
+        frozenset(c.replace('\\', '') for c in re.findall(r'\.((?:[\w-]|\\.)+)', text)),
+        ids[0].replace('\\', '') if ids else None,
+        frozenset(ATTRIBUTE_RE.findall(text)),
+    )
+
+
+def compounds(selector):
+    """Reduce ``selector`` to the tag, classes, id and attributes of each compound part."""
+    selector = ATTRIBUTE_RE.sub(r'[\1]', selector)
+    while PARENS_RE.search(selector):
+        selector = PARENS_RE.sub('', selector)
+    selector = PSEUDO_RE.sub('', selector)
+    return [_compound(part) for part in COMBINATOR_RE.split(selector.strip()) if part]
+
+
+class Matcher:
+    def __init__(self, elements):
+        self.elements = elements
+        self.cache = {}
+
+    def matches_compound(self, compound):
+        if compound not in self.cache:
+            tag, classes, id_, attrs = compound
+            self.cache[compound] = any(
+                (tag is None or tag == el_tag)
+                and classes <= el_classes
+                and (id_ is None or id_ == el_id)
+                and attrs <= el_attrs
+                for el_tag, el_classes, el_id, el_attrs in self.elements
+            )
+        return self.cache[compound]
+
+    def __call__(self, selector):
+        return all(self.matches_compound(c) for c in compounds(selector))
+
+
+def parse_rules(css):
+    """Yield ``(prelude, body)`` for each top-level block and ``(statement, None)`` for each at-statement."""
+    depth = start = body_start = 0
+    quote = prelude = None
+    for i, ch in enumerate(css):
+        if quote:
+            if ch == quote and css[i - 1] != '\\':
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '{':
+            if depth == 0:
+                prelude, body_start = css[start:i].strip(), i + 1
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[body_start:i]
+                start = i + 1
+        elif ch == ';' and depth == 0:
+            statement = css[start:i].strip()
+            if statement:
+                yield statement, None
+            start = i + 1
+
+
+def _prune(css, matches, keyframes):
+    out = []
+    for prelude, body in parse_rules(css):
+        if body is None:
+            if not prelude.lower().startswith('@charset'):
+                out.append(prelude + ';')
+        elif prelude.startswith('@'):
+            name = prelude[1:].split(None, 1)[0].lower()
+            if name in GROUPING_RULES:
+                inner = _prune(body, matches, keyframes)
+                if inner:
+                    out.append(f'{prelude}{{{inner}}}')
+            elif name.endswith('keyframes'):
+                keyframes.append(f'{prelude}{{{body}}}')
+            elif name == 'font-face':
+                out.append(f'{prelude}{{{body}}}')
+        else:
+            kept = [s for s in split_selectors(prelude) if matches(s)]
+            if kept:
+                out.append(f"{','.join(kept)}{{{body.strip()}}}")
+    return ''.join(out)
+
+
+def extract(css, elements):
+    """The rules of ``css`` that can apply to ``elements``, plus the keyframes they use."""
+    keyframes = []
+    critical = _prune(COMMENT_RE.sub('', css), Matcher(elements), keyframes)
+    used = [k for k in keyframes if re.search(rf'\b{re.escape(KEYFRAMES_NAME_RE.match(k).group(1))}\b', critical)]
+    return critical + ''.join(used)
+
+
+def load_manifest(storage=staticfiles_storage):
+    try:
+        with storage.open(MANIFEST_NAME) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('templates', {})
+
+
+def save_manifest(templates, storage=staticfiles_storage):
+    content = json.dumps({'version': MANIFEST_VERSION, 'templates': templates}, indent=1, sort_keys=True)
+    if storage.exists(MANIFEST_NAME):
+        storage.delete(MANIFEST_NAME)
+    storage.save(MANIFEST_NAME, ContentFile(content.encode()))
+    critical_manifest.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def critical_manifest():
+    """The critical CSS of each template, loaded once per process."""
+    return load_manifest()
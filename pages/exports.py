@@ -0,0 +1,166 @@
+"""
+Streaming CSV and JSON Lines exports.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and
+encoded one at a time, so memory use stays flat regardless of how many
+rows are exported. The admin actions stream straight into a
+``StreamingHttpResponse`` (GZipMiddleware compresses it on the fly for
+clients that accept gzip); under ASGI the response gets an async
+iterator, because Django would otherwise buffer a synchronous one in
+memory. The ``export_data`` command writes to a file or stdout and can
+gzip the output itself. CSV text cells that a
+spreadsheet would run as a formula are prefixed with ``'``.
+"""
+
+import csv
+import zlib
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import ContactSubmission, Payment, QuoteSubmission, ServiceInquiry, Student
+
+CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+# Models that can be exported, by the name used on the command line
+EXPORT_MODELS = {
+    'contactsubmission': ContactSubmission,
+    'quotesubmission': QuoteSubmission,
+    'serviceinquiry': ServiceInquiry,
+    'payment': Payment,
+    'student': Student,
+}
+EXCLUDED_FIELDS = {'password'}
+
+# Spreadsheets run a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def export_columns(model):
+    """Column names and ``values_list`` arguments for every concrete field."""
+    fields = [f for f in model._meta.concrete_fields if f.name not in EXCLUDED_FIELDS]
+    return [f.attname for f in fields]
+
+
+class Echo:
+    """File-like object whose ``write`` hands back what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def csv_cell(value):
+    """``value`` with a leading ``'`` if a spreadsheet would read it as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns).encode()
+    for row in rows:
+        yield writer.writerow([csv_cell(value) for value in row]).encode()
+
+
+def iter_jsonl(columns, rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield (encoder.encode(dict(zip(columns, row))) + '\n').encode()
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def aiter_export(chunks, batch_size=CHUNK_SIZE):
+    """
+    Yield ``chunks`` to async code in batches of up to ``batch_size``, each
+    read on the thread that holds the queryset's database connection.
+    """
+    chunks = iter(chunks)
+    next_batch = sync_to_async(lambda: b''.join(islice(chunks, batch_size)))
+    try:
+        while batch := await next_batch():
+            yield batch
+    finally:
+        # Closes the database cursor if the client went away mid-export
+        await sync_to_async(chunks.close)()
+
+
+def stream_export(queryset, fmt='csv', compress=False, chunk_size=CHUNK_SIZE):
+    """Yield the encoded export of ``queryset`` as bytes."""
+    columns = export_columns(queryset.model)
+    # Default ordering is dropped so the database can stream rows without a sort
+    rows = queryset.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+    chunks = iter_csv(columns, rows) if fmt == 'csv' else iter_jsonl(columns, rows)
+    return iter_gzip(chunks) if compress else chunks
+
+
+def export_filename(model, fmt, compress=False):
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    return f"{model._meta.model_name}-{stamp}.{fmt}{'.gz' if compress else ''}"
+
+
+def export_response(queryset, fmt='csv', asynchronous=False):
+    chunks = stream_export(queryset, fmt)
+    if asynchronous:
+        chunks = aiter_export(chunks)
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(queryset.model, fmt)}"'
+    return response
+
+
+def filter_queryset(model, filters):
+    """
+    Apply ``field[__lookup]=value`` filters, allowing only the fields the
+    model's admin offers in ``list_filter``.
+    """
+    model_admin = admin.site._registry.get(model)
+    allowed = {f for f in getattr(model_admin, 'list_filter', ()) if isinstance(f, str)}
+    queryset = model._default_manager.all()
+    for item in filters:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f'Filters look like field=value, got {item!r}.')
+        name = key.split('__', 1)[0]
+        if name not in allowed:
+            raise ValueError(f"{model._meta.model_name} can only be filtered on: {', '.join(sorted(allowed))}.")
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValueError(f'Unknown field {name!r}.')
+        if key == name and field.get_internal_type() == 'BooleanField':
+            value = value.lower() in ('1', 't', 'true', 'yes')
+        try:
+            queryset = queryset.filter(**{key: value})
+        except ValidationError as e:
+            raise ValueError(f'{item}: {e.messages[0]}')
+    return queryset
+
+
+@admin.action(description='Export selected rows as CSV')
+def export_csv(modeladmin, request, queryset):
+    return export_response(queryset, 'csv', isinstance(request, ASGIRequest))
+
+
+@admin.action(description='Export selected rows as JSON Lines')
+def export_jsonl(modeladmin, request, queryset):
+    return export_response(queryset, 'jsonl', isinstance(request, ASGIRequest))
@@ -0,0 +1,93 @@
+"""
+Password hashers whose cost is set per host.
+
+Django's hashers hard-code their cost (1,000,000 PBKDF2 iterations,
+scrypt work factor 2**14, ...). These subclasses keep the algorithm names,
+so existing hashes still verify, but read the cost from
+``PASSWORD_HASHER_COSTS``; ``manage.py benchmark_hashers`` measures what
+each cost takes on the host and suggests a value.
+
+Changing the first entry of ``PASSWORD_HASHERS`` or raising a cost needs
+no password resets: on every successful login Django's ``check_password``
+rewrites a hash made with another hasher or a lower cost using the
+preferred one. ``manage.py password_hash_stats`` shows how far that has
+got. Lowering a cost only applies to new hashes; stored ones are never
+rewritten at a lower cost.
+
+``MINIMUM_COSTS`` are the OWASP Password Storage Cheat Sheet minimums;
+``benchmark_hashers`` does not time or recommend anything below them.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+# algorithm -> cost, e.g. {'pbkdf2_sha256': 600_000, 'scrypt': 2 ** 15}
+COSTS = getattr(settings, 'PASSWORD_HASHER_COSTS', {})
+
+# algorithm -> the cost parameter as named by the hasher's decode()
+COST_PARAMETERS = {
+    'pbkdf2_sha256': 'iterations',
+    'pbkdf2_sha1': 'iterations',
+    'scrypt': 'work_factor',
+    'argon2': 'time_cost',
+    'bcrypt_sha256': 'work_factor',
+    'bcrypt': 'work_factor',
+}
+
+
+# algorithm -> the lowest cost benchmark_hashers will recommend
+MINIMUM_COSTS = {
+    'pbkdf2_sha256': 600_000,
+    'scrypt': 2 ** 17,
+    'argon2': 2,
+    'bcrypt_sha256': 10,
+}
+
+
+class UpgradeOnlyMixin:
+    def must_update(self, encoded):
+        # Django rewrites any hash whose cost differs; keep stronger ones
+        stored = self.decode(encoded).get(COST_PARAMETERS[self.algorithm])
+        if stored is not None and stored > getattr(self, self.cost_attribute):
+            return False
+        return super().must_update(encoded)
+
+
+class TunedPBKDF2PasswordHasher(UpgradeOnlyMixin, hashers.PBKDF2PasswordHasher):
+    cost_attribute = 'iterations'
+    iterations = COSTS.get('pbkdf2_sha256', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(UpgradeOnlyMixin, hashers.ScryptPasswordHasher):
+    cost_attribute = 'work_factor'
+    work_factor = COSTS.get('scrypt', hashers.ScryptPasswordHasher.work_factor)
+    # OpenSSL refuses scrypt above 32 MB by default; this allows work
+    # factors up to 2**17 with the default block size
+    maxmem = 256 * 1024 * 1024
+
+
+class TunedArgon2PasswordHasher(UpgradeOnlyMixin, hashers.Argon2PasswordHasher):
+    cost_attribute = 'time_cost'
+    time_cost = COSTS.get('argon2', hashers.Argon2PasswordHasher.time_cost)
+
+
+class TunedBCryptSHA256PasswordHasher(UpgradeOnlyMixin, hashers.BCryptSHA256PasswordHasher):
+    cost_attribute = 'rounds'
+    rounds = COSTS.get('bcrypt_sha256', hashers.BCryptSHA256PasswordHasher.rounds)
+
+
+def with_cost(hasher_class, cost):
+    """An instance of ``hasher_class`` using ``cost`` instead of the configured one."""
+    return type(hasher_class.__name__, (hasher_class,), {hasher_class.cost_attribute: cost})()
+
+
+def describe(encoded):
+    """``(algorithm, cost)`` of a stored hash; cost is None when it cannot be read."""
+    hasher = hashers.identify_hasher(encoded)
+    parameter = COST_PARAMETERS.get(hasher.algorithm)
+    try:
+        cost = hasher.decode(encoded).get(parameter) if parameter else None
+    except ValueError:
+        # The hasher's library is not installed here
+        cost = None
+    return hasher.algorithm, cost
@@ -0,0 +1,275 @@
+"""
+Font Awesome subset for the public site.
+
+The site used to load the whole Font Awesome stylesheet and fonts for the
+few dozen icons it shows. ``build`` collects the ``fa*`` classes used in
+the project templates and in ``Service.icon``, keeps only the rules of
+the vendored Font Awesome stylesheet that can apply to them (using the
+critical CSS matcher), and subsets each webfont to the glyphs those rules
+reference. The WOFF2 fonts and the stylesheet are written to ``icons/`` in
+the static files storage under content-hashed names, next to a small
+manifest; run ``build_icons`` after ``collectstatic`` on deploy.
+
+``{% icon_stylesheet %}`` links the current subset, or the full CDN
+stylesheet until the first build. Saving a ``Service`` whose icon is not in
+the subset rebuilds it in a background thread once the transaction
+commits. WhiteNoise only serves the files it found when the process
+started, so processes that predate a rebuild link the full stylesheet
+until they are restarted.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+from services.models import Service
+
+from . import page_cache
+from .critical_css import extract
+
+logger = logging.getLogger(__name__)
+
+SOURCE_CSS = 'vendor/fontawesome-free/css/all.min.css'
+ICON_DIR = 'icons'
+MANIFEST_NAME = posixpath.join(ICON_DIR, 'manifest.json')
+CACHE_KEY = 'icons:manifest'
+ASYNC = getattr(settings, 'ICON_SUBSET_ASYNC', True)
+# Whether WhiteNoise looks for new files on each request, as it does in DEBUG
+AUTOREFRESH = getattr(settings, 'WHITENOISE_AUTOREFRESH', settings.DEBUG)
+
+CLASS_ATTR_RE = re.compile(r'<(\w+)\b[^>]*?\bclass="([^"]*)"')
+FONT_FACE_RE = re.compile(r'@font-face\s*\{[^}]*\}')
+FONT_URL_RE = re.compile(r'url\(["\']?([^)"\']+?)\.woff2["\']?\)')
+CONTENT_RE = re.compile(r'content:\s*"((?:\\[0-9a-fA-F]+ ?|[^"\\])*)"')
+ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]+) ?|(.)')
+
+_lock = threading.Lock()
+_executor = None
+_pending = False
+
+
+def _reset_executor():
+    # Worker threads do not survive a fork, so the child needs its own pool
+    global _lock, _executor, _pending
+    _lock = threading.Lock()
+    _executor = None
+    _pending = False
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def is_icon_class(name):
+    return name == 'fa' or name.startswith(('fa-', 'fas', 'far', 'fab'))
+
+
+def template_elements():
+    """``(tag, classes, id, attributes)`` for every template element with an icon class."""
+    elements = set()
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for path in sorted(directory.rglob('*.html')):
+            if 'admin' in path.relative_to(directory).parts:
+                continue  # Jazzmin ships its own Font Awesome
+            for tag, classes in CLASS_ATTR_RE.findall(path.read_text(encoding='utf-8')):
+                classes = classes.split()
+                if any(is_icon_class(c) for c in classes):
+                    elements.add((tag.lower(), frozenset(classes), None, frozenset({'class'})))
+    return elements
+
+
+def service_elements():
+    return {
+        ('i', frozenset(icon.split()), None, frozenset({'class'}))
+        for icon in Service.objects.values_list('icon', flat=True).distinct()
+        if icon
+    }
+
+
+def icon_names(elements):
+    return sorted({c for _, classes, _, _ in elements for c in classes if c.startswith('fa-')})
+
+
+def codepoints(css):
+    """Every character the ``content`` declarations in ``css`` can draw."""
+    points = set()
+    for value in CONTENT_RE.findall(css):
+        for escape, char in ESCAPE_RE.findall(value):
+            points.add(int(escape, 16) if escape else ord(char))
+    return points
+
+
+def subset_font(path, unicodes):
+    """WOFF2 bytes of the font at ``path`` reduced to ``unicodes``, or None if it has none of them."""
+    # A fixed timestamp keeps the output, and so its hashed name, stable between builds
+    font = TTFont(path, recalcTimestamp=False)
+    unicodes = unicodes & set(font.getBestCmap())
+    if not unicodes:
+        return None
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    buffer = BytesIO()
+    font.save(buffer)
+    return buffer.getvalue()
+
+
+def _hashed_name(stem, ext, content):
+    return posixpath.join(ICON_DIR, f'{stem}.{hashlib.sha256(content).hexdigest()[:12]}.{ext}')
+
+
+def _save(storage, name, content):
+    if not storage.exists(name):
+        storage.save(name, ContentFile(content))
+    return name
+
+
+def static_url(name):
+    # The files carry their content hash already and are not in the hashed-name manifest
+    return urljoin(settings.STATIC_URL, name)
+
+
+def load_manifest(storage=staticfiles_storage):
+    try:
+        with storage.open(MANIFEST_NAME) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def startup_manifest():
+    """The manifest as it was when this process first looked, i.e. what WhiteNoise indexed."""
+    return load_manifest()
+
+
+def current():
+    """The manifest of the current subset, or None before the first build."""
+    manifest = cache.get(CACHE_KEY)
+    if manifest is None:
+        manifest = load_manifest() or {}
+        cache.set(CACHE_KEY, manifest, None)
+    return manifest or None
+
+
+def covers(icon):
+    manifest = current()
+    if manifest is None:
+        return False
+    return {c for c in icon.split() if c.startswith('fa-')} <= set(manifest['icons'])
+
+
+def servable():
+    """The manifest of the subset this process can serve, or None to link the full stylesheet."""
+    manifest = current()
+    if AUTOREFRESH or manifest is None:
+        return manifest
+    started = startup_manifest()
+    return manifest if started and started['css'] == manifest['css'] else None
+
+
+def build(storage=staticfiles_storage, prune=True):
+    """
+    Write a subset stylesheet and fonts for the icons in use; returns the
+    new manifest. ``prune`` deletes the files of the previous subset, which
+    processes started before this build may still be serving.
+    """
+    source_path = finders.find(SOURCE_CSS)
+    with open(source_path, encoding='utf-8') as f:
+        source = f.read()
+    source_dir = posixpath.dirname(SOURCE_CSS)
+
+    elements = template_elements() | service_elements()
+    css = extract(FONT_FACE_RE.sub('', source), elements)
+    unicodes = codepoints(css)
+
+    # Several @font-face rules (the v5 family aliases) share each font file
+    fonts, font_faces = {}, []
+    for face in FONT_FACE_RE.findall(source):
+        url = FONT_URL_RE.search(face)
+        if not url:
+            continue
+        if url.group(1) not in fonts:
+            font_path = finders.find(posixpath.normpath(posixpath.join(source_dir, url.group(1) + '.ttf')))
+            content = subset_font(font_path, unicodes) if font_path else None
+            stem = posixpath.basename(url.group(1))
+            fonts[url.group(1)] = content and _save(storage, _hashed_name(stem, 'woff2', content), content)
+        if fonts[url.group(1)]:
+            src = f'src:url({posixpath.basename(fonts[url.group(1)])}) format("woff2")'
+            font_faces.append(re.sub(r'src:[^;}]+', src, face))
+
+    stylesheet = (''.join(font_faces) + css).encode()
+    css_name = _save(storage, _hashed_name('icons', 'css', stylesheet), stylesheet)
+    files = sorted(name for name in fonts.values() if name) + [css_name]
+
+    names = icon_names(elements)
+    previous = load_manifest(storage)
+    manifest = {
+        'css': css_name,
+        'files': files,
+        'icons': names,
+        # Classes Font Awesome has no rule for, e.g. typos or icons renamed in v6
+        'unknown': [n for n in names if not re.search(rf'\.{re.escape(n)}(?![\w-])', css)],
+    }
+    if storage.exists(MANIFEST_NAME):
+        storage.delete(MANIFEST_NAME)
+    storage.save(MANIFEST_NAME, ContentFile(json.dumps(manifest, indent=1).encode()))
+    cache.set(CACHE_KEY, manifest, None)
+
+    if prune:
+        for name in set((previous or {}).get('files', [])) - set(files):
+            if storage.exists(name):
+                storage.delete(name)
+    page_cache.bump(page_cache.GLOBAL_TAG)
+    return manifest
+
+
+def _run():
+    global _pending
+    with _lock:
+        _pending = False
+    close_old_connections()
+    try:
+        build(prune=False)
+    except Exception:
+        logger.exception('Icon subset rebuild failed')
+    finally:
+        close_old_connections()
+
+
+def schedule():
+    """Rebuild the subset in the background once the current transaction commits."""
+
+    def submit():
+        global _executor, _pending
+        if not ASYNC:
+            return build(prune=False)
+        with _lock:
+            if _pending:
+                return  # The queued build will see this change too
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='icon-subset')
+            _pending = True
+            _executor.submit(_run)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,179 @@
+"""
+Responsive derivatives for uploaded images.
+
+When a ``TeamMember`` or ``Testimonial`` is saved with a new image, a
+background thread (started after the transaction commits) resizes the
+original to several widths and writes WebP and JPEG copies without EXIF
+to ``derived/`` in the default storage, outside the originals' blob
+reference counting. The generated file names are recorded on
+the instance in ``<field>_variants`` so templates can build ``srcset``
+without touching storage; ``{% responsive_image %}`` falls back to the
+original until the variants exist.
+
+The ``build_image_variants`` command (run from cron) backfills existing
+media and picks up anything a worker did not get to.
+"""
+
+import logging
+import os
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from testimonials.models import Testimonial
+
+from . import page_cache
+from .models import TeamMember
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = getattr(settings, 'IMAGE_VARIANT_WIDTHS', [160, 320, 480, 640, 960])
+JPEG_QUALITY = getattr(settings, 'IMAGE_VARIANT_JPEG_QUALITY', 80)
+WEBP_QUALITY = getattr(settings, 'IMAGE_VARIANT_WEBP_QUALITY', 75)
+ASYNC = getattr(settings, 'IMAGE_VARIANTS_ASYNC', True)
+
+# Models with image fields that get derivatives: model -> field names
+IMAGE_FIELDS = {
+    TeamMember: ['image'],
+    Testimonial: ['image'],
+}
+
+_lock = threading.Lock()
+_executor = None
+
+
+def _reset_executor():
+    # Worker threads do not survive a fork, so the child needs its own pool
+    global _lock, _executor
+    _lock = threading.Lock()
+    _executor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def variants_attname(field_name):
+    return f'{field_name}_variants'
+
+
+def get_variants(fieldfile):
+    """The recorded variants for ``fieldfile``, or ``{}`` if they are stale or missing."""
+    if not fieldfile:
+        return {}
+    variants = getattr(fieldfile.instance, variants_attname(fieldfile.field.name), None) or {}
+    return variants if variants.get('source') == fieldfile.name else {}
+
+
+def is_current(instance, field_name):
+    fieldfile = getattr(instance, field_name)
+    variants = getattr(instance, variants_attname(field_name)) or {}
+    if not fieldfile:
+        return not variants
+    return variants.get('source') == fieldfile.name
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == 'JPEG':
+        if image.mode not in ('RGB', 'L'):
+            background = Image.new('RGB', image.size, 'white')
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def build_variants(fieldfile):
+    """Write WebP and JPEG derivatives of ``fieldfile`` and return their description."""
+    storage = default_storage
+    with fieldfile.open('rb') as f:
+        image = Image.open(f)
+        image.load()
+    # Apply the EXIF orientation before the metadata is dropped
+    image = ImageOps.exif_transpose(image)
+
+    directory, filename = posixpath.split(fieldfile.name)
+    stem = os.path.splitext(filename)[0]
+    widths = sorted({w for w in WIDTHS if w < image.width} | {min(image.width, max(WIDTHS))})
+
+    variants = {'source': fieldfile.name, 'width': image.width, 'height': image.height, 'webp': {}, 'jpg': {}}
+    for width in widths:
+        resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        resized.info = {}
+        for ext, fmt in (('webp', 'WEBP'), ('jpg', 'JPEG')):
+            name = storage.save(posixpath.join(directory, 'derived', f'{stem}-{width}.{ext}'),
+                                ContentFile(_encode(resized, fmt)))
+            variants[ext][str(width)] = name
+    return variants
+
+
+def _variant_files(variants):
+    return {name for kind in ('webp', 'jpg') for name in (variants or {}).get(kind, {}).values()}
+
+
+def refresh(model, pk, field_name, force=False):
+    """Regenerate the derivatives of one instance's image if they are out of date."""
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None or (is_current(instance, field_name) and not force):
+        return False
+    fieldfile = getattr(instance, field_name)
+    attname = variants_attname(field_name)
+    old = getattr(instance, attname) or {}
+
+    variants = {}
+    if fieldfile:
+        try:
+            variants = build_variants(fieldfile)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            # Recorded so the broken upload is not retried on every run
+            logger.warning('Could not build variants for %s: %s', fieldfile.name, e)
+            variants = {'source': fieldfile.name, 'error': str(e)}
+
+    # Skip the write if the image was replaced while we were working
+    unchanged = {field_name: fieldfile.name} if fieldfile else {}
+    updated = model._default_manager.filter(pk=pk, **unchanged).update(**{attname: variants})
+    stale = _variant_files(variants) if not updated else _variant_files(old) - _variant_files(variants)
+    for name in stale:
+        default_storage.delete(name)
+    if updated:
+        page_cache.bump(page_cache.model_tag(model))
+    return bool(updated)
+
+
+def _run(model, pk, field_name):
+    close_old_connections()
+    try:
+        refresh(model, pk, field_name)
+    except Exception:
+        logger.exception('Image variants failed for %s %s', model._meta.label, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule(instance, field_name):
+    """Build derivatives for ``instance`` once the current transaction commits."""
+    model, pk = type(instance), instance.pk
+
+    def submit():
+        global _executor
+        if not ASYNC:
+            return refresh(model, pk, field_name)
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-variants')
+            _executor.submit(_run, model, pk, field_name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,75 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from dictchannel.cache import SQLiteCache
+
+
+class Command(BaseCommand):
+    help = 'Compare cache hit latency and per-worker memory across cache backends.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=['locmem', 'sqlite'],
+                            choices=['locmem', 'sqlite', 'redis'])
+        parser.add_argument('--entries', type=int, default=2000, help='Number of entries to populate.')
+        parser.add_argument('--value-size', type=int, default=40 * 1024,
+                            help='Bytes per value; the default approximates a cached page.')
+        parser.add_argument('--iterations', type=int, default=20000, help='Number of timed cache hits.')
+        parser.add_argument('--redis-url', default='redis://127.0.0.1:6380',
+                            help='Server for the redis backend, e.g. one started with redis_standin.')
+
+    def make_backend(self, name, options, tmpdir):
+        params = {'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': options['entries'] * 2}}
+        if name == 'locmem':
+            return LocMemCache('benchmark', params)
+        if name == 'sqlite':
+            return SQLiteCache(os.path.join(tmpdir, 'cache.sqlite3'), params)
+        try:
+            from django.core.cache.backends.redis import RedisCache
+            backend = RedisCache(options['redis_url'], {'TIMEOUT': None})
+            backend.get('ping')
+        except Exception as e:
+            raise CommandError(f'Redis backend unavailable ({e}). Install redis and run redis_standin.')
+        return backend
+
+    def handle(self, *args, **options):
+        value = 'x' * options['value_size']
+        keys = [f'bench:{i}' for i in range(options['entries'])]
+        lookups = [random.choice(keys) for _ in range(options['iterations'])]
+
+        self.stdout.write(f"{'backend':<8} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'worker heap MB':>15}")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in options['backends']:
+                backend = self.make_backend(name, options, tmpdir)
+                backend.clear()
+
+                # Memory the worker process itself has to hold for the populated cache
+                tracemalloc.start()
+                before = tracemalloc.get_traced_memory()[0]
+                for key in keys:
+                    backend.set(key, value)
+                heap = (tracemalloc.get_traced_memory()[0] - before) / (1024 * 1024)
+                tracemalloc.stop()
+
+                timings = []
+                for key in lookups:
+                    start = time.perf_counter()
+                    backend.get(key)
+                    timings.append((time.perf_counter() - start) * 1e6)
+                timings.sort()
+
+                self.stdout.write(
+                    f'{name:<8} {statistics.mean(timings):>9.1f} {timings[len(timings) // 2]:>9.1f} '
+                    f'{timings[int(len(timings) * 0.99)]:>9.1f} {heap:>15.1f}'
+                )
+                backend.clear()
+
+        self.stdout.write(
+            'locmem memory is paid again by every worker process; sqlite and redis hold one shared copy.'
+        )
@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+# The request path before sessions, users and messages moved out of the database
+STOCK_AUTH_MIDDLEWARE = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+DATABASE_PROFILE = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'MESSAGE_STORAGE': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    'MIDDLEWARE': [
+        STOCK_AUTH_MIDDLEWARE if m == 'pages.user_cache.CachedAuthenticationMiddleware' else m
+        for m in settings.MIDDLEWARE
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare DB queries per authenticated dashboard request with database and cached sessions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student', required=True, help='Username to log in as.')
+        parser.add_argument('--requests', type=int, default=20, help='Number of timed requests per profile.')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            student = User.objects.get(username=options['student'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['student']!r}.")
+
+        profiles = [('database', DATABASE_PROFILE), ('cached', {})]
+        self.stdout.write(f"{'profile':<10} {'queries':>8} {'session':>8} {'mean ms':>9}")
+        for name, profile in profiles:
+            with override_settings(**profile):
+                queries, session_queries, timings = self.measure(student, options['requests'])
+            self.stdout.write(f'{name:<10} {queries:>8.1f} {session_queries:>8.1f} {timings:>9.2f}')
+        self.stdout.write('Queries are per request after one warm-up request; session counts django_session statements.')
+
+    def measure(self, student, requests):
+        client = Client()
+        client.force_login(student)
+        url = reverse('student_dashboard')
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} answered {response.status_code}; is {student.username!r} a student?')
+
+        counts, session_counts, timings = [], [], []
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            # Connection setup from dictchannel.db, not part of the request's work
+            sql = [q['sql'] for q in captured.captured_queries if not q['sql'].startswith('PRAGMA')]
+            counts.append(len(sql))
+            session_counts.append(sum('django_session' in s for s in sql))
+        client.logout()
+        return statistics.mean(counts), statistics.mean(session_counts), statistics.mean(timings)
@@ -0,0 +1,71 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+
+from pages import throttle
+from pages.models import ContactSubmission, OutboxEmail
+
+
+class Command(BaseCommand):
+    help = 'Submit the contact form from concurrent test clients and report lock failures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent writers.')
+        parser.add_argument('--per-thread', type=int, default=25, help='Submissions per writer.')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        email = f'bench-{tag}@example.com'
+        results = {'ok': 0, 'locked': 0, 'error': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def writer():
+            client = Client(raise_request_exception=True)
+            try:
+                for i in range(options['per_thread']):
+                    start = time.perf_counter()
+                    try:
+                        response = client.post('/contact/', {
+                            'fname': 'Benchmark', 'email': email, 'phone': '0',
+                            'subject': f'bench {i}', 'message': 'benchmark',
+                        })
+                        outcome = 'ok' if response.status_code == 302 else 'error'
+                    except Exception as e:
+                        outcome = 'locked' if 'locked' in str(e) else 'error'
+                    with lock:
+                        results[outcome] += 1
+                        latencies.append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+
+        self.stdout.write(f"journal_mode={connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]}, "
+                          f"transaction_mode={connection.settings_dict['OPTIONS'].get('transaction_mode')}")
+
+        threads = [threading.Thread(target=writer) for _ in range(options['threads'])]
+        # Every submission comes from one address and email, well over the contact form's limits
+        with throttle.unthrottled('contact'):
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+        submissions = ContactSubmission.objects.filter(email=email)
+        OutboxEmail.objects.filter(body__contains=email).delete()
+        stored = submissions.count()
+        submissions.delete()
+
+        latencies.sort()
+        total = sum(results.values())
+        self.stdout.write(
+            f"{total} submissions from {options['threads']} threads in {elapsed:.2f}s "
+            f"({total / elapsed:.0f}/s), p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.0f} ms"
+        )
+        self.stdout.write(f"ok={results['ok']} locked={results['locked']} error={results['error']} stored={stored}")
@@ -0,0 +1,74 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.hashers import (
+    MINIMUM_COSTS, TunedArgon2PasswordHasher, TunedBCryptSHA256PasswordHasher, TunedPBKDF2PasswordHasher,
+    TunedScryptPasswordHasher, with_cost,
+)
+
+# Strongest first: the recommendation is the first hasher that meets the
+# target. Every cost is at least the hasher's MINIMUM_COSTS entry.
+CANDIDATES = [
+    (TunedArgon2PasswordHasher, [2, 3, 4, 6]),
+    (TunedScryptPasswordHasher, [2 ** 17]),
+    (TunedBCryptSHA256PasswordHasher, [10, 11, 12, 13]),
+    (TunedPBKDF2PasswordHasher, [600_000, 800_000, 1_000_000, 1_200_000]),
+]
+PASSWORD = 'correct horse battery staple'
+
+
+class Command(BaseCommand):
+    help = 'Time each password hasher at several costs on this host and recommend one for a login latency target.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=200, help='Acceptable hashing time per login.')
+        parser.add_argument('--rounds', type=int, default=5, help='Verifications timed per cost.')
+
+    def measure(self, hasher, rounds):
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hasher.verify(PASSWORD, encoded)
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        target = options['target_ms']
+        best = {}
+
+        self.stdout.write(f"{'hasher':<16} {'cost':<22} {'median ms':>10}")
+        for hasher_class, costs in CANDIDATES:
+            for cost in costs:
+                if cost < MINIMUM_COSTS[hasher_class.algorithm]:
+                    continue
+                hasher = with_cost(hasher_class, cost)
+                try:
+                    ms = self.measure(hasher, options['rounds'])
+                except ValueError as e:
+                    # The hasher's library (argon2-cffi, bcrypt) is not installed
+                    self.stdout.write(f'{hasher.algorithm:<16} unavailable: {e}')
+                    break
+                within = ms <= target
+                if within:
+                    best[hasher_class] = (cost, ms)
+                label = f'{hasher_class.cost_attribute}={cost}'
+                line = f'{hasher.algorithm:<16} {label:<22} {ms:>10.1f}'
+                self.stdout.write(line if within else self.style.WARNING(line))
+
+        recommended = next((c for c, _ in CANDIDATES if c in best), None)
+        if recommended is None:
+            self.stderr.write(self.style.ERROR(
+                f'No hasher verified within {target:g} ms at or above its minimum cost '
+                f'(pages.hashers.MINIMUM_COSTS); allow a longer --target-ms rather than a weaker hash.'
+            ))
+            return
+        cost, ms = best[recommended]
+        self.stdout.write(self.style.SUCCESS(
+            f'\nRecommended for {target:g} ms per login ({ms:.1f} ms measured, one process, idle host):'
+        ))
+        self.stdout.write(f"PASSWORD_HASHERS[0] = 'pages.hashers.{recommended.__name__}'")
+        self.stdout.write(f"PASSWORD_HASHER_COSTS = {{'{recommended.algorithm}': {cost}}}")
+        self.stdout.write('Stored hashes move to it on each student\'s next login; see password_hash_stats.')
@@ -0,0 +1,76 @@
+import multiprocessing
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from pages.models import Sequence, Student
+from pages.sequences import next_value
+
+
+def _allocate(args):
+    name, count, block_size = args
+    connections.close_all()
+    return [next_value(name, block_size=block_size) for _ in range(count)]
+
+
+def _register(args):
+    tag, count = args
+    connections.close_all()
+    ids = []
+    for i in range(count):
+        student = Student(username=f'bench-{tag}-{uuid.uuid4().hex[:12]}', email=f'bench-{tag}-{i}@example.com')
+        student.set_unusable_password()
+        student.save()
+        ids.append(student.student_id)
+    return ids
+
+
+class Command(BaseCommand):
+    help = 'Allocate IDs from parallel worker processes and verify that none collide.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Number of worker processes.')
+        parser.add_argument('--per-worker', type=int, default=500, help='IDs allocated by each worker.')
+        parser.add_argument('--block-size', type=int, default=None, help='Override SEQUENCE_BLOCK_SIZE.')
+        parser.add_argument('--register', action='store_true',
+                            help='Create real Student rows instead of bare sequence numbers. '
+                                 'The benchmark students are deleted afterwards, but the '
+                                 'student IDs they consumed are not reused.')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        per_worker = options['per_worker']
+        tag = uuid.uuid4().hex[:8]
+
+        if options['register']:
+            func = _register
+            jobs = [(tag, per_worker)] * workers
+        else:
+            name = f'benchmark:{tag}'
+            func = _allocate
+            jobs = [(name, per_worker, options['block_size'])] * workers
+
+        connections.close_all()
+        ctx = multiprocessing.get_context('fork')
+        start = time.perf_counter()
+        try:
+            with ctx.Pool(workers) as pool:
+                results = pool.map(func, jobs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if options['register']:
+                Student.objects.filter(username__startswith=f'bench-{tag}-').delete()
+            else:
+                Sequence.objects.filter(name=name).delete()
+
+        allocated = [value for result in results for value in result]
+        unique = len(set(allocated))
+        self.stdout.write(
+            f'{len(allocated)} IDs from {workers} workers in {elapsed:.2f}s '
+            f'({len(allocated) / elapsed:.0f} IDs/s), {len(allocated) - unique} collisions'
+        )
+        if unique != len(allocated):
+            raise CommandError('Duplicate IDs were allocated.')
+        self.stdout.write(self.style.SUCCESS('No collisions.'))
@@ -0,0 +1,169 @@
+import http.client
+import itertools
+import json
+import os
+import shlex
+import socket
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+# Same process manager and number of processes for both; the WSGI workers
+# get threads to match. uvicorn's own --workers mode leaves Nagle's algorithm
+# on for its connections, which adds ~40 ms to every keep-alive response.
+SERVER_COMMANDS = {
+    'wsgi': 'gunicorn dictchannel.wsgi:application --bind 127.0.0.1:{port} --workers {workers} --threads {threads}',
+    'asgi': 'gunicorn dictchannel.asgi:application --bind 127.0.0.1:{port} --workers {workers} '
+            '--worker-class uvicorn.workers.UvicornWorker',
+}
+STARTUP_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = 'Load-test the WSGI and ASGI deployments at several concurrency levels.'
+
+    def add_arguments(self, parser):
+        for name in SERVER_COMMANDS:
+            parser.add_argument(f'--{name}-url', help=f'A running {name.upper()} deployment; started here when omitted.')
+            parser.add_argument(f'--{name}-command', default=SERVER_COMMANDS[name],
+                                help='How to start it; {port}, {workers} and {threads} are filled in.')
+        parser.add_argument('--workers', type=int, default=2, help='Server processes for each deployment.')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per WSGI worker.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+        parser.add_argument('--requests', type=int, default=500, help='Requests per concurrency level.')
+        parser.add_argument('--paths', nargs='+', help='Paths to request in turn; defaults to the async views.')
+        parser.add_argument('--student-email', help='Log in as this student and add the dashboard to the paths.')
+        parser.add_argument('--student-password')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [
+            reverse(name) for name in ('home', 'courses', 'events', 'team', 'testimonial')
+        ]
+        if options['student_email']:
+            paths = paths + [reverse('student_dashboard')]
+
+        if getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            self.stderr.write(self.style.WARNING(
+                'Query accounting is on in these settings (QUERY_BUDGET_ENABLED/DEBUG); '
+                'the numbers include its overhead. Use the production settings.'
+            ))
+        self.stdout.write(f"{'server':<6} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for name in SERVER_COMMANDS:
+            with self.deployment(name, options) as base:
+                cookie = self.login(base, options) if options['student_email'] else ''
+                self.run(base, paths[:1], 1, 10, cookie)  # warm the caches and workers
+                for concurrency in options['concurrency']:
+                    rate, latencies, errors = self.run(base, paths, concurrency, options['requests'], cookie)
+                    self.stdout.write(f'{name:<6} {concurrency:>5} {rate:>8.1f} ' + ' '.join(
+                        f'{self.percentile(latencies, p):>8.1f}' for p in (50, 95, 99)
+                    ) + f' {errors:>7}')
+
+    @contextmanager
+    def deployment(self, name, options):
+        if options[f'{name}_url']:
+            yield options[f'{name}_url'].rstrip('/')
+            return
+
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        command = shlex.split(options[f'{name}_command'].format(
+            port=port, workers=options['workers'], threads=options['threads'],
+        ))
+        with tempfile.TemporaryFile() as log:
+            try:
+                process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=os.environ.copy(),
+                                           stdout=log, stderr=subprocess.STDOUT)
+            except FileNotFoundError:
+                raise CommandError(f'{command[0]} is not installed; install it or pass --{name}-url.')
+            try:
+                self.wait_for(port, process, log)
+                yield f'http://127.0.0.1:{port}'
+            finally:
+                process.terminate()
+                process.wait(10)
+
+    def wait_for(self, port, process, log):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                log.seek(0)
+                raise CommandError(f'Server exited during startup:\n{log.read().decode(errors="replace")[-2000:]}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'Server did not accept connections within {STARTUP_TIMEOUT}s.')
+
+    def connect(self, base):
+        parts = urlsplit(base)
+        return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+    def login(self, base, options):
+        # The login form takes its CSRF token from the session endpoint, as in the browser
+        cookies = SimpleCookie()
+        connection = self.connect(base)
+        connection.request('GET', reverse('session_state'))
+        response = connection.getresponse()
+        token = json.loads(response.read())['csrf_token']
+        for header in response.headers.get_all('Set-Cookie') or []:
+            cookies.load(header)
+
+        connection.request('POST', reverse('student_login'), body=urlencode({
+            'un': options['student_email'], 'pw': options['student_password'] or '', 'csrfmiddlewaretoken': token,
+        }), headers={
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Cookie': '; '.join(f'{k}={m.value}' for k, m in cookies.items()),
+        })
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        for header in response.headers.get_all('Set-Cookie') or []:
+            cookies.load(header)
+        if response.status != 302 or settings.SESSION_COOKIE_NAME not in cookies:
+            raise CommandError(f'Login as {options["student_email"]} failed ({response.status}).')
+        return '; '.join(f'{k}={m.value}' for k, m in cookies.items())
+
+    def run(self, base, paths, concurrency, total, cookie):
+        counter = itertools.count()
+        latencies, errors = [], []
+        headers = {'Accept-Encoding': 'gzip, br'}
+        if cookie:
+            headers['Cookie'] = cookie
+
+        def client():
+            # One keep-alive connection per simulated client
+            connection = self.connect(base)
+            while (i := next(counter)) < total:
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', paths[i % len(paths)], headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                    connection.close()
+                    connection = self.connect(base)
+                (latencies if ok else errors).append((time.perf_counter() - start) * 1000)
+            connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            for future in [pool.submit(client) for _ in range(concurrency)]:
+                future.result()
+        return total / (time.perf_counter() - start), sorted(latencies), len(errors)
+
+    def percentile(self, values, p):
+        if not values:
+            return float('nan')
+        return values[min(len(values) - 1, int(len(values) * p / 100))]
@@ -0,0 +1,85 @@
+import hashlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from compressor.storage import default_storage as compressor_storage
+from pages.critical_css import FOLD_ELEMENTS, bundle_urls, extract, fold_elements, load_manifest, save_manifest
+from pages.page_cache import GLOBAL_TAG, bump
+from pages.routes import public_routes
+
+
+class Command(BaseCommand):
+    help = ('Render every public page and store the CSS each page template needs above the fold. '
+            'Run after collectstatic and compress; restart the web processes afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild templates whose CSS and markup are unchanged.')
+        parser.add_argument('--fold', type=int, default=FOLD_ELEMENTS,
+                            help='How many body elements count as above the fold.')
+
+    def handle(self, *args, **options):
+        elements = defaultdict(set)
+        bundles = {}
+
+        # Bypass the page cache so every route is rendered from its template
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            client = Client()
+            for name, path in public_routes():
+                response = client.get(path)
+                template_name = getattr(response.wsgi_request, 'critical_css_template', None)
+                if response.status_code != 200 or not template_name:
+                    self.stderr.write(f'Skipping {path} ({response.status_code})')
+                    continue
+                html = response.content.decode()
+                elements[template_name] |= fold_elements(html, options['fold'])
+                bundles.setdefault(template_name, bundle_urls(html))
+
+        previous = load_manifest()
+        templates, css_cache = {}, {}
+        for template_name in sorted(elements):
+            urls = bundles[template_name]
+            if not urls:
+                continue
+            key = tuple(urls)
+            if key not in css_cache:
+                css_cache[key] = ''.join(self.read_bundle(url) for url in urls)
+            css = css_cache[key]
+            css_hash = hashlib.sha256(css.encode()).hexdigest()
+            # Sets have no stable order across processes, so hash a sorted form
+            markup = sorted(repr((tag, sorted(classes), id_, sorted(attrs)))
+                            for tag, classes, id_, attrs in elements[template_name])
+            markup_hash = hashlib.sha256('\n'.join(markup).encode()).hexdigest()
+
+            entry = previous.get(template_name)
+            if (entry and not options['force'] and entry['css_hash'] == css_hash
+                    and entry['markup_hash'] == markup_hash and entry['bundles'] == urls):
+                templates[template_name] = entry
+                continue
+            critical = extract(css, elements[template_name])
+            templates[template_name] = {
+                'bundles': urls,
+                'css_hash': css_hash,
+                'markup_hash': markup_hash,
+                'css': critical,
+            }
+            self.stdout.write(f'{template_name:<40} {len(critical):>7} of {len(css)} bytes')
+
+        save_manifest(templates)
+        bump(GLOBAL_TAG)
+        self.stdout.write(self.style.SUCCESS(f'Critical CSS stored for {len(templates)} templates.'))
+
+    def read_bundle(self, url):
+        if not url.startswith(settings.COMPRESS_URL):
+            raise CommandError(f'{url} is not a compressed bundle.')
+        name = url[len(settings.COMPRESS_URL):]
+        try:
+            with compressor_storage.open(name) as f:
+                return f.read().decode()
+        except FileNotFoundError:
+            raise CommandError(f'{name} is missing; run collectstatic and compress first.')
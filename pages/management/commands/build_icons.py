@@ -0,0 +1,16 @@
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand
+
+from pages import icons
+
+
+class Command(BaseCommand):
+    help = 'Subset Font Awesome to the icons used by the templates and services; run after collectstatic.'
+
+    def handle(self, *args, **options):
+        manifest = icons.build()
+        for name in manifest['files']:
+            self.stdout.write(f'{name:<50} {staticfiles_storage.size(name):>8} bytes')
+        if manifest['unknown']:
+            self.stderr.write(self.style.WARNING(f"No Font Awesome rule for: {', '.join(manifest['unknown'])}"))
+        self.stdout.write(self.style.SUCCESS(f"Subset covers {len(manifest['icons'])} icon classes."))
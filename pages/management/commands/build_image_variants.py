@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from pages.images import IMAGE_FIELDS, refresh
+
+
+class Command(BaseCommand):
+    help = 'Build missing or stale WebP/JPEG derivatives for team and testimonial images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild every image, e.g. after changing IMAGE_VARIANT_WIDTHS.')
+
+    def handle(self, *args, **options):
+        built = 0
+        for model, field_names in IMAGE_FIELDS.items():
+            for field_name in field_names:
+                for pk in model._default_manager.values_list('pk', flat=True):
+                    if refresh(model, pk, field_name, force=options['force']):
+                        built += 1
+                        self.stdout.write(f'{model._meta.label} {pk}: {field_name} variants updated')
+        self.stdout.write(self.style.SUCCESS(f'{built} image(s) processed'))
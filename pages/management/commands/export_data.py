@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.exports import CHUNK_SIZE, EXPORT_MODELS, FORMATS, export_filename, filter_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV or JSON Lines export of submissions, payments or students.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(EXPORT_MODELS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output as it is written.')
+        parser.add_argument('--output', help="File to write; defaults to a timestamped name, '-' for stdout.")
+        parser.add_argument('--filter', action='append', default=[], metavar='FIELD=VALUE',
+                            help="Filter on a list_filter field, e.g. is_read=false or submitted_at__gte=2025-01-01. Repeatable.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        model = EXPORT_MODELS[options['model']]
+        try:
+            queryset = filter_queryset(model, options['filter'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        chunks = stream_export(queryset, options['format'], options['gzip'], options['chunk_size'])
+        output = options['output'] or export_filename(model, options['format'], options['gzip'])
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        written = 0
+        with open(output, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        self.stderr.write(f'Wrote {written} bytes to {output}')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from pages.blobs import GRACE_SECONDS, adopt_legacy, collect, recount
+
+
+class Command(BaseCommand):
+    help = 'Recount media blob references and delete blobs no row refers to.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=GRACE_SECONDS,
+                            help='Keep unreferenced blobs uploaded within this many seconds.')
+        parser.add_argument('--adopt-legacy', action='store_true',
+                            help='First move files saved under their upload names into content-addressed blobs.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without changing it.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if options['adopt_legacy']:
+            adopted = adopt_legacy(dry_run=dry_run)
+            self.stdout.write(f'{adopted} legacy file(s) {"to adopt" if dry_run else "adopted"}')
+        if not dry_run:
+            self.stdout.write(f'{recount()} refcount(s) corrected')
+        removed = collect(options['grace'], dry_run=dry_run)
+        for name in removed:
+            self.stdout.write(f'  {name}')
+        self.stdout.write(self.style.SUCCESS(f'{len(removed)} blob(s) {"to remove" if dry_run else "removed"}'))
@@ -0,0 +1,52 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, get_hasher
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pages.hashers import describe
+
+
+class Command(BaseCommand):
+    help = 'Show how many stored password hashes already use the preferred hasher and cost.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-days', type=int, default=90,
+                            help='Report pending accounts without a login for this many days.')
+
+    def handle(self, *args, **options):
+        preferred = get_hasher('default')
+        idle_since = timezone.now() - timedelta(days=options['idle_days'])
+        groups, current, pending, idle, unusable = Counter(), 0, 0, 0, 0
+
+        rows = get_user_model().objects.values_list('password', 'last_login').iterator()
+        for encoded, last_login in rows:
+            if not encoded or encoded.startswith(UNUSABLE_PASSWORD_PREFIX):
+                unusable += 1
+                continue
+            groups[describe(encoded)] += 1
+            if encoded.startswith(f'{preferred.algorithm}$') and not preferred.must_update(encoded):
+                current += 1
+            else:
+                pending += 1
+                if last_login is None or last_login < idle_since:
+                    idle += 1
+
+        self.stdout.write(f"{'algorithm':<16} {'cost':>10} {'accounts':>9}")
+        for (algorithm, cost), total in sorted(groups.items(), key=lambda item: -item[1]):
+            self.stdout.write(f"{algorithm:<16} {cost if cost is not None else '?':>10} {total:>9}")
+
+        usable = current + pending
+        share = current * 100 / usable if usable else 100
+        self.stdout.write(self.style.SUCCESS(
+            f'{current}/{usable} usable hashes use {preferred.algorithm} at the configured cost ({share:.1f}%).'
+        ))
+        if pending:
+            self.stdout.write(
+                f"{pending} will be rehashed on their next login; {idle} of them have not logged in "
+                f"for {options['idle_days']} days."
+            )
+        if unusable:
+            self.stdout.write(f'{unusable} accounts have no usable password.')
@@ -0,0 +1,76 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from pages import prerender
+from pages.routes import public_patterns, public_routes
+
+# A {% csrf_token %} field; {% deferred_csrf_token %} renders an empty value
+CSRF_TOKEN_RE = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+class Command(BaseCommand):
+    help = ('Write every public page, with gzip and brotli variants, to a directory a front proxy can serve. '
+            'Only pages whose models, templates or static build changed are rendered again.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(prerender.PRERENDER_ROOT), help='Directory to write pages to.')
+        parser.add_argument('--force', action='store_true', help='Render every page even if nothing changed.')
+
+    def handle(self, *args, **options):
+        root = options['output']
+        previous = prerender.load_manifest(root)
+        build = prerender.build_fingerprint()
+        tags = {name: page_tags for name, pattern, page_tags in public_patterns()}
+
+        routes = list(public_routes())
+        pages, pending = {}, []
+        for name, path in routes:
+            # Taken before rendering, so a change made meanwhile triggers another render next run
+            versions = prerender.model_versions(tags[name])
+            entry = previous.get(path)
+            if entry and not options['force'] and os.path.exists(prerender.output_path(root, path)):
+                if entry['fingerprint'] == prerender.fingerprint(versions, entry['template'], build):
+                    pages[path] = entry
+                    continue
+            pending.append((name, path, versions))
+
+        rendered = {}
+        # Bypass the page cache so each view renders and reports its template
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            client = Client()
+            for name, path, versions in pending:
+                response = client.get(path)
+                if response.status_code != 200 or response.streaming:
+                    self.stderr.write(self.style.WARNING(f'Skipping {path} ({response.status_code})'))
+                    continue
+                template = getattr(response.wsgi_request, 'critical_css_template', None)
+                prerender.write_page(root, path, response.content)
+                rendered[path] = (template, versions, bool(CSRF_TOKEN_RE.search(response.content)))
+                self.stdout.write(f'Rendered {path}')
+
+        with_forms = 0
+        for path, (template, versions, has_form) in rendered.items():
+            pages[path] = {'template': template, 'fingerprint': prerender.fingerprint(versions, template, build)}
+            with_forms += has_form
+
+        for path in set(previous) - {path for _, path in routes}:
+            prerender.remove_page(root, path)
+            self.stdout.write(f'Removed {path}')
+
+        prerender.save_manifest(root, pages)
+        if with_forms:
+            self.stderr.write(self.style.WARNING(
+                f'{with_forms} rendered pages contain a CSRF token rendered into the page; '
+                'it will not match the CSRF cookie of the visitors served the static copy. '
+                'Use {% deferred_csrf_token %} in their forms.'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(rendered)} rendered, {len(pages) - len(rendered)} unchanged, written to {root}'
+        ))
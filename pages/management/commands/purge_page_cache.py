@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from pages.page_cache import GLOBAL_TAG, bump
+
+
+class Command(BaseCommand):
+    help = 'Invalidate cached public pages, e.g. after deploying template changes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tags', nargs='*',
+                            help='Model tags such as courses.course to purge. Defaults to every page.')
+
+    def handle(self, *args, **options):
+        tags = options['tags'] or [GLOBAL_TAG]
+        bump(*tags)
+        self.stdout.write(self.style.SUCCESS(f'Purged pages tagged: {", ".join(tags)}'))
@@ -0,0 +1,75 @@
+import json
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from pages.query_budget import get_report, reset_report, write_report
+from pages.routes import public_routes
+
+
+class Command(BaseCommand):
+    help = 'Request every public page (and optionally the dashboard and admin) and write a per-view query report.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='query_report.json', help='Where to write the JSON report.')
+        parser.add_argument('--compare', help='A previous report to diff against.')
+        parser.add_argument('--student', help='Username to log in as for the student dashboard.')
+        parser.add_argument('--admin-user', help='Staff username to log in as for admin changelists.')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        reset_report()
+
+        # Bypass the page cache so every request measures a real render
+        with override_settings(
+            QUERY_BUDGET_ENABLED=True,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            client = Client()
+            for name, path in public_routes():
+                client.get(path)
+
+            if options['student']:
+                client.force_login(self.get_user(User, options['student']))
+                client.get(reverse('student_dashboard'))
+                client.logout()
+
+            if options['admin_user']:
+                client.force_login(self.get_user(User, options['admin_user']))
+                for model in admin.site._registry:
+                    client.get(reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist'))
+                client.logout()
+
+        write_report(options['output'])
+        report = get_report()
+        for name, stats in report.items():
+            flag = '  N+1' if stats['n_plus_one'] else ''
+            self.stdout.write(f"{name:<45} {stats['max_queries']:>4} queries {stats['avg_sql_ms']:>8.2f} ms{flag}")
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def get_user(self, User, username):
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'No user named {username!r}.')
+
+    def compare(self, path, report):
+        with open(path) as f:
+            previous = json.load(f)
+        self.stdout.write(f'\nChanges against {path}:')
+        changed = False
+        for name in sorted(set(previous) | set(report)):
+            before = previous.get(name, {}).get('max_queries')
+            after = report.get(name, {}).get('max_queries')
+            if before != after:
+                changed = True
+                style = self.style.ERROR if (after or 0) > (before or 0) else self.style.SUCCESS
+                self.stdout.write(style(f'{name:<45} {before} -> {after}'))
+        if not changed:
+            self.stdout.write('No change in query counts.')
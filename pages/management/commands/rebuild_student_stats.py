@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from pages.models import Student
+from pages.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute materialised dashboard stats to repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('student_ids', nargs='*',
+                            help='Student IDs (e.g. DCT20250001) to rebuild. Defaults to every student.')
+
+    def handle(self, *args, **options):
+        students = Student.objects.all()
+        if options['student_ids']:
+            students = students.filter(student_id__in=options['student_ids'])
+
+        count = 0
+        for pk in students.values_list('pk', flat=True).iterator():
+            rebuild(pk)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {count} student(s).'))
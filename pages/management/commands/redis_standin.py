@@ -0,0 +1,203 @@
+"""
+Minimal Redis-protocol server for exercising the Redis cache path locally.
+
+It implements only the commands Django's RedisCache backend issues, keeps
+data in process memory and is not meant for production use.
+"""
+
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Store:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def execute(self, command, args):
+        handler = getattr(self, 'cmd_' + command.lower(), None)
+        if handler is None:
+            return RespError(f"ERR unknown command '{command}'")
+        return handler(*args)
+
+    def cmd_ping(self, *args):
+        return args[0] if args else SimpleString('PONG')
+
+    def cmd_hello(self, protover=b'2', *args):
+        return Map({'server': 'redis', 'version': '7.0.0', 'proto': int(protover), 'mode': 'standalone'})
+
+    def cmd_select(self, db):
+        return SimpleString('OK')
+
+    def cmd_client(self, *args):
+        return SimpleString('OK')
+
+    def cmd_get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def cmd_set(self, key, value, *options):
+        options = [o.upper() if isinstance(o, bytes) else o for o in options]
+        if b'NX' in options and self._alive(key):
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if b'EX' in options:
+            self.expires[key] = time.monotonic() + int(options[options.index(b'EX') + 1])
+        return SimpleString('OK')
+
+    def cmd_mset(self, *pairs):
+        for key, value in zip(pairs[::2], pairs[1::2]):
+            self.data[key] = value
+            self.expires.pop(key, None)
+        return SimpleString('OK')
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                removed += 1
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    def cmd_expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.monotonic() + int(seconds)
+        return 1
+
+    def cmd_persist(self, key):
+        return 1 if self._alive(key) and self.expires.pop(key, None) is not None else 0
+
+    def cmd_incrby(self, key, delta):
+        value = int(self.data[key]) if self._alive(key) else 0
+        try:
+            value += int(delta)
+        except ValueError:
+            return RespError('ERR value is not an integer or out of range')
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, b'1')
+
+    def cmd_flushdb(self, *args):
+        self.data.clear()
+        self.expires.clear()
+        return SimpleString('OK')
+
+
+class SimpleString(str):
+    pass
+
+
+class RespError(str):
+    pass
+
+
+class Map(dict):
+    pass
+
+
+def encode(value, resp3=False):
+    if value is None:
+        return b'_\r\n' if resp3 else b'$-1\r\n'
+    if isinstance(value, RespError):
+        return b'-' + value.encode() + b'\r\n'
+    if isinstance(value, SimpleString):
+        return b'+' + value.encode() + b'\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, Map):
+        return b'%%%d\r\n' % len(value) + b''.join(encode(k, resp3) + encode(v, resp3) for k, v in value.items())
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(encode(v, resp3) for v in value)
+    if isinstance(value, str):
+        value = value.encode()
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+async def read_command(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        # Inline command, e.g. from telnet
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+
+class Command(BaseCommand):
+    help = 'Run an in-memory Redis-protocol stand-in for testing the Redis cache configuration.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=6380)
+
+    def handle(self, *args, **options):
+        store = Store()
+
+        def run(command):
+            try:
+                return store.execute(command[0].decode(), command[1:])
+            except (TypeError, ValueError) as e:
+                return RespError(f'ERR {e}')
+
+        async def serve_client(reader, writer):
+            resp3 = False
+            queued = None  # Commands buffered between MULTI and EXEC
+            try:
+                while True:
+                    command = await read_command(reader)
+                    if not command:
+                        break
+                    name = command[0].decode().upper()
+                    if name == 'MULTI':
+                        queued = []
+                        reply = SimpleString('OK')
+                    elif name == 'EXEC':
+                        reply = [run(c) for c in queued or []]
+                        queued = None
+                    elif queued is not None:
+                        queued.append(command)
+                        reply = SimpleString('QUEUED')
+                    else:
+                        reply = run(command)
+                        if isinstance(reply, Map):
+                            resp3 = reply['proto'] == 3
+                    writer.write(encode(reply, resp3))
+                    await writer.drain()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                writer.close()
+
+        async def main():
+            server = await asyncio.start_server(serve_client, options['host'], options['port'])
+            self.stdout.write(f"Redis stand-in listening on {options['host']}:{options['port']}")
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pages.outbox import BATCH_SIZE, deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails over a single SMTP connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Maximum number of emails to send per batch.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running and poll the outbox instead of exiting after one pass.')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep between polls when --loop is set.')
+
+    def handle(self, *args, **options):
+        while True:
+            # Drain everything that is due before going back to sleep
+            while True:
+                sent, failed, dead = deliver_pending(limit=options['batch_size'])
+                if sent or failed or dead:
+                    self.stdout.write(f'Sent {sent}, retrying {failed}, dead-lettered {dead}')
+                if sent + failed + dead < options['batch_size']:
+                    break
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from pages import throttle
+
+
+class Command(BaseCommand):
+    help = 'Show allowed and rejected POSTs per throttle scope.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'scope':<12} {'allowed':>9} {'ip':>9} {'email':>9}")
+        for scope, counts in throttle.stats().items():
+            self.stdout.write(
+                f"{scope:<12} {counts['allowed']:>9} {counts['rejected_ip']:>9} {counts['rejected_email']:>9}"
+            )
+        if options['reset']:
+            throttle.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0006_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Sequence Name')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Last Reserved Value')),
+            ],
+            options={
+                'verbose_name': 'Sequence',
+                'verbose_name_plural': 'Sequences',
+            },
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='certificate_number',
+            field=models.CharField(blank=True, max_length=50, unique=True),
+        ),
+    ]
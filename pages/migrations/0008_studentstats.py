@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0007_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStats',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('enrolled_courses', models.PositiveIntegerField(default=0, verbose_name='Enrolled Courses')),
+                ('progress_total', models.PositiveIntegerField(default=0, verbose_name='Sum of Progress Percentages')),
+                ('pending_assignments', models.PositiveIntegerField(default=0, verbose_name='Pending Assignments')),
+                ('certificates_count', models.PositiveIntegerField(default=0, verbose_name='Certificates')),
+                ('recent_enrollments', models.JSONField(blank=True, default=list, verbose_name='Recent Enrollments')),
+                ('recent_activities', models.JSONField(blank=True, default=list, verbose_name='Recent Activities')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Student Stats',
+                'verbose_name_plural': 'Student Stats',
+            },
+        ),
+    ]
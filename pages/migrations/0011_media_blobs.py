@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:46
+
+import dictchannel.storage
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0010_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assignmentsubmission',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=dictchannel.storage.blob_storage, upload_to='assignments/'),
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=dictchannel.storage.blob_storage, upload_to='certificates/'),
+        ),
+        migrations.AlterField(
+            model_name='teammember',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=dictchannel.storage.blob_storage, upload_to='team/', verbose_name='Profile Image'),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Storage Name')),
+                ('size', models.BigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='References')),
+                ('uploaded_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Last Uploaded')),
+            ],
+            options={
+                'verbose_name': 'Media Blob',
+                'verbose_name_plural': 'Media Blobs',
+                'indexes': [models.Index(fields=['refcount', 'uploaded_at'], name='pages_media_refcoun_987ea4_idx')],
+            },
+        ),
+    ]
@@ -1,8 +1,45 @@
 from django.db import models
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.contrib.auth.models import AbstractUser
 from django.core.files.storage import default_storage
 
+from dictchannel.storage import blob_storage
+
+def last_sequence_number(queryset, field, prefix):
+    """Highest number already used after ``prefix`` in ``field``, used to seed a new sequence."""
+    values = queryset.filter(**{f'{field}__startswith': prefix}).values_list(field, flat=True)
+    numbers = [int(v[len(prefix):]) for v in values if v[len(prefix):].isdigit()]
+    return max(numbers, default=0)
+
+
+class Sequence(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="Sequence Name")
+    value = models.BigIntegerField(default=0, verbose_name="Last Reserved Value")
+
+    class Meta:
+        verbose_name = "Sequence"
+        verbose_name_plural = "Sequences"
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True, verbose_name="Storage Name")
+    size = models.BigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0, verbose_name="References")
+    uploaded_at = models.DateTimeField(default=timezone.now, verbose_name="Last Uploaded")
+
+    class Meta:
+        verbose_name = "Media Blob"
+        verbose_name_plural = "Media Blobs"
+        indexes = [models.Index(fields=['refcount', 'uploaded_at'])]
+
+    def __str__(self):
+        return self.name
+
+
 class Student(AbstractUser):
     student_id = models.CharField(max_length=20, unique=True, blank=True, verbose_name="Student ID")
     phone = models.CharField(max_length=20, blank=True, verbose_name="Phone Number")
@@ -16,14 +53,14 @@ class Student(AbstractUser):
     def save(self, *args, **kwargs):
         if not self.student_id:
             # Auto-generate student ID: DCT + year + sequential number
+            from .sequences import next_value, student_id_sequence
             year = timezone.now().year
-            last_student = Student.objects.filter(student_id__startswith=f'DCT{year}').order_by('-student_id').first()
-            if last_student:
-                last_num = int(last_student.student_id[7:])  # DCT2024001 -> 001
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            self.student_id = f'DCT{year}{new_num:04d}'
+            prefix = f'DCT{year}'
+            new_num = next_value(
+                student_id_sequence(year),
+                seed=lambda: last_sequence_number(Student.objects.all(), 'student_id', prefix),
+            )
+            self.student_id = f'{prefix}{new_num:04d}'
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -33,7 +70,8 @@ class TeamMember(models.Model):
     name = models.CharField(max_length=100, verbose_name="Full Name")
     designation = models.CharField(max_length=100, verbose_name="Job Title/Designation")
     bio = models.TextField(verbose_name="Biography/Description", blank=True)
-    image = models.ImageField(upload_to='team/', blank=True, null=True, verbose_name="Profile Image")
+    image = models.ImageField(upload_to='team/', storage=blob_storage, blank=True, null=True, verbose_name="Profile Image")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     display_order = models.PositiveIntegerField(default=0, verbose_name="Display Order")
     is_active = models.BooleanField(default=True, verbose_name="Is Active")
     created_at = models.DateTimeField(default=timezone.now, verbose_name="Created At")
@@ -105,7 +143,7 @@ class QuoteSubmission(models.Model):
 class Enrollment(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='enrollments')
     course = models.ForeignKey('courses.Course', on_delete=models.CASCADE, related_name='enrollments')
-    enrolled_at = models.DateTimeField(default=timezone.now)
+    enrolled_at = models.DateTimeField(default=timezone.now, db_index=True)
     progress_percentage = models.IntegerField(default=0)  # 0-100
     is_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -143,8 +181,8 @@ class Assignment(models.Model):
 class AssignmentSubmission(models.Model):
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='submissions')
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='submissions')
-    submitted_at = models.DateTimeField(default=timezone.now)
-    file = models.FileField(upload_to='assignments/', blank=True, null=True)
+    submitted_at = models.DateTimeField(default=timezone.now, db_index=True)
+    file = models.FileField(upload_to='assignments/', storage=blob_storage, blank=True, null=True)
     content = models.TextField(blank=True)
     score = models.IntegerField(null=True, blank=True)
     feedback = models.TextField(blank=True)
@@ -161,14 +199,27 @@ class AssignmentSubmission(models.Model):
 class Certificate(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='certificates')
     course = models.ForeignKey('courses.Course', on_delete=models.CASCADE, related_name='certificates')
-    issued_at = models.DateTimeField(default=timezone.now)
-    certificate_number = models.CharField(max_length=50, unique=True)
-    file = models.FileField(upload_to='certificates/', blank=True, null=True)
+    issued_at = models.DateTimeField(default=timezone.now, db_index=True)
+    certificate_number = models.CharField(max_length=50, unique=True, blank=True)
+    file = models.FileField(upload_to='certificates/', storage=blob_storage, blank=True, null=True)
 
     class Meta:
         verbose_name = "Certificate"
         verbose_name_plural = "Certificates"
 
+    def save(self, *args, **kwargs):
+        if not self.certificate_number:
+            # Auto-generate certificate number: CERT + year + sequential number
+            from .sequences import next_value, certificate_number_sequence
+            year = timezone.now().year
+            prefix = f'CERT{year}'
+            new_num = next_value(
+                certificate_number_sequence(year),
+                seed=lambda: last_sequence_number(Certificate.objects.all(), 'certificate_number', prefix),
+            )
+            self.certificate_number = f'{prefix}{new_num:05d}'
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.student.get_full_name()} - {self.course.title}"
 
@@ -193,7 +244,7 @@ class Message(models.Model):
     recipient = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='received_messages')
     subject = models.CharField(max_length=200)
     content = models.TextField()
-    sent_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(default=timezone.now, db_index=True)
     is_read = models.BooleanField(default=False)
 
     class Meta:
@@ -215,7 +266,7 @@ class Payment(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.CharField(max_length=200)
-    payment_date = models.DateTimeField(default=timezone.now)
+    payment_date = models.DateTimeField(default=timezone.now, db_index=True)
     status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending')
     transaction_id = models.CharField(max_length=100, blank=True, null=True)
     payment_method = models.CharField(max_length=50, blank=True)
@@ -252,4 +303,67 @@ class ServiceInquiry(models.Model):
         ordering = ['-submitted_at']
 
     def __str__(self):
-        return f"{self.name} - {self.service}"
\ No newline at end of file
+        return f"{self.name} - {self.service}"
+
+class OutboxEmail(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead Letter'),
+    ]
+
+    subject = models.CharField(max_length=255, verbose_name="Subject")
+    body = models.TextField(verbose_name="Body")
+    from_email = models.CharField(max_length=255, verbose_name="From")
+    recipients = models.TextField(verbose_name="Recipients")  # Comma separated addresses
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Next Attempt At")
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name="Claimed Until")  # Lease held by a sending worker
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Created At")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Sent At")
+
+    class Meta:
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+    def recipient_list(self):
+        return [r.strip() for r in self.recipients.split(',') if r.strip()]
+
+
+class StudentStats(models.Model):
+    """Denormalised dashboard counters, kept current by the signals in pages.signals."""
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    enrolled_courses = models.PositiveIntegerField(default=0, verbose_name="Enrolled Courses")
+    progress_total = models.PositiveIntegerField(default=0, verbose_name="Sum of Progress Percentages")
+    pending_assignments = models.PositiveIntegerField(default=0, verbose_name="Pending Assignments")
+    certificates_count = models.PositiveIntegerField(default=0, verbose_name="Certificates")
+    recent_enrollments = models.JSONField(default=list, blank=True, verbose_name="Recent Enrollments")
+    recent_activities = models.JSONField(default=list, blank=True, verbose_name="Recent Activities")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+
+    class Meta:
+        verbose_name = "Student Stats"
+        verbose_name_plural = "Student Stats"
+
+    def __str__(self):
+        return f"Stats for {self.student_id}"
+
+    @property
+    def avg_progress(self):
+        if self.enrolled_courses > 0:
+            return self.progress_total // self.enrolled_courses
+        return 0
+
+    def activity_list(self):
+        # Dates are stored as ISO strings in JSON; templates need datetimes for timesince
+        return [dict(activity, date=parse_datetime(activity['date'])) for activity in self.recent_activities]
@@ -0,0 +1,155 @@
+"""
+Transactional email outbox.
+
+Views call ``queue_mail`` inside the same transaction that saves the
+submission, so a row is only queued if the submission is committed.
+The ``send_outbox`` management command drains the queue over a single
+SMTP connection, retrying failures with exponential backoff until the
+message is either sent or moved to the dead-letter state.
+
+Workers may overlap (cron starts one every minute, and ``--loop`` keeps
+one running), so a worker first claims each due row with a conditional
+UPDATE that moves it to ``sending`` under a lease, and only sends the
+rows it won. A row whose lease expired, because its worker died while
+sending, is claimed again; that message may be delivered twice.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+BACKOFF_SECONDS = getattr(settings, 'OUTBOX_BACKOFF_SECONDS', 60)
+BATCH_SIZE = getattr(settings, 'OUTBOX_BATCH_SIZE', 50)
+# How long a claimed row stays reserved for the worker sending it
+LEASE_SECONDS = getattr(settings, 'OUTBOX_LEASE_SECONDS', 60 * 10)
+
+
+def default_from_email():
+    return settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@d-ictchannels.com'
+
+
+def admin_recipients():
+    return [settings.ADMIN_EMAIL] if hasattr(settings, 'ADMIN_EMAIL') else ['admin@d-ictchannels.com']
+
+
+def queue_mail(subject, message, from_email=None, recipient_list=None):
+    """Write an email to the outbox instead of sending it inline."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or default_from_email(),
+        recipients=','.join(recipient_list or admin_recipients()),
+    )
+
+
+def backoff_delay(attempts):
+    # 1x, 2x, 4x, 8x ... the base delay, capped at one day
+    return timedelta(seconds=min(BACKOFF_SECONDS * (2 ** (attempts - 1)), 86400))
+
+
+def claimable(now):
+    """Rows that are due, or whose sending worker's lease has run out."""
+    return OutboxEmail.objects.filter(
+        Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_until__lt=now)
+    )
+
+
+def due_emails(limit=BATCH_SIZE):
+    return claimable(timezone.now()).order_by('next_attempt_at')[:limit]
+
+
+def claim(limit=BATCH_SIZE):
+    """Reserve up to ``limit`` due rows for this worker and return them."""
+    now = timezone.now()
+    locked_until = now + timedelta(seconds=LEASE_SECONDS)
+    claimed = []
+    for email in due_emails(limit):
+        # Another worker may have claimed the row since it was read
+        if claimable(now).filter(pk=email.pk).update(status='sending', locked_until=locked_until):
+            email.status = 'sending'
+            email.locked_until = locked_until
+            claimed.append(email)
+    return claimed
+
+
+def deliver_pending(limit=BATCH_SIZE, connection=None):
+    """
+    Claim the due outbox rows and send them over one reused connection.
+
+    Returns a ``(sent, failed, dead)`` tuple for the batch.
+    """
+    batch = claim(limit)
+    if not batch:
+        return 0, 0, 0
+
+    sent = failed = dead = 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # The mail server is unreachable; count it against every row in the batch
+        for email in batch:
+            if _record_failure(email, e):
+                dead += 1
+            else:
+                failed += 1
+        return sent, failed, dead
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipient_list(),
+                connection=connection,
+            )
+            try:
+                message.send(fail_silently=False)
+            except Exception as e:
+                if _record_failure(email, e):
+                    dead += 1
+                else:
+                    failed += 1
+                continue
+
+            email.status = 'sent'
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.locked_until = None
+            email.last_error = ''
+            email.save(update_fields=['status', 'attempts', 'sent_at', 'locked_until', 'last_error'])
+            sent += 1
+    finally:
+        connection.close()
+
+    return sent, failed, dead
+
+
+def _record_failure(email, error):
+    """Schedule a retry for ``email`` or dead-letter it. Returns True if dead."""
+    email.attempts += 1
+    email.last_error = str(error)
+    email.locked_until = None
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'dead'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'locked_until'])
+    return email.status == 'dead'
+
+
+def requeue(queryset):
+    """Move dead-lettered emails back into the queue."""
+    return queryset.filter(status='dead').update(
+        status='pending',
+        attempts=0,
+        next_attempt_at=timezone.now(),
+    )
@@ -0,0 +1,212 @@
+"""
+Full-page cache for GET requests to the public pages.
+
+Each cached page is keyed by its URL name and path, plus the current
+version of every model tag it depends on. The query string is not part of
+the key (no public view reads it), so ``/?x=<random>`` is served from the
+entry for ``/`` rather than adding one entry per distinct value. Saving or deleting an instance
+of a tracked model bumps that model's tag version, so only the pages that
+declared the dependency miss on their next request.
+
+The pages are the same for every visitor: base.html fetches the login
+state, CSRF token and flash messages from ``session_state`` after load.
+A response is only stored, and marked ``public`` for shared caches, when
+rendering it read neither the session nor a CSRF token.
+
+The tag versions double as the site's content generations: every page
+response carries an ETag and Last-Modified derived from them, and a
+revalidation whose validators still match gets a 304 straight from the
+cache lookup of the versions, before the view runs.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+# How long a proxy or CDN may serve a page without revalidating it
+PAGE_CACHE_SHARED_MAX_AGE = getattr(settings, 'PAGE_CACHE_SHARED_MAX_AGE', 60 * 5)
+GLOBAL_TAG = 'pages'
+
+
+def model_tag(model):
+    return model._meta.label_lower
+
+
+def tag_key(tag):
+    return f'pagetag:{tag}'
+
+
+def tag_versions(tags):
+    keys = [tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A missing version must not collide with one a page was stored under
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*tags):
+    """Invalidate every page that depends on any of ``tags``."""
+    now = time.time_ns()
+    cache.set_many({tag_key(tag): now for tag in tags}, None)
+
+
+def page_key(request, tags):
+    url_name = request.resolver_match.url_name if request.resolver_match else ''
+    path = hashlib.md5(request.path.encode('utf-8')).hexdigest()
+    versions = '.'.join(str(v) for v in tag_versions(tags))
+    return f'page:{url_name}:{path}:{hashlib.md5(versions.encode()).hexdigest()}'
+
+
+def page_validators(request, versions):
+    """ETag and Last-Modified (a timestamp) for a page rendered at tag ``versions``."""
+    state = f"{request.path}:{'.'.join(str(v) for v in versions)}"
+    return f'"{hashlib.md5(state.encode()).hexdigest()}"', max(versions) // 10 ** 9
+
+
+def is_cacheable_request(request):
+    # Deliberately leaves request.user and messages alone: reading them
+    # loads the session and makes the response vary on the cookie
+    return request.method in ('GET', 'HEAD')
+
+
+def is_shared_response(request, response):
+    """Whether ``response`` is the same for every visitor."""
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    session = getattr(request, 'session', None)
+    if session is not None and session.accessed:
+        return False
+    # Set by get_token(), e.g. a template still using {% csrf_token %}
+    return not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+
+
+def _validators(request, versions):
+    if None in versions:
+        # No cache to keep versions in (e.g. the dummy backend)
+        return None
+    return page_validators(request, versions)
+
+
+def _not_modified(request, validators):
+    if validators is None:
+        return None
+    etag, last_modified = validators
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def _add_validators(response, validators):
+    if validators is None:
+        return response
+    etag, last_modified = validators
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Browsers check back every time; shared caches for a few minutes
+    patch_cache_control(response, public=True, max_age=0, s_maxage=PAGE_CACHE_SHARED_MAX_AGE)
+    return response
+
+
+def conditional_page(*models):
+    """
+    Add ETag and Last-Modified to a view's GET responses from the versions
+    of ``models``, and answer matching revalidations with a 304 without
+    calling the view. Works on sync and async views.
+
+        @conditional_page(Event)
+        def events(request): ...
+
+    ``cached_page`` already applies this.
+    """
+    tags = [GLOBAL_TAG] + [model_tag(model) for model in models]
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def _wrapped_view(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return await view_func(request, *args, **kwargs)
+
+                validators = _validators(request, await sync_to_async(tag_versions)(tags))
+                response = _not_modified(request, validators)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if not is_shared_response(request, response):
+                        return response
+                return _add_validators(response, validators)
+        else:
+            def _wrapped_view(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return view_func(request, *args, **kwargs)
+
+                validators = _validators(request, tag_versions(tags))
+                response = _not_modified(request, validators)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                    if not is_shared_response(request, response):
+                        return response
+                return _add_validators(response, validators)
+        return wraps(view_func)(_wrapped_view)
+    return decorator
+
+
+def _hit(cached):
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def cached_page(*models):
+    """
+    Cache a view's GET responses until one of ``models`` changes. Works on
+    sync and async views.
+
+        @cached_page(Course, Service)
+        def home(request): ...
+    """
+    tags = [GLOBAL_TAG] + [model_tag(model) for model in models]
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def _wrapped_view(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return await view_func(request, *args, **kwargs)
+
+                key = await sync_to_async(page_key)(request, tags)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return _hit(cached)
+
+                response = await view_func(request, *args, **kwargs)
+                if is_shared_response(request, response):
+                    await cache.aset(key, (response.content, response['Content-Type']), PAGE_CACHE_TIMEOUT)
+                    response['X-Page-Cache'] = 'miss'
+                return response
+        else:
+            def _wrapped_view(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return view_func(request, *args, **kwargs)
+
+                key = page_key(request, tags)
+                cached = cache.get(key)
+                if cached is not None:
+                    return _hit(cached)
+
+                response = view_func(request, *args, **kwargs)
+                if is_shared_response(request, response):
+                    cache.set(key, (response.content, response['Content-Type']), PAGE_CACHE_TIMEOUT)
+                    response['X-Page-Cache'] = 'miss'
+                return response
+        _wrapped_view = wraps(view_func)(_wrapped_view)
+        _wrapped_view.page_cache_tags = tags
+        return conditional_page(*models)(_wrapped_view)
+    return decorator
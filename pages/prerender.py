@@ -0,0 +1,127 @@
+"""
+Static copies of the public pages for a front proxy to serve.
+
+``prerender`` requests every route from ``pages.routes`` through the real
+views and writes the HTML to ``PRERENDER_ROOT`` as ``<path>/index.html``,
+with ``.gz`` and ``.br`` variants next to it. A proxy can then answer
+anonymous GETs for those paths without reaching Django.
+
+Each page is stored with a fingerprint made from the page-cache versions
+of the models it depends on, the source of its template and the
+templates it extends, and the static and offline-compression manifests.
+Later runs only re-render pages whose fingerprint changed, and remove
+pages whose route has gone, such as a deleted course.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode
+from whitenoise.compress import Compressor
+
+from compressor.storage import default_storage as compressor_storage
+
+from .page_cache import tag_versions
+
+PRERENDER_ROOT = getattr(settings, 'PRERENDER_ROOT', settings.BASE_DIR / 'prerendered')
+MANIFEST_NAME = 'prerender.json'
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def output_path(root, path):
+    """Where the page for URL ``path`` is written below ``root``."""
+    return os.path.join(root, path.strip('/'), 'index.html')
+
+
+def template_chain(name):
+    """Source files of template ``name`` and every template it extends."""
+    files = []
+    while name:
+        template = get_template(name).template
+        files.append(template.origin.name)
+        extends = next((n for n in template.nodelist if isinstance(n, ExtendsNode)), None)
+        name = extends.parent_name.var if extends and isinstance(extends.parent_name.var, str) else None
+    return files
+
+
+def _file_digest(storage, name):
+    try:
+        with storage.open(name) as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (FileNotFoundError, OSError):
+        return ''
+
+
+def build_fingerprint():
+    """Changes whenever collectstatic or compress produce different URLs."""
+    manifest_name = getattr(staticfiles_storage, 'manifest_name', None)
+    return '.'.join([
+        _file_digest(staticfiles_storage, manifest_name) if manifest_name else '',
+        _file_digest(compressor_storage, os.path.join(settings.COMPRESS_OUTPUT_DIR, 'manifest.json')),
+    ])
+
+
+def model_versions(tags):
+    return '.'.join(str(v) for v in tag_versions(tags))
+
+
+def fingerprint(versions, template_name, build):
+    """None when the template cannot be located, so the page is always re-rendered."""
+    digest = hashlib.sha256()
+    digest.update(build.encode())
+    digest.update(versions.encode())
+    try:
+        for path in template_chain(template_name):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    except (TemplateDoesNotExist, OSError, TypeError):
+        return None
+    return digest.hexdigest()
+
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(root, pages):
+    _write(os.path.join(root, MANIFEST_NAME), json.dumps(pages, indent=1, sort_keys=True).encode())
+
+
+def _write(path, content):
+    # Replace the file in one step so the proxy never serves a partial page
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.prerender-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def write_page(root, path, content):
+    target = output_path(root, path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
+    _write(target, content)
+    # Only writes the variants that are actually smaller
+    Compressor(quiet=True).compress(target)
+
+
+def remove_page(root, path):
+    target = output_path(root, path)
+    for name in [target] + [target + suffix for suffix in COMPRESSED_SUFFIXES]:
+        if os.path.exists(name):
+            os.remove(name)
+    directory = os.path.dirname(target)
+    if os.path.normpath(directory) != os.path.normpath(root) and os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
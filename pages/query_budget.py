@@ -0,0 +1,169 @@
+"""
+Per-view SQL query accounting for development and staging.
+
+QueryBudgetMiddleware counts queries and SQL time for every request,
+grouped by URL name, and flags query fingerprints that repeat within one
+request as likely N+1 patterns. GET and HEAD requests to views listed in
+``QUERY_BUDGETS`` that run more queries than allowed (form submissions
+are counted but not budgeted) raise ``QueryBudgetExceeded`` when
+``QUERY_BUDGET_STRICT`` is on (e.g. under tests) and log a warning
+otherwise. The collected stats can be written to a JSON report with
+``write_report`` or the ``query_report`` management command.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = getattr(settings, 'QUERY_N_PLUS_ONE_THRESHOLD', 5)
+
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    """Normalise SQL so queries that differ only in parameters compare equal."""
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _NUMBER_RE.sub('N', sql)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith('PRAGMA'):
+            # Connection setup from dictchannel.db, not part of the view's work
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self):
+        return {sql: n for sql, n in self.fingerprints.items() if n >= N_PLUS_ONE_THRESHOLD}
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.sql_ms = 0.0
+        self.n_plus_one = {}
+
+    def add(self, recorder):
+        self.requests += 1
+        self.queries += recorder.count
+        self.max_queries = max(self.max_queries, recorder.count)
+        self.sql_ms += recorder.duration * 1000
+        for sql, n in recorder.repeated().items():
+            self.n_plus_one[sql] = max(self.n_plus_one.get(sql, 0), n)
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'avg_queries': round(self.queries / self.requests, 2) if self.requests else 0,
+            'max_queries': self.max_queries,
+            'avg_sql_ms': round(self.sql_ms / self.requests, 2) if self.requests else 0,
+            'n_plus_one': dict(sorted(self.n_plus_one.items())),
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_report():
+    with _stats_lock:
+        return {name: stats.as_dict() for name, stats in sorted(_stats.items())}
+
+
+def reset_report():
+    with _stats_lock:
+        _stats.clear()
+
+
+def write_report(path):
+    with open(path, 'w') as f:
+        json.dump(get_report(), f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _record_on(stack, recorder):
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            _record_on(stack, recorder)
+            response = self.get_response(request)
+        return self.account(request, response, recorder)
+
+    async def __acall__(self, request):
+        # Connections are per thread: the wrappers go on the connections of
+        # the thread this request's sync_to_async calls (the ORM's) run in
+        recorder = QueryRecorder()
+        stack = ExitStack()
+        await sync_to_async(_record_on)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.account(request, response, recorder)
+
+    def account(self, request, response, recorder):
+        match = request.resolver_match
+        name = match.view_name if match else '<unresolved>'
+        with _stats_lock:
+            _stats.setdefault(name, ViewStats()).add(recorder)
+
+        response['X-Query-Count'] = str(recorder.count)
+        for sql, n in recorder.repeated().items():
+            logger.warning('Possible N+1 in %s: %d x %s', name, n, sql)
+
+        # The budgets are for rendering a page; POSTs to the same view write
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(name) if request.method in ('GET', 'HEAD') else None
+        if budget is not None and recorder.count > budget:
+            message = f'{name} ran {recorder.count} queries, budget is {budget}'
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
@@ -0,0 +1,33 @@
+"""
+Enumeration of the public pages served by pages.urls.
+
+A route is public when its view is wrapped in ``cached_page``; the
+decorator records the model tags the page depends on, which callers such
+as the query report reuse.
+"""
+
+from django.urls import URLPattern, reverse
+
+from courses.models import Course
+
+from .urls import urlpatterns
+
+
+def public_patterns():
+    """Yield ``(url_name, pattern, tags)`` for every public route."""
+    for pattern in urlpatterns:
+        if isinstance(pattern, URLPattern):
+            tags = getattr(pattern.callback, 'page_cache_tags', None)
+            if tags is not None:
+                yield pattern.name, pattern, tags
+
+
+def public_routes():
+    """Yield ``(url_name, path)`` for every concrete public URL, including each course page."""
+    for name, pattern, tags in public_patterns():
+        if pattern.pattern.converters:
+            if name == 'course_detail':
+                for slug in Course.objects.order_by('slug').values_list('slug', flat=True):
+                    yield name, reverse(name, args=[slug])
+            continue
+        yield name, reverse(name)
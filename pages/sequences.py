@@ -0,0 +1,93 @@
+"""
+Block-allocated sequence generator.
+
+Each named sequence is a row in ``pages_sequence``. A worker reserves a
+block of numbers with a single atomic ``UPDATE ... SET value = value + n``
+and then hands them out from memory, so most IDs cost no database round
+trip at all. Numbers are unique across workers but not gap-free: a block
+that is only partly used when a worker exits is simply skipped.
+
+The reservation runs on the caller's connection, so inside a transaction
+(the admin change form, a view's ``atomic`` block) it only holds if that
+transaction commits. The rest of a new block is therefore kept in memory
+from an ``on_commit`` hook; after a rollback it is dropped and the
+database's counter is the only record, as it should be.
+"""
+
+import os
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Sequence
+
+BLOCK_SIZE = getattr(settings, 'SEQUENCE_BLOCK_SIZE', 20)
+
+_lock = threading.Lock()
+_blocks = {}  # name -> [next value, last reserved value]
+
+
+def _reset_blocks():
+    # A forked worker must not reuse the numbers its parent had reserved
+    global _lock
+    _lock = threading.Lock()
+    _blocks.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_blocks)
+
+
+def reserve_block(name, size, seed=None):
+    """
+    Atomically reserve ``size`` numbers for ``name`` and return the
+    ``(first, last)`` range. ``seed`` is called to find the starting value
+    the first time a sequence is created.
+    """
+    with transaction.atomic():
+        updated = Sequence.objects.filter(name=name).update(value=F('value') + size)
+        if not updated:
+            start = seed() if seed else 0
+            try:
+                with transaction.atomic():
+                    Sequence.objects.create(name=name, value=start + size)
+            except IntegrityError:
+                # Another worker created the row first
+                Sequence.objects.filter(name=name).update(value=F('value') + size)
+        last = Sequence.objects.values_list('value', flat=True).get(name=name)
+    return last - size + 1, last
+
+
+def _keep_block(name, first, last):
+    with _lock:
+        _blocks[name] = [first, last]
+
+
+def next_value(name, seed=None, block_size=None):
+    """Return the next number for ``name``, reserving a new block when needed."""
+    block_size = block_size or BLOCK_SIZE
+    with _lock:
+        block = _blocks.get(name)
+        if block is not None and block[0] <= block[1]:
+            value = block[0]
+            block[0] += 1
+            return value
+
+    # Not under _lock: the caller's transaction may hold the database write
+    # lock that another thread's reservation is waiting for
+    first, last = reserve_block(name, block_size, seed)
+    if first < last:
+        # Runs immediately in autocommit mode, never if the caller rolls back
+        transaction.on_commit(partial(_keep_block, name, first + 1, last))
+    return first
+
+
+def student_id_sequence(year):
+    return f'student_id:DCT{year}'
+
+
+def certificate_number_sequence(year):
+    return f'certificate_number:CERT{year}'
@@ -0,0 +1,210 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from courses.models import Course
+from events.models import Event
+from services.models import Service
+from testimonials.models import Testimonial
+
+from . import blobs, icons, images, page_cache, stats, user_cache
+from .models import Assignment, AssignmentSubmission, Certificate, Enrollment, Student, TeamMember
+
+
+def _previous(sender, instance, *fields):
+    # Snapshot the stored values a save is about to overwrite
+    if instance.pk:
+        return sender.objects.filter(pk=instance.pk).values(*fields).first()
+    return None
+
+
+def _student_deleted(kwargs):
+    # The stats row goes away with the student; nothing to maintain
+    return isinstance(kwargs.get('origin'), Student)
+
+
+@receiver(pre_save, sender=Enrollment)
+def enrollment_pre_save(sender, instance, **kwargs):
+    instance._previous = _previous(sender, instance, 'student_id', 'progress_percentage')
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        stats.adjust(instance.student_id, refresh_enrollments=True,
+                     enrolled_courses=1, progress_total=instance.progress_percentage)
+    elif previous['student_id'] != instance.student_id:
+        stats.rebuild(previous['student_id'])
+        stats.rebuild(instance.student_id)
+    else:
+        stats.adjust(instance.student_id, refresh_enrollments=True,
+                     progress_total=instance.progress_percentage - previous['progress_percentage'])
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    if _student_deleted(kwargs):
+        return
+    stats.adjust(instance.student_id, refresh_enrollments=True,
+                 enrolled_courses=-1, progress_total=-instance.progress_percentage)
+
+
+def _is_open(status):
+    return 1 if status in stats.OPEN_SUBMISSION_STATUSES else 0
+
+
+@receiver(pre_save, sender=AssignmentSubmission)
+def submission_pre_save(sender, instance, **kwargs):
+    instance._previous = _previous(sender, instance, 'student_id', 'status')
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def submission_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        stats.adjust(instance.student_id, refresh_activities=True,
+                     pending_assignments=_is_open(instance.status))
+    elif previous['student_id'] != instance.student_id:
+        stats.rebuild(previous['student_id'])
+        stats.rebuild(instance.student_id)
+    else:
+        stats.adjust(instance.student_id, refresh_activities=True,
+                     pending_assignments=_is_open(instance.status) - _is_open(previous['status']))
+
+
+@receiver(post_delete, sender=AssignmentSubmission)
+def submission_deleted(sender, instance, **kwargs):
+    if _student_deleted(kwargs):
+        return
+    stats.adjust(instance.student_id, refresh_activities=True,
+                 pending_assignments=-_is_open(instance.status))
+
+
+@receiver(pre_save, sender=Certificate)
+def certificate_pre_save(sender, instance, **kwargs):
+    instance._previous = _previous(sender, instance, 'student_id')
+
+
+@receiver(post_save, sender=Certificate)
+def certificate_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        stats.adjust(instance.student_id, refresh_activities=True, certificates_count=1)
+    elif previous['student_id'] != instance.student_id:
+        stats.rebuild(previous['student_id'])
+        stats.rebuild(instance.student_id)
+    else:
+        stats.adjust(instance.student_id, refresh_activities=True)
+
+
+@receiver(post_delete, sender=Certificate)
+def certificate_deleted(sender, instance, **kwargs):
+    if _student_deleted(kwargs):
+        return
+    stats.adjust(instance.student_id, refresh_activities=True, certificates_count=-1)
+
+
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=Assignment)
+def title_pre_save(sender, instance, **kwargs):
+    instance._previous_title = (_previous(sender, instance, 'title') or {}).get('title')
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, **kwargs):
+    # The recent lists copy course titles; refresh them on a rename
+    if created or getattr(instance, '_previous_title', None) in (None, instance.title):
+        return
+    stats.refresh_recent(
+        Enrollment.objects.filter(course=instance).values_list('student_id', flat=True),
+        enrollments=True,
+    )
+    stats.refresh_recent(
+        Certificate.objects.filter(course=instance).values_list('student_id', flat=True),
+        activities=True,
+    )
+
+
+@receiver(post_save, sender=Assignment)
+def assignment_saved(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_previous_title', None) in (None, instance.title):
+        return
+    stats.refresh_recent(
+        AssignmentSubmission.objects.filter(assignment=instance).values_list('student_id', flat=True),
+        activities=True,
+    )
+
+
+@receiver(pre_save, sender=Student)
+def student_pre_save(sender, instance, update_fields=None, **kwargs):
+    # Logins only save last_login; skip the lookup unless the password can change
+    if update_fields is None or 'password' in update_fields:
+        instance._previous_password = (_previous(sender, instance, 'password') or {}).get('password')
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def evict_cached_user(sender, instance, **kwargs):
+    user_cache.evict(instance, getattr(instance, '_previous_password', None))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def purge_dependent_pages(sender, **kwargs):
+    page_cache.bump(page_cache.model_tag(sender))
+
+
+@receiver(post_save, sender=Testimonial)
+@receiver(post_save, sender=TeamMember)
+def queue_image_variants(sender, instance, **kwargs):
+    for field_name in images.IMAGE_FIELDS[sender]:
+        if not images.is_current(instance, field_name):
+            images.schedule(instance, field_name)
+
+
+@receiver(post_save, sender=Service)
+def rebuild_icon_subset(sender, instance, **kwargs):
+    if not icons.covers(instance.icon):
+        icons.schedule()
+
+
+def _blob_names(instance, field_names):
+    return {name: getattr(instance, name).name or '' for name in field_names}
+
+
+@receiver(pre_save, sender=TeamMember)
+@receiver(pre_save, sender=Testimonial)
+@receiver(pre_save, sender=AssignmentSubmission)
+@receiver(pre_save, sender=Certificate)
+def blob_pre_save(sender, instance, **kwargs):
+    instance._previous_blobs = _previous(sender, instance, *blobs.BLOB_FIELDS[sender]) or {}
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_save, sender=Testimonial)
+@receiver(post_save, sender=AssignmentSubmission)
+@receiver(post_save, sender=Certificate)
+def blob_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_blobs', {})
+    current = _blob_names(instance, blobs.BLOB_FIELDS[sender])
+    changed = [name for name in current if current[name] != (previous.get(name) or '')]
+    blobs.adjust(
+        added=[current[name] for name in changed if current[name]],
+        removed=[previous[name] for name in changed if previous.get(name)],
+    )
+
+
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_delete, sender=Testimonial)
+@receiver(post_delete, sender=AssignmentSubmission)
+@receiver(post_delete, sender=Certificate)
+def blob_deleted(sender, instance, **kwargs):
+    blobs.adjust(removed=[n for n in _blob_names(instance, blobs.BLOB_FIELDS[sender]).values() if n])
@@ -0,0 +1,178 @@
+"""
+Sitemaps built from the public routes and the course catalogue.
+
+``/sitemap.xml`` is an index of the ``pages`` and ``courses`` sections,
+each split into files of ``SITEMAP_LIMIT`` URLs. A page's ``lastmod`` is
+the latest ``updated_at`` of the models it declares through
+``cached_page``; pages that depend on no model have none.
+
+Every URL is built on ``SITE_DOMAIN`` rather than the request's Host
+header, which is not validated (``ALLOWED_HOSTS = ['*']``) and would
+otherwise end up in the shared cache entry. Without ``SITE_DOMAIN`` the
+request's host is used and becomes part of the cache key.
+
+Rendered sitemaps are stored gzipped in the cache under the same tag
+versions as the page cache, so saving a course, event or service (or
+running ``purge_page_cache``) invalidates them. Responses carry an ETag and
+Last-Modified and conditional requests get a 304.
+"""
+
+import gzip
+import hashlib
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date
+
+from courses.models import Course
+
+from .page_cache import GLOBAL_TAG, PAGE_CACHE_TIMEOUT, tag_versions
+from .routes import public_patterns
+
+SITEMAP_LIMIT = getattr(settings, 'SITEMAP_LIMIT', 50000)
+SITE_DOMAIN = getattr(settings, 'SITE_DOMAIN', None)
+
+
+def _tag_model(tag):
+    try:
+        return apps.get_model(tag)
+    except (LookupError, ValueError):
+        return None
+
+
+def _latest_update(model, memo):
+    if model not in memo:
+        has_timestamp = any(f.name == 'updated_at' for f in model._meta.concrete_fields)
+        memo[model] = model.objects.aggregate(latest=Max('updated_at'))['latest'] if has_timestamp else None
+    return memo[model]
+
+
+def site_domain(request):
+    return SITE_DOMAIN or get_current_site(request).domain
+
+
+class SiteSitemap(Sitemap):
+    protocol = 'https'
+    limit = SITEMAP_LIMIT
+
+    def get_domain(self, site=None):
+        return SITE_DOMAIN or super().get_domain(site)
+
+
+class PageSitemap(SiteSitemap):
+    def items(self):
+        memo, items = {}, []
+        for name, pattern, tags in public_patterns():
+            if pattern.pattern.converters:
+                continue
+            updates = [_latest_update(m, memo) for m in map(_tag_model, tags) if m is not None]
+            items.append((name, max(filter(None, updates), default=None)))
+        return items
+
+    def location(self, item):
+        return reverse(item[0])
+
+    def lastmod(self, item):
+        return item[1]
+
+    def get_latest_lastmod(self):
+        return max(filter(None, (lastmod for _, lastmod in self.items())), default=None)
+
+
+class CourseSitemap(SiteSitemap):
+    def items(self):
+        return Course.objects.order_by('slug').only('slug', 'updated_at')
+
+    def location(self, course):
+        return reverse('course_detail', args=[course.slug])
+
+    def lastmod(self, course):
+        return course.updated_at
+
+    def get_latest_lastmod(self):
+        return Course.objects.aggregate(latest=Max('updated_at'))['latest']
+
+
+SITEMAPS = {
+    'pages': PageSitemap,
+    'courses': CourseSitemap,
+}
+
+
+def sitemap_tags():
+    """Every page cache tag a sitemap's content or lastmod can depend on."""
+    return sorted({GLOBAL_TAG} | {tag for _, _, tags in public_patterns() for tag in tags})
+
+
+@sitemap_views.x_robots_tag
+def sitemap_index(request, sitemaps, sitemap_url_name='sitemap_section'):
+    """django.contrib.sitemaps.views.index, with the section URLs on ``site_domain``."""
+    domain = site_domain(request)
+    items, lastmods = [], []
+    for section, site in sitemaps.items():
+        site = site()
+        url = f'{site.protocol}://{domain}{reverse(sitemap_url_name, kwargs={"section": section})}'
+        lastmod = site.get_latest_lastmod()
+        lastmods.append(lastmod)
+        items.append(sitemap_views.SitemapIndexItem(url, lastmod))
+        for page in range(2, site.paginator.num_pages + 1):
+            items.append(sitemap_views.SitemapIndexItem(f'{url}?p={page}', lastmod))
+    headers = None
+    if lastmods and all(lastmods):
+        headers = {'Last-Modified': http_date(max(lastmods).timestamp())}
+    return TemplateResponse(request, 'sitemap_index.xml', {'sitemaps': items},
+                            content_type='application/xml', headers=headers)
+
+
+def cached_sitemap(view):
+    """Serve ``view``'s output from a gzipped cache entry, answering conditional requests."""
+    @wraps(view)
+    def _wrapped_view(request, **kwargs):
+        versions = '.'.join(str(v) for v in tag_versions(sitemap_tags()))
+        # Only the page number changes the output; other query parameters
+        # must not create entries of their own
+        host = '' if SITE_DOMAIN else site_domain(request)
+        page = request.GET.get('p', '')
+        key = 'sitemap:' + hashlib.md5(f'{host}:{request.path}:{page}:{versions}'.encode()).hexdigest()
+        entry = cache.get(key)
+        if entry is None:
+            response = view(request, sitemaps=SITEMAPS, **kwargs)
+            response.render()
+            if response.status_code != 200:
+                return response
+            etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+            entry = (gzip.compress(response.content, mtime=0), etag, response.get('Last-Modified'))
+            cache.set(key, entry, PAGE_CACHE_TIMEOUT)
+
+        body, etag, last_modified = entry
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified and parse_http_date(last_modified),
+        )
+        if not_modified is not None:
+            response = not_modified
+        elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(body, content_type='application/xml')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(body), content_type='application/xml')
+        response['ETag'] = etag
+        response['X-Robots-Tag'] = 'noindex, noodp, noarchive'
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+    return _wrapped_view
+
+
+index = cached_sitemap(sitemap_index)
+section = cached_sitemap(sitemap_views.sitemap)
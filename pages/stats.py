@@ -0,0 +1,115 @@
+"""
+Maintenance of the materialised StudentStats rows.
+
+Counters are adjusted incrementally with F() expressions from the model
+signals; the short "recent" lists are re-read (a handful of indexed rows)
+whenever something that feeds them changes, including a renamed course or
+assignment, whose title they copy. Anything that bypasses signals, such
+as QuerySet.update(), can leave a row out of date; the
+rebuild_student_stats command recomputes rows from scratch.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import AssignmentSubmission, Certificate, Enrollment, StudentStats
+
+OPEN_SUBMISSION_STATUSES = ['pending', 'submitted']
+
+
+def recent_enrollments(student_id):
+    enrollments = Enrollment.objects.filter(
+        student_id=student_id
+    ).select_related('course').order_by('-enrolled_at')[:2]
+    return [
+        {'course_title': e.course.title, 'progress_percentage': e.progress_percentage}
+        for e in enrollments
+    ]
+
+
+def recent_activities(student_id):
+    activities = []
+    recent_submissions = AssignmentSubmission.objects.filter(
+        student_id=student_id
+    ).select_related('assignment').order_by('-submitted_at')[:3]
+    for sub in recent_submissions:
+        activities.append({
+            'type': 'assignment',
+            'title': f"Submitted: {sub.assignment.title}",
+            'date': sub.submitted_at.isoformat(),
+            'icon': 'fas fa-check-circle',
+            'color': 'bg-success'
+        })
+
+    recent_certificates = Certificate.objects.filter(
+        student_id=student_id
+    ).select_related('course').order_by('-issued_at')[:2]
+    for cert in recent_certificates:
+        activities.append({
+            'type': 'certificate',
+            'title': f"Earned Certificate: {cert.course.title}",
+            'date': cert.issued_at.isoformat(),
+            'icon': 'fas fa-certificate',
+            'color': 'bg-warning'
+        })
+
+    activities.sort(key=lambda x: x['date'], reverse=True)
+    return activities[:5]
+
+
+def rebuild(student_id):
+    """Recompute every field of a student's stats row from the source tables."""
+    enrollments = Enrollment.objects.filter(student_id=student_id)
+    stats, _ = StudentStats.objects.update_or_create(
+        student_id=student_id,
+        defaults={
+            'enrolled_courses': enrollments.count(),
+            'progress_total': enrollments.aggregate(total=Sum('progress_percentage'))['total'] or 0,
+            'pending_assignments': AssignmentSubmission.objects.filter(
+                student_id=student_id, status__in=OPEN_SUBMISSION_STATUSES
+            ).count(),
+            'certificates_count': Certificate.objects.filter(student_id=student_id).count(),
+            'recent_enrollments': recent_enrollments(student_id),
+            'recent_activities': recent_activities(student_id),
+        },
+    )
+    return stats
+
+
+def get_stats(student):
+    try:
+        return StudentStats.objects.get(student=student)
+    except StudentStats.DoesNotExist:
+        return rebuild(student.pk)
+
+
+async def aget_stats(student):
+    try:
+        return await StudentStats.objects.aget(student=student)
+    except StudentStats.DoesNotExist:
+        return await sync_to_async(rebuild)(student.pk)
+
+
+def adjust(student_id, refresh_enrollments=False, refresh_activities=False, **deltas):
+    """
+    Apply counter deltas such as ``enrolled_courses=1`` to a stats row and
+    refresh the recent lists if asked. Falls back to a full rebuild when
+    the row does not exist yet.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if refresh_enrollments:
+        updates['recent_enrollments'] = recent_enrollments(student_id)
+    if refresh_activities:
+        updates['recent_activities'] = recent_activities(student_id)
+    if not updates:
+        return
+    updates['updated_at'] = timezone.now()
+    if not StudentStats.objects.filter(student_id=student_id).update(**updates):
+        rebuild(student_id)
+
+
+def refresh_recent(student_ids, enrollments=False, activities=False):
+    """Re-read the recent lists of each of ``student_ids``."""
+    for student_id in set(student_ids):
+        adjust(student_id, refresh_enrollments=enrollments, refresh_activities=activities)
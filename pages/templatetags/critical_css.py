@@ -0,0 +1,45 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from pages.critical_css import bundle_urls, critical_manifest
+
+register = template.Library()
+
+
+class CriticalCssNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        output = self.nodelist.render(context)
+        name = getattr(context.template, 'name', None)
+        request = context.get('request')
+        if request is not None:
+            # Lets build_critical_css tell which template a route rendered
+            request.critical_css_template = name
+
+        entry = critical_manifest().get(name)
+        urls = bundle_urls(output)
+        if not entry or not urls or urls != entry['bundles']:
+            return output
+        links = format_html_join(
+            '',
+            '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            '<noscript><link rel="stylesheet" href="{0}"></noscript>',
+            ((url,) for url in urls),
+        )
+        return format_html('<style>{}</style>{}', mark_safe(entry['css']), links)
+
+
+@register.tag
+def critical_css(parser, token):
+    """
+    Inline the page template's critical CSS and load the stylesheets in the
+    block asynchronously, once ``build_critical_css`` has run:
+
+        {% critical_css %}{% compress css %}...{% endcompress %}{% endcritical_css %}
+    """
+    nodelist = parser.parse(('endcritical_css',))
+    parser.delete_first_token()
+    return CriticalCssNode(nodelist)
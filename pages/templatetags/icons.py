@@ -0,0 +1,20 @@
+from django import template
+from django.utils.html import format_html
+
+from pages import icons
+
+register = template.Library()
+
+
+@register.simple_tag
+def icon_stylesheet(fallback_url):
+    """
+    Link the Font Awesome subset built by ``build_icons``, or
+    ``fallback_url`` (the full stylesheet) until one exists or while this
+    process predates a rebuild it cannot serve:
+
+        {% icon_stylesheet "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" %}
+    """
+    manifest = icons.servable()
+    url = icons.static_url(manifest['css']) if manifest else fallback_url
+    return format_html('<link href="{}" rel="stylesheet">', url)
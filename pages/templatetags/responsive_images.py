@@ -0,0 +1,73 @@
+from urllib.parse import urljoin
+
+from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from dictchannel.storage import image_manifest
+from pages.images import get_variants
+
+register = template.Library()
+
+
+def _srcset(url, names):
+    return ', '.join(f'{url(name)} {width}w' for width, name in sorted(names.items(), key=lambda i: int(i[0])))
+
+
+def _attrs(attrs):
+    # Template keyword arguments cannot contain hyphens: data_wow_delay -> data-wow-delay
+    return flatatt({name.replace('_', '-'): value for name, value in attrs.items()})
+
+
+def _static_url(name):
+    # Variants carry their content hash already and are not in any hashed-name manifest
+    return urljoin(settings.STATIC_URL, name)
+
+
+@register.simple_tag
+def responsive_image(fieldfile, sizes='100vw', **attrs):
+    """
+    Render ``fieldfile`` as a ``<picture>`` with WebP and JPEG ``srcset``s,
+    or as a plain ``<img>`` until its derivatives have been built.
+
+        {% responsive_image member.image sizes="(min-width: 992px) 33vw, 100vw" alt=member.name class="w-100" %}
+    """
+    variants = get_variants(fieldfile)
+    if not variants.get('jpg'):
+        return format_html('<img src="{}"{}>', fieldfile.url, _attrs(attrs))
+
+    largest = max(variants['jpg'], key=int)
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    attrs['width'] = largest
+    attrs['height'] = round(variants['height'] * int(largest) / variants['width'])
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}"><img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        _srcset(default_storage.url, variants['webp']), sizes,
+        default_storage.url(variants['jpg'][largest]), _srcset(default_storage.url, variants['jpg']), sizes,
+        _attrs(attrs),
+    )
+
+
+@register.simple_tag
+def responsive_static(path, sizes='100vw', **attrs):
+    """
+    Render a static image as a ``<picture>`` using the variants collectstatic
+    built for it, or as a plain ``<img>`` if there are none.
+
+        {% responsive_static 'img/class.jpg' sizes="(min-width: 992px) 50vw, 100vw" alt="..." class="w-100" %}
+    """
+    entry = image_manifest().get(path)
+    if not entry:
+        return format_html('<img src="{}"{}>', static(path), _attrs(attrs))
+
+    largest = max(entry['fallback'], key=int)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}"><img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        _srcset(_static_url, entry['webp']), sizes,
+        _static_url(entry['fallback'][largest]), _srcset(_static_url, entry['fallback']), sizes,
+        _attrs(attrs),
+    )
@@ -0,0 +1,61 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+register = template.Library()
+
+# Vendor script modules in load order: name -> (modules it needs, static files)
+VENDOR_JS = {
+    'easing': ([], ['lib/easing/easing.min.js']),
+    'wow': ([], ['lib/wow/wow.min.js']),
+    'waypoints': ([], ['lib/waypoints/waypoints.min.js']),
+    'counterup': (['waypoints'], ['lib/counterup/counterup.min.js']),
+    'owlcarousel': ([], ['lib/owlcarousel/owl.carousel.min.js']),
+}
+
+
+def resolve(modules):
+    """``modules`` plus everything they need, once each, in ``VENDOR_JS`` order."""
+    wanted, pending = set(), list(modules)
+    while pending:
+        name = pending.pop()
+        if name not in VENDOR_JS:
+            raise template.TemplateSyntaxError(
+                f"Unknown vendor_js module {name!r}; choose from {', '.join(VENDOR_JS)}."
+            )
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(VENDOR_JS[name][0])
+    return [name for name in VENDOR_JS if name in wanted]
+
+
+class VendorJsNode(template.Node):
+    def __init__(self, modules, nodelist):
+        self.modules = modules
+        self.nodelist = nodelist
+
+    def render(self, context):
+        # The block lists extra module names, e.g. a child template's override
+        modules = [m.resolve(context) for m in self.modules] + self.nodelist.render(context).split()
+        return format_html_join(
+            '\n', '<script src="{}"></script>',
+            ((static(path),) for name in resolve(modules) for path in VENDOR_JS[name][1]),
+        )
+
+
+@register.tag
+def vendor_js(parser, token):
+    """
+    Emit ``<script>`` tags for the named vendor modules, the names listed in
+    the tag's body and their dependencies. Used inside base.html's
+    ``{% compress js %}`` block around a ``{% block vendor_js %}`` that page
+    templates override with the extra modules they use, so each distinct
+    combination is compressed into one content-hashed bundle:
+
+        {% vendor_js 'easing' 'wow' %}{% block vendor_js %}{% endblock %}{% endvendor_js %}
+        {% block vendor_js %}counterup{% endblock %}
+    """
+    modules = [parser.compile_filter(bit) for bit in token.split_contents()[1:]]
+    nodelist = parser.parse(('endvendor_js',))
+    parser.delete_first_token()
+    return VendorJsNode(modules, nodelist)
@@ -0,0 +1,64 @@
+from urllib.parse import parse_qs
+
+from django.contrib import admin
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from pages.admin import MessageAdmin
+from pages.models import Message, Student
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Student.objects.create_superuser('admin', 'admin@example.com', 'pw12345678')
+        sent_at = timezone.now()
+        # Ties on the ordering field are broken by the pk
+        Message.objects.bulk_create([
+            Message(sender=cls.user, recipient=cls.user, subject=f'Message {n}', content='Hi',
+                    sent_at=sent_at if n % 3 else sent_at - timezone.timedelta(days=n))
+            for n in range(12)
+        ])
+
+    def walk(self, ordering):
+        model_admin = MessageAdmin(Message, admin.site)
+        model_admin.ordering = ordering
+        model_admin.list_per_page = 5
+        seen, params = [], {}
+        while True:
+            request = RequestFactory().get('/admin/pages/message/', params)
+            request.user = self.user
+            cl = model_admin.changelist_view(request).context_data['cl']
+            seen += [message.pk for message in cl.result_list]
+            if not cl.keyset_next_url:
+                return seen
+            params = {k: v[0] for k, v in parse_qs(cl.keyset_next_url.lstrip('?')).items()}
+
+    def test_load_more_visits_every_row_once(self):
+        for ordering in (['sent_at'], ['-sent_at'], ['sent_at', 'pk'], ['-sent_at', '-pk']):
+            with self.subTest(ordering):
+                expected = list(Message.objects.order_by(*ordering, '-pk').values_list('pk', flat=True))
+                self.assertEqual(self.walk(ordering), expected)
+
+    def changelist(self, params):
+        request = RequestFactory().get('/admin/pages/message/', params)
+        request.user = self.user
+        model_admin = MessageAdmin(Message, admin.site)
+        model_admin.list_per_page = 5
+        return model_admin.changelist_view(request)
+
+    def test_message_bodies_are_searched_on_request(self):
+        Message.objects.create(sender=self.user, recipient=self.user, subject='Invoice', content='needle in here')
+        self.assertEqual(len(self.changelist({'q': 'needle'}).context_data['cl'].result_list), 0)
+        results = self.changelist({'q': 'needle', 'search_bodies': '1'}).context_data['cl'].result_list
+        self.assertEqual([m.subject for m in results], ['Invoice'])
+
+    def test_count_after_a_cursor_is_labelled_as_the_table_size(self):
+        first = self.changelist({})
+        self.assertFalse(first.context_data['cl'].keyset_cursor)
+        params = {k: v[0] for k, v in parse_qs(first.context_data['cl'].keyset_next_url.lstrip('?')).items()}
+        response = self.changelist(params)
+        cl = response.context_data['cl']
+        self.assertTrue(cl.keyset_cursor)
+        self.assertEqual(cl.result_count, 12)
+        self.assertIn('About 12 Messages in the table', response.render().content.decode())
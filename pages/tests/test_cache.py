@@ -0,0 +1,92 @@
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from dictchannel.cache import SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'cache.sqlite3'
+
+    def make_cache(self, **options):
+        return SQLiteCache(self.path, {'OPTIONS': options})
+
+    def test_ints_outside_the_column_range_are_pickled(self):
+        cache = self.make_cache()
+        for value in (2 ** 63, -2 ** 63 - 1, 2 ** 63 - 1, 10 ** 30):
+            cache.set('n', value)
+            self.assertEqual(cache.get('n'), value)
+
+    def test_incr_runs_on_native_ints(self):
+        cache = self.make_cache()
+        cache.set('n', 1)
+        self.assertEqual(cache.incr('n', 5), 6)
+        self.assertEqual(cache.get('n'), 6)
+
+    def test_incr_past_the_column_range_raises(self):
+        cache = self.make_cache()
+        cache.set('n', 2 ** 63 - 2)
+        self.assertEqual(cache.incr('n'), 2 ** 63 - 1)
+        with self.assertRaises(ValueError):
+            cache.incr('n')
+        self.assertEqual(cache.get('n'), 2 ** 63 - 1)
+        cache.set('m', -2 ** 63 + 1)
+        with self.assertRaises(ValueError):
+            cache.decr('m', 2)
+        self.assertEqual(cache.get('m'), -2 ** 63 + 1)
+        with self.assertRaises(ValueError):
+            cache.incr('m', 2 ** 64)
+
+    def test_incr_errors(self):
+        cache = self.make_cache()
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+        cache.set('s', 'text')
+        with self.assertRaises(TypeError):
+            cache.incr('s')
+
+    def test_delete_tags(self):
+        cache = self.make_cache()
+        cache.set('a', 1, tags=['course:1'])
+        cache.set_many({'b': 2, 'c': 3}, tags=['course:1', 'page'])
+        cache.add('d', 4, tags=['page'])
+        cache.set('e', 5)
+        self.assertEqual(cache.delete_tags('course:1'), 3)
+        self.assertEqual(cache.get_many(['a', 'b', 'c', 'd', 'e']), {'d': 4, 'e': 5})
+        cache.delete('d')
+        self.assertEqual(cache.delete_tags('page'), 0)
+        self.assertEqual(cache._db.execute('SELECT COUNT(*) FROM cache_tag').fetchone()[0], 0)
+
+    def test_read_does_not_wait_for_a_writer(self):
+        cache = self.make_cache(TOUCH_INTERVAL=0, BUSY_TIMEOUT=5)
+        cache.set('key', 'value')
+        writer = sqlite3.connect(self.path, isolation_level=None)
+        writer.execute('BEGIN IMMEDIATE')
+        try:
+            start = time.perf_counter()
+            self.assertEqual(cache.get('key'), 'value')
+            self.assertLess(time.perf_counter() - start, 1)
+        finally:
+            writer.execute('ROLLBACK')
+            writer.close()
+
+    def count(self, cache):
+        return cache._db.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+
+    def test_cull_keeps_the_entry_limit(self):
+        cache = self.make_cache(MAX_ENTRIES=10, CULL_FREQUENCY=2, CULL_PROBABILITY=1)
+        for n in range(30):
+            cache.set(f'key{n}', n)
+        self.assertLessEqual(self.count(cache), 10)
+
+    def test_cull_only_checks_on_a_share_of_writes(self):
+        cache = self.make_cache(MAX_ENTRIES=10, CULL_PROBABILITY=0)
+        for n in range(30):
+            cache.set(f'key{n}', n)
+        self.assertEqual(self.count(cache), 30)
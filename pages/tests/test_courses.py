@@ -0,0 +1,23 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from courses.models import Course
+
+
+class CourseSlugTests(TestCase):
+    def test_update_fields_saves_the_new_slug(self):
+        course = Course.objects.create(title='Web Design', description='About it')
+        course.title = 'Graphic Design'
+        course.save(update_fields=['title'])
+        course.refresh_from_db()
+        self.assertEqual(course.slug, 'graphic-design')
+
+    def test_unchanged_slug_is_not_written(self):
+        course = Course.objects.create(title='Web Design', description='About it', link='web')
+        course.title = 'Graphic Design'
+        with CaptureQueriesContext(connection) as queries:
+            course.save(update_fields=['title'])
+        update, = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertNotIn('"slug"', update)
+        self.assertEqual(Course.objects.get(pk=course.pk).slug, 'web')
@@ -0,0 +1,22 @@
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from dictchannel.db import DEFAULT_PRAGMAS, configure_sqlite
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    databases = {'default'}
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            return cursor.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_defaults_apply_without_the_setting(self):
+        configure_sqlite(None, connection)
+        self.assertEqual(self.pragma('cache_size'), DEFAULT_PRAGMAS['cache_size'])
+
+    def test_setting_replaces_the_defaults(self):
+        with override_settings(SQLITE_PRAGMAS={'cache_size': -1000}):
+            configure_sqlite(None, connection)
+        self.addCleanup(configure_sqlite, None, connection)
+        self.assertEqual(self.pragma('cache_size'), -1000)
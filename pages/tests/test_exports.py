@@ -0,0 +1,48 @@
+import csv
+import io
+
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+
+from pages.exports import export_csv, stream_export
+from pages.models import ContactSubmission
+
+
+class CsvExportTests(TestCase):
+    def export(self):
+        data = b''.join(stream_export(ContactSubmission.objects.all())).decode()
+        return list(csv.DictReader(io.StringIO(data)))
+
+    def test_formulas_are_escaped(self):
+        ContactSubmission.objects.create(
+            fname='=HYPERLINK("http://example.com")', email='a@example.com', phone='+44 20 7946 0000',
+            subject='@SUM(A1:A2)', message='-1+1',
+        )
+        row, = self.export()
+        self.assertEqual(row['fname'], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(row['phone'], "'+44 20 7946 0000")
+        self.assertEqual(row['subject'], "'@SUM(A1:A2)")
+        self.assertEqual(row['message'], "'-1+1")
+
+    def test_plain_text_is_unchanged(self):
+        ContactSubmission.objects.create(fname='Ada', email='a@example.com', phone='020', subject='Hi', message='a=b')
+        row, = self.export()
+        self.assertEqual((row['fname'], row['message'], row['is_read']), ('Ada', 'a=b', 'False'))
+
+
+class ExportResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(5):
+            ContactSubmission.objects.create(fname=f'Ada {n}', email='a@example.com', phone='0', subject='Hi', message='')
+
+    def test_wsgi_streams_a_sync_iterator(self):
+        response = export_csv(None, RequestFactory().get('/'), ContactSubmission.objects.all())
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 6)
+
+    async def test_asgi_streams_an_async_iterator(self):
+        response = export_csv(None, AsyncRequestFactory().get('/'), ContactSubmission.objects.all())
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.splitlines()), 6)
+        self.assertIn(b'Ada 4', content)
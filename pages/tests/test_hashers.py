@@ -0,0 +1,44 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from pages.hashers import MINIMUM_COSTS, TunedPBKDF2PasswordHasher, with_cost
+from pages.management.commands import benchmark_hashers
+
+
+class HasherTests(SimpleTestCase):
+    def encode(self, iterations):
+        hasher = with_cost(TunedPBKDF2PasswordHasher, iterations)
+        return hasher.encode('secret', hasher.salt())
+
+    def test_weaker_hashes_are_upgraded(self):
+        self.assertTrue(with_cost(TunedPBKDF2PasswordHasher, 2000).must_update(self.encode(1000)))
+
+    def test_stronger_hashes_are_not_downgraded(self):
+        self.assertFalse(with_cost(TunedPBKDF2PasswordHasher, 1000).must_update(self.encode(2000)))
+        self.assertFalse(with_cost(TunedPBKDF2PasswordHasher, 1000).must_update(self.encode(1000)))
+
+    def benchmark(self, ms, candidates):
+        stdout, stderr = StringIO(), StringIO()
+        with mock.patch.object(benchmark_hashers, 'CANDIDATES', candidates), \
+                mock.patch.object(benchmark_hashers.Command, 'measure', return_value=ms) as measure:
+            call_command('benchmark_hashers', stdout=stdout, stderr=stderr)
+        return [h.iterations for (h, _), _ in measure.call_args_list], stdout.getvalue(), stderr.getvalue()
+
+    def test_never_recommends_below_the_minimum(self):
+        floor = MINIMUM_COSTS['pbkdf2_sha256']
+        timed, stdout, _ = self.benchmark(1.0, [(TunedPBKDF2PasswordHasher, [floor // 4, floor // 2, floor])])
+        self.assertEqual(timed, [floor])
+        self.assertIn(f"{{'pbkdf2_sha256': {floor}}}", stdout)
+
+    def test_refuses_when_the_minimum_misses_the_target(self):
+        floor = MINIMUM_COSTS['pbkdf2_sha256']
+        _, stdout, stderr = self.benchmark(10_000.0, [(TunedPBKDF2PasswordHasher, [floor // 2, floor])])
+        self.assertNotIn('PASSWORD_HASHER_COSTS', stdout)
+        self.assertIn('minimum cost', stderr)
+
+    def test_candidates_start_at_the_minimum(self):
+        for hasher_class, costs in benchmark_hashers.CANDIDATES:
+            self.assertGreaterEqual(min(costs), MINIMUM_COSTS[hasher_class.algorithm])
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.test import TestCase
+
+from pages import icons
+from services.models import Service
+
+
+class IconSubsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        static_root = self.settings(STATIC_ROOT=root)
+        static_root.enable()
+        self.addCleanup(static_root.disable)
+        self.storage = staticfiles_storage
+        icons.startup_manifest.cache_clear()
+        self.addCleanup(icons.startup_manifest.cache_clear)
+
+    def build(self, **kwargs):
+        return icons.build(**kwargs)
+
+    def test_build_writes_hashed_files_to_static_storage(self):
+        manifest = self.build()
+        self.assertRegex(manifest['css'], r'^icons/icons\.[0-9a-f]{12}\.css$')
+        for name in manifest['files']:
+            self.assertTrue(self.storage.exists(name), name)
+        self.assertEqual(icons.static_url(manifest['css']), f"/static/{manifest['css']}")
+
+    def test_processes_started_before_a_rebuild_link_the_full_stylesheet(self):
+        first = self.build()
+        with mock.patch.object(icons, 'AUTOREFRESH', False):
+            self.assertEqual(icons.servable(), first)
+            Service.objects.create(title='Robots', description='', icon='fas fa-robot')
+            second = self.build(prune=False)
+            self.assertNotEqual(first['css'], second['css'])
+            # WhiteNoise in this process only knows the first build's files
+            self.assertIsNone(icons.servable())
+            self.assertTrue(self.storage.exists(first['css']))
+            icons.startup_manifest.cache_clear()
+            self.assertEqual(icons.servable(), second)
+
+    def test_service_save_rebuilds_in_the_background(self):
+        executor = mock.Mock()
+        self.addCleanup(setattr, icons, '_pending', False)
+        with mock.patch.object(icons, '_executor', executor), mock.patch.object(icons, 'build') as build, \
+                self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(title='Robots', description='', icon='fas fa-robot')
+            Service.objects.create(title='Rockets', description='', icon='fas fa-rocket')
+        build.assert_not_called()
+        # Both saves are covered by one queued build
+        executor.submit.assert_called_once_with(icons._run)
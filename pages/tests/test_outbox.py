@@ -0,0 +1,56 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pages import outbox
+from pages.models import OutboxEmail, ServiceInquiry
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        for n in range(3):
+            outbox.queue_mail(f'Subject {n}', 'Body', recipient_list=['admin@example.com'])
+
+    def test_delivers_due_emails(self):
+        self.assertEqual(outbox.deliver_pending(), (3, 0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboxEmail.objects.exclude(status='sent').exists())
+
+    def test_overlapping_workers_send_each_email_once(self):
+        claimed = outbox.claim()
+        self.assertEqual(len(claimed), 3)
+        # A second worker starting while the first is still sending
+        self.assertEqual(outbox.deliver_pending(), (0, 0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_row_claimed_by_another_worker_after_reading_is_skipped(self):
+        rows = list(outbox.due_emails())
+        OutboxEmail.objects.filter(pk=rows[0].pk).update(status='sending', locked_until=timezone.now() + timedelta(minutes=5))
+        with mock.patch.object(outbox, 'due_emails', return_value=rows):
+            self.assertEqual(len(outbox.claim()), 2)
+
+    def test_expired_lease_is_claimed_again(self):
+        outbox.claim()
+        OutboxEmail.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(outbox.deliver_pending(), (3, 0, 0))
+
+    def test_failure_returns_the_row_to_the_queue(self):
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('refused')):
+            self.assertEqual(outbox.deliver_pending(), (0, 3, 0))
+        email = OutboxEmail.objects.first()
+        self.assertEqual((email.status, email.attempts, email.locked_until), ('pending', 1, None))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+
+class QueuedRecipientsTests(TestCase):
+    def test_service_inquiries_go_to_the_admin_recipients(self):
+        response = self.client.post(reverse('services'), {
+            'name': 'Ada', 'phone': '0', 'email': 'ada@example.com', 'service': ServiceInquiry._meta.get_field('service').choices[0][0], 'message': 'Hi',
+        })
+        self.assertEqual(response.status_code, 302)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipients, ','.join(outbox.admin_recipients()))
@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from courses.models import Course
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(title='Web Design', description='About it', link='web-design')
+
+    def setUp(self):
+        cache.clear()
+
+    def page_entries(self):
+        (entries,), = cache._db.execute("SELECT COUNT(*) FROM cache_entry WHERE key LIKE '%:page:%'")
+        return entries
+
+    def test_hit_after_miss(self):
+        self.assertEqual(self.client.get(reverse('courses'))['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('courses'))['X-Page-Cache'], 'hit')
+
+    def test_query_strings_share_the_entry(self):
+        self.client.get(reverse('courses'))
+        for n in range(5):
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('courses'), {'x': n})
+            self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(self.page_entries(), 1)
+
+    def test_saving_a_model_invalidates_its_pages(self):
+        self.client.get(reverse('courses'))
+        self.course.title = 'Web Development'
+        self.course.save()
+        response = self.client.get(reverse('courses'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Web Development')
+
+    def test_revalidation_gets_304_without_queries(self):
+        response = self.client.get(reverse('courses'))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=0, s-maxage=300')
+        self.assertFalse(response.cookies)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('courses'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from courses.models import Course
+from pages import prerender
+from pages.page_cache import model_tag
+from pages.routes import public_patterns, public_routes
+
+
+class PrerenderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(title='Web Design', description='About it')
+        Course.objects.create(title='Data Science', description='About it')
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+
+    def run_prerender(self, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('prerender', output=self.root, stdout=stdout, stderr=stderr, **options)
+        self.stderr = stderr.getvalue()
+        lines = stdout.getvalue().splitlines()
+        return {line.split(' ', 1)[1] for line in lines if line.startswith('Rendered ')}, lines
+
+    def test_deferred_csrf_fields_are_not_reported(self):
+        rendered, _ = self.run_prerender(force=True)
+        self.assertTrue(rendered)
+        self.assertNotIn('CSRF', self.stderr)
+
+    def test_unchanged_pages_are_not_rendered_again(self):
+        first, _ = self.run_prerender()
+        self.assertEqual(first, {path for _, path in public_routes()})
+        second, lines = self.run_prerender()
+        self.assertEqual(second, set())
+        self.assertIn(f'0 rendered, {len(first)} unchanged', lines[-1])
+
+    def test_saving_a_course_renders_only_the_pages_tagged_with_it(self):
+        self.run_prerender()
+        self.course.description = 'Updated'
+        self.course.save()
+        tagged = {name for name, _, tags in public_patterns() if model_tag(Course) in tags}
+        expected = {path for name, path in public_routes() if name in tagged}
+        self.assertIn(reverse('course_detail', args=[self.course.slug]), expected)
+        rendered, _ = self.run_prerender()
+        self.assertEqual(rendered, expected)
+
+    def test_deleting_a_course_removes_its_page_and_variants(self):
+        self.run_prerender()
+        path = reverse('course_detail', args=[self.course.slug])
+        target = prerender.output_path(self.root, path)
+        self.assertTrue(os.path.exists(target))
+        self.assertTrue(os.path.exists(target + '.gz'))
+        self.assertTrue(os.path.exists(target + '.br'))
+
+        self.course.delete()
+        _, lines = self.run_prerender()
+        self.assertIn(f'Removed {path}', lines)
+        for name in [target] + [target + suffix for suffix in prerender.COMPRESSED_SUFFIXES]:
+            self.assertFalse(os.path.exists(name), name)
+        self.assertFalse(os.path.exists(os.path.dirname(target)))
+        self.assertNotIn(path, prerender.load_manifest(self.root))
+
+    def test_editing_a_template_renders_only_the_pages_that_use_it(self):
+        # A copy of pages/courses.html earlier on the template path stands in for the edited file
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        (directory / 'pages').mkdir()
+        source = settings.BASE_DIR / 'templates' / 'pages' / 'courses.html'
+        shutil.copy(source, directory / 'pages' / 'courses.html')
+        engine = {**settings.TEMPLATES[0], 'DIRS': [directory, *settings.TEMPLATES[0]['DIRS']]}
+
+        with override_settings(TEMPLATES=[engine, *settings.TEMPLATES[1:]]):
+            self.run_prerender()
+            manifest = prerender.load_manifest(self.root)
+            expected = {path for path, entry in manifest.items() if entry['template'] == 'pages/courses.html'}
+            self.assertTrue(expected)
+            self.assertLess(len(expected), len(manifest))
+
+            with open(directory / 'pages' / 'courses.html', 'a') as f:
+                f.write('\n{# edited #}\n')
+            rendered, _ = self.run_prerender()
+        self.assertEqual(rendered, expected)
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from courses.models import Course
+from events.models import Event
+from pages.models import ServiceInquiry, Student, TeamMember
+from pages import stats
+from pages.query_budget import QueryBudgetExceeded, get_report, reset_report
+from services.models import Service
+
+
+class QueryBudgetTests(TestCase):
+    """The budgeted views stay within QUERY_BUDGETS on a cold page cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(3):
+            Course.objects.create(title=f'Course {n}', description='About it', link=f'Course-{n}')
+            Service.objects.create(title=f'Service {n}', description='About it')
+            Event.objects.create(title=f'Event {n}', description='About it')
+            TeamMember.objects.create(name=f'Member {n}', designation='Tutor')
+        cls.student = Student.objects.create_user('student', 'student@example.com', 'pw12345678')
+        # The budget covers the dashboard once its counters are materialised
+        stats.rebuild(cls.student.pk)
+
+    def setUp(self):
+        cache.clear()
+        reset_report()
+
+    def test_public_pages(self):
+        for name in ('home', 'services', 'courses', 'events', 'team', 'testimonial'):
+            with self.subTest(name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+    def test_course_detail(self):
+        response = self.client.get(reverse('course_detail', args=['course-1']))
+        self.assertEqual(response.status_code, 200)
+
+    def test_student_dashboard(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={'courses': 0})
+    def test_exceeded_budget_fails(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'courses ran 1 queries, budget is 0'):
+            self.client.get(reverse('courses'))
+
+    def test_form_posts_are_counted_but_not_budgeted(self):
+        response = self.client.post(reverse('services'), {
+            'name': 'Ada', 'phone': '0', 'email': 'ada@example.com', 'message': 'Hi',
+            'service': ServiceInquiry._meta.get_field('service').choices[0][0],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertGreater(int(response['X-Query-Count']), settings.QUERY_BUDGETS['services'])
+        self.assertEqual(get_report()['services']['requests'], 1)
+
+    def test_team_has_no_n_plus_one(self):
+        self.client.get(reverse('team'))
+        self.assertEqual(get_report()['team']['n_plus_one'], {})
+
+    async def test_async_views_are_counted(self):
+        response = await self.async_client.get(reverse('courses'))
+        self.assertEqual(response['X-Query-Count'], '1')
+
+    @override_settings(DEBUG=True)
+    def test_no_middleware_is_adapted_under_asgi(self):
+        # In DEBUG, Django logs every handler it adapts between sync and async
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
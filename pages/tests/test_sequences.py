@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.test import TestCase
+
+from pages import sequences
+from pages.models import Sequence
+
+
+class SequenceTests(TestCase):
+    def setUp(self):
+        sequences._reset_blocks()
+
+    def test_block_is_reused_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sequences.next_value('test', block_size=5), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual([sequences.next_value('test', block_size=5) for _ in range(4)], [2, 3, 4, 5])
+        self.assertEqual(sequences.next_value('test', block_size=5), 6)
+
+    def test_rolled_back_block_is_not_handed_out(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.assertEqual(sequences.next_value('test', block_size=5), 1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(Sequence.objects.filter(name='test').count(), 0)
+
+        # Another worker now reserves the numbers the rollback released
+        self.assertEqual(sequences.reserve_block('test', 5), (1, 5))
+        self.assertEqual(sequences.next_value('test', block_size=5), 6)
+
+    def test_seed_sets_the_first_value(self):
+        self.assertEqual(sequences.next_value('test', seed=lambda: 100, block_size=5), 101)
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from courses.models import Course
+from pages import sitemaps
+
+
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(title='Web Design', description='About it', link='Web-Design')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, path, **extra):
+        return Client(**extra).get(path, HTTP_ACCEPT_ENCODING='identity')
+
+    def test_host_header_does_not_reach_the_cache(self):
+        self.get('/sitemap-pages.xml', HTTP_HOST='evil.example')
+        self.get('/sitemap.xml', HTTP_HOST='evil.example')
+        for path in ('/sitemap-pages.xml', '/sitemap.xml'):
+            with self.subTest(path):
+                content = self.get(path).content.decode()
+                self.assertNotIn('evil.example', content)
+                self.assertIn('https://dictchannels.com/', content)
+
+    @mock.patch.object(sitemaps, 'SITE_DOMAIN', None)
+    def test_request_host_is_part_of_the_key_without_site_domain(self):
+        self.get('/sitemap-pages.xml', HTTP_HOST='evil.example')
+        content = self.get('/sitemap-pages.xml').content.decode()
+        self.assertNotIn('evil.example', content)
+        self.assertIn('https://testserver/', content)
+
+    def test_query_parameters_share_an_entry(self):
+        self.get('/sitemap-pages.xml?x=1')
+        self.get('/sitemap-pages.xml?x=2')
+        (entries,), = cache._db.execute("SELECT COUNT(*) FROM cache_entry WHERE key LIKE '%sitemap:%'")
+        self.assertEqual(entries, 1)
+
+    def test_course_urls_match_the_site_links(self):
+        content = self.get('/sitemap-courses.xml').content.decode()
+        url = reverse('course_detail', args=[self.course.slug])
+        self.assertIn(f'https://dictchannels.com{url}</loc>', content)
+        self.assertIn(url.encode(), self.client.get(reverse('courses')).content)
+
+    def test_other_spellings_redirect_to_the_slug(self):
+        response = self.client.get(reverse('course_detail', args=['Web-Design']))
+        self.assertRedirects(response, reverse('course_detail', args=['web-design']), status_code=301)
@@ -0,0 +1,81 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from courses.models import Course
+from pages import stats
+from pages.models import Assignment, AssignmentSubmission, Certificate, Enrollment, Student, StudentStats
+
+FIELDS = ['enrolled_courses', 'progress_total', 'pending_assignments', 'certificates_count',
+          'recent_enrollments', 'recent_activities']
+
+
+class StudentStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create_user('ada', 'ada@example.com', 'pw12345678')
+        cls.other = Student.objects.create_user('bob', 'bob@example.com', 'pw12345678')
+        cls.courses = [Course.objects.create(title=f'Course {n}', description='') for n in range(3)]
+        cls.assignments = [
+            Assignment.objects.create(title=f'Essay {n}', description='', course=cls.courses[0], due_date=timezone.now())
+            for n in range(2)
+        ]
+
+    def row(self, student):
+        return StudentStats.objects.filter(student=student).values(*FIELDS).get()
+
+    def assertMatchesRebuild(self, student):
+        maintained = self.row(student)
+        stats.rebuild(student.pk)
+        self.assertEqual(maintained, self.row(student))
+
+    def test_signals_keep_the_row_in_step(self):
+        first = Enrollment.objects.create(student=self.student, course=self.courses[0], progress_percentage=40)
+        Enrollment.objects.create(student=self.student, course=self.courses[1], progress_percentage=10)
+        first.progress_percentage = 90
+        first.save()
+        submission = AssignmentSubmission.objects.create(assignment=self.assignments[0], student=self.student)
+        submission.status = 'graded'
+        submission.save()
+        AssignmentSubmission.objects.create(assignment=self.assignments[1], student=self.student, status='submitted')
+        Certificate.objects.create(student=self.student, course=self.courses[0])
+
+        row = self.row(self.student)
+        self.assertEqual((row['enrolled_courses'], row['progress_total']), (2, 100))
+        self.assertEqual((row['pending_assignments'], row['certificates_count']), (1, 1))
+        self.assertMatchesRebuild(self.student)
+
+        first.delete()
+        submission.delete()
+        self.assertEqual(self.row(self.student)['enrolled_courses'], 1)
+        self.assertMatchesRebuild(self.student)
+
+    def test_moving_a_row_rebuilds_both_students(self):
+        enrollment = Enrollment.objects.create(student=self.student, course=self.courses[2], progress_percentage=30)
+        enrollment.student = self.other
+        enrollment.save()
+        self.assertEqual(self.row(self.student)['enrolled_courses'], 0)
+        self.assertEqual(self.row(self.other)['progress_total'], 30)
+        self.assertMatchesRebuild(self.student)
+        self.assertMatchesRebuild(self.other)
+
+    def test_renames_reach_the_recent_lists(self):
+        Enrollment.objects.create(student=self.student, course=self.courses[0])
+        Certificate.objects.create(student=self.other, course=self.courses[0])
+        AssignmentSubmission.objects.create(assignment=self.assignments[0], student=self.other)
+        course, assignment = self.courses[0], self.assignments[0]
+        course.title = 'Renamed course'
+        course.save()
+        assignment.title = 'Renamed essay'
+        assignment.save()
+
+        row = self.row(self.student)
+        self.assertEqual(row['recent_enrollments'][0]['course_title'], 'Renamed course')
+        titles = [a['title'] for a in self.row(self.other)['recent_activities']]
+        self.assertCountEqual(titles, ['Earned Certificate: Renamed course', 'Submitted: Renamed essay'])
+        self.assertMatchesRebuild(self.student)
+        self.assertMatchesRebuild(self.other)
+
+    def test_get_stats_builds_a_missing_row(self):
+        Enrollment.objects.create(student=self.student, course=self.courses[0], progress_percentage=50)
+        StudentStats.objects.filter(student=self.student).delete()
+        self.assertEqual(stats.get_stats(self.student).progress_total, 50)
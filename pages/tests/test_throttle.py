@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from pages import throttle
+from pages.models import Student
+
+
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def post_contact(self, n, **extra):
+        return self.client.post(reverse('contact'), {
+            'fname': 'Ada', 'email': f'ada{n}@example.com', 'phone': '0',
+            'subject': 'Hello', 'message': 'Hi',
+        }, **extra)
+
+    def test_ip_limit_returns_429(self):
+        capacity = throttle.THROTTLE_RATES['contact']['ip'][0]
+        for n in range(capacity):
+            self.assertEqual(self.post_contact(n).status_code, 302)
+        response = self.post_contact(capacity)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # Another client is unaffected
+        self.assertEqual(self.post_contact(capacity, REMOTE_ADDR='10.0.0.2').status_code, 302)
+
+    def test_unthrottled_lifts_the_limit(self):
+        with throttle.unthrottled('contact'):
+            for n in range(throttle.DEFAULT_RATES['contact']['ip'][0] + 1):
+                self.assertEqual(self.post_contact(n).status_code, 302)
+        self.assertEqual(throttle.THROTTLE_RATES['contact'], throttle.DEFAULT_RATES['contact'])
+
+    def login(self, username, password, n):
+        return self.client.post(reverse('student_login'), {'un': username, 'pw': password},
+                                REMOTE_ADDR=f'10.0.{n // 200}.{n % 200}')
+
+    def test_only_failed_logins_are_charged_to_the_email(self):
+        Student.objects.create_user('victim', 'victim@example.com', 'pw12345678')
+        capacity = throttle.THROTTLE_RATES['login']['failed_email'][0]
+        for n in range(capacity):
+            self.assertEqual(self.login('victim', 'pw12345678', n).status_code, 302)
+            self.client.logout()
+        # Wrong passwords from many addresses do use the email's bucket up
+        for n in range(capacity):
+            self.assertEqual(self.login('victim', 'wrong', n).status_code, 200)
+        self.assertEqual(self.login('victim', 'pw12345678', capacity).status_code, 429)
+
+    def test_one_address_cannot_lock_an_account_out(self):
+        Student.objects.create_user('victim', 'victim@example.com', 'pw12345678')
+        ip_capacity = throttle.THROTTLE_RATES['login']['ip'][0]
+        for _ in range(ip_capacity):
+            self.client.post(reverse('student_login'), {'un': 'victim', 'pw': 'wrong'})
+        self.assertEqual(self.login('victim', 'pw12345678', 1).status_code, 302)
+
+    def test_forged_forwarded_for_entries_are_ignored(self):
+        ip_capacity = throttle.THROTTLE_RATES['login']['ip'][0]
+        with mock.patch.object(throttle, 'THROTTLE_CLIENT_IP_META', 'HTTP_X_FORWARDED_FOR'):
+            for n in range(ip_capacity):
+                # The proxy appends the real address after whatever the client sent
+                self.client.post(reverse('student_login'), {'un': f'user{n}', 'pw': 'wrong'},
+                                 HTTP_X_FORWARDED_FOR=f'10.9.0.{n}, 203.0.113.7')
+            response = self.client.post(reverse('student_login'), {'un': 'other', 'pw': 'wrong'},
+                                        HTTP_X_FORWARDED_FOR='10.9.9.9, 203.0.113.7')
+        self.assertEqual(response.status_code, 429)
+
+    def test_client_ip_counts_trusted_proxies_from_the_right(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7, 10.0.0.1',
+                                       REMOTE_ADDR='10.0.0.2')
+        with mock.patch.object(throttle, 'THROTTLE_CLIENT_IP_META', 'HTTP_X_FORWARDED_FOR'):
+            self.assertEqual(throttle.client_ip(request), '10.0.0.1')
+            with mock.patch.object(throttle, 'THROTTLE_TRUSTED_PROXIES', 2):
+                self.assertEqual(throttle.client_ip(request), '203.0.113.7')
+            # No header: the direct peer
+            self.assertEqual(throttle.client_ip(RequestFactory().get('/', REMOTE_ADDR='10.0.0.2')), '10.0.0.2')
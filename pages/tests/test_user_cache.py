@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from pages import stats, user_cache
+from pages.models import Student
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = Student.objects.create_user('ada', 'ada@example.com', 'pw12345678')
+        stats.rebuild(self.student.pk)
+        self.client.force_login(self.student)
+
+    def dashboard(self):
+        return self.client.get(reverse('student_dashboard'))
+
+    def test_cached_user_is_reused(self):
+        self.assertEqual(self.dashboard().status_code, 200)
+        key = user_cache.user_key(self.student.pk, self.student.get_session_auth_hash())
+        self.assertEqual(cache.get(key), self.student)
+
+    def test_deactivating_with_save_logs_out(self):
+        self.dashboard()
+        self.student.is_active = False
+        self.student.save(update_fields=['is_active'])
+        self.assertEqual(self.dashboard().status_code, 302)
+
+    def test_password_change_logs_out(self):
+        self.dashboard()
+        self.student.set_password('another-pw-123')
+        self.student.save()
+        self.assertEqual(self.dashboard().status_code, 302)
+
+    def test_update_needs_an_explicit_evict(self):
+        self.dashboard()
+        Student.objects.filter(pk=self.student.pk).update(is_active=False)
+        # No signal: the cached copy still serves until it is evicted
+        self.assertEqual(self.dashboard().status_code, 200)
+        user_cache.evict(self.student)
+        self.assertEqual(self.dashboard().status_code, 302)
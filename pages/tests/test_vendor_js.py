@@ -0,0 +1,52 @@
+import re
+
+from django.core.cache import cache
+from django.templatetags.static import static
+from django.test import TestCase
+from django.urls import reverse
+
+from courses.models import Course
+from pages import stats
+from pages.models import Student
+from pages.routes import public_routes
+from pages.templatetags.vendor_js import VENDOR_JS, resolve
+
+# Markup main.js hands to each vendor module
+MARKUP = {
+    'counterup': re.compile(r'data-toggle="counter-up"'),
+    'owlcarousel': re.compile(r'class="[^"]*\b(?:testimonial|vendor)-carousel\b'),
+    'wow': re.compile(r'class="[^"]*\bwow\b'),
+}
+
+
+class VendorJsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Course.objects.create(title='Web Design', description='About it')
+        cls.student = Student.objects.create_user('ada', 'ada@example.com', 'pw12345678')
+        stats.rebuild(cls.student.pk)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertBundles(self, path, content):
+        scripts = set(re.findall(r'<script src="([^"]+)"', content))
+        for name, pattern in MARKUP.items():
+            if pattern.search(content):
+                for module in resolve([name]):
+                    for file in VENDOR_JS[module][1]:
+                        self.assertIn(static(file), scripts, f'{path} uses {name} markup but does not load {file}')
+
+    def test_pages_load_the_modules_their_markup_needs(self):
+        paths = [path for _, path in public_routes()]
+        self.assertIn(reverse('testimonial'), paths)  # counters
+        for path in paths:
+            with self.subTest(path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertBundles(path, response.content.decode())
+
+    def test_dashboard_loads_the_modules_its_markup_needs(self):
+        self.client.force_login(self.student)
+        path = reverse('student_dashboard')
+        self.assertBundles(path, self.client.get(path).content.decode())
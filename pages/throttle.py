@@ -0,0 +1,184 @@
+"""
+Token-bucket throttling for the POST endpoints.
+
+A login attempt costs a full password hash, and every other form POST
+writes to the database and queues mail, so each is throttled per client
+IP and per normalised email address before the view runs. A bucket holds
+up to ``capacity`` attempts and refills evenly over ``period`` seconds;
+an attempt with no token left gets a 429 with ``Retry-After``, without
+touching the database or the password hasher.
+
+Logins use a ``failed_email`` bucket instead of ``email``: only a wrong
+password is charged to it (through ``record_failure``), and it fills
+faster than one address's ``ip`` bucket lets attempts through, so posting
+someone's email from one address cannot lock them out of their account.
+
+Buckets live in the default cache and expire once they would be full
+again. Reading and writing a bucket is not atomic, so concurrent requests
+can occasionally get one extra attempt through; the limits are there to
+keep the CPU from being pinned, not to count exactly.
+
+Allowed and rejected attempts are counted per scope; ``stats()`` and the
+``throttle_stats`` command report them.
+"""
+
+import hashlib
+import ipaddress
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+# scope -> {'ip' | 'email' | 'failed_email': (capacity, period in seconds)}
+DEFAULT_RATES = {
+    'login': {'ip': (20, 60 * 5), 'failed_email': (100, 60 * 15)},
+    'register': {'ip': (5, 60 * 60), 'email': (3, 60 * 60)},
+    'contact': {'ip': (5, 60 * 60), 'email': (5, 60 * 60)},
+    'quote': {'ip': (5, 60 * 60), 'email': (5, 60 * 60)},
+    'newsletter': {'ip': (10, 60 * 60), 'email': (3, 60 * 60)},
+}
+THROTTLE_RATES = {**DEFAULT_RATES, **getattr(settings, 'THROTTLE_RATES', {})}
+# META key holding the client address, e.g. 'HTTP_X_REAL_IP' behind a proxy that sets it
+THROTTLE_CLIENT_IP_META = getattr(settings, 'THROTTLE_CLIENT_IP_META', 'REMOTE_ADDR')
+# Proxies that append to a list-valued header such as X-Forwarded-For; the
+# client is the entry the outermost of them added, counted from the right
+THROTTLE_TRUSTED_PROXIES = getattr(settings, 'THROTTLE_TRUSTED_PROXIES', 1)
+
+OUTCOMES = ('allowed', 'rejected_ip', 'rejected_email')
+
+
+def client_ip(request):
+    """The client address, with IPv6 clients grouped by their /64 network."""
+    # Entries left of the ones our proxies added are whatever the client sent
+    entries = [e.strip() for e in request.META.get(THROTTLE_CLIENT_IP_META, '').split(',') if e.strip()]
+    if entries:
+        value = entries[-min(max(THROTTLE_TRUSTED_PROXIES, 1), len(entries))]
+    else:
+        value = request.META.get('REMOTE_ADDR', '')
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return value
+    if address.version == 6:
+        return str(ipaddress.ip_network(f'{address}/64', strict=False).network_address)
+    return str(address)
+
+
+def normalise_email(value):
+    return (value or '').strip().casefold()
+
+
+def bucket_key(scope, kind, ident):
+    return f'throttle:{scope}:{kind}:{hashlib.md5(ident.encode()).hexdigest()}'
+
+
+def take(key, capacity, period, spend=True):
+    """
+    Spend one token from the bucket at ``key``; returns 0, or the seconds
+    until one is available. With ``spend=False`` only checks for a token.
+    """
+    now = time.time()
+    rate = capacity / period
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens < 1:
+        return (1 - tokens) / rate
+    if spend:
+        cache.set(key, (tokens - 1, now), period)
+    return 0
+
+
+def count_key(scope, outcome):
+    return f'throttle:count:{scope}:{outcome}'
+
+
+def count(scope, outcome):
+    key = count_key(scope, outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, None)
+
+
+def stats():
+    """``{scope: {outcome: count}}`` since the counters were last reset."""
+    keys = {count_key(scope, outcome): (scope, outcome) for scope in THROTTLE_RATES for outcome in OUTCOMES}
+    values = cache.get_many(keys)
+    result = {scope: dict.fromkeys(OUTCOMES, 0) for scope in THROTTLE_RATES}
+    for key, (scope, outcome) in keys.items():
+        result[scope][outcome] = values.get(key, 0)
+    return result
+
+
+def reset_stats():
+    cache.delete_many([count_key(scope, outcome) for scope in THROTTLE_RATES for outcome in OUTCOMES])
+
+
+def check(request, scope, email=None):
+    """Spend this request's tokens for ``scope``; returns None, or the 429 to send instead."""
+    rates = THROTTLE_RATES[scope]
+    attempts = [('ip', client_ip(request))]
+    email = normalise_email(email)
+    if email:
+        attempts += [('email', email), ('failed_email', email)]
+
+    for kind, ident in attempts:
+        if kind not in rates:
+            continue
+        # Failures are charged by record_failure; here they only block
+        wait = take(bucket_key(scope, kind, ident), *rates[kind], spend=kind != 'failed_email')
+        if wait:
+            count(scope, 'rejected_ip' if kind == 'ip' else 'rejected_email')
+            response = HttpResponse(
+                'Too many attempts. Please wait a few minutes and try again.',
+                status=429, content_type='text/plain; charset=utf-8',
+            )
+            response['Retry-After'] = str(int(wait) + 1)
+            return response
+    count(scope, 'allowed')
+    return None
+
+
+def record_failure(scope, email):
+    """Charge a failed attempt, such as a wrong password, to ``email``'s ``failed_email`` bucket."""
+    rates = THROTTLE_RATES[scope]
+    email = normalise_email(email)
+    if email and 'failed_email' in rates:
+        take(bucket_key(scope, 'failed_email', email), *rates['failed_email'])
+
+
+@contextmanager
+def unthrottled(*scopes):
+    """Lift the limits of ``scopes`` (all by default) in this process, e.g. for a load test."""
+    saved = dict(THROTTLE_RATES)
+    for scope in scopes or saved:
+        THROTTLE_RATES[scope] = {}
+    try:
+        yield
+    finally:
+        THROTTLE_RATES.update(saved)
+
+
+def throttled(scope, email_field=None):
+    """
+    Throttle a view's POSTs under ``scope`` by client IP and, when
+    ``email_field`` is given, by the email address posted in it.
+
+        @throttled('login', email_field='un')
+        def student_login(request): ...
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method == 'POST':
+                rejected = check(request, scope, request.POST.get(email_field) if email_field else None)
+                if rejected is not None:
+                    return rejected
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
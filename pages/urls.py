@@ -48,4 +48,5 @@ urlpatterns = [
     path('student-dashboard/', views.student_dashboard, name='student_dashboard'),
     path('edit-profile/', views.edit_profile, name='edit_profile'),
     path('newsletter/', views.newsletter_signup, name='newsletter_signup'),
+    path('session/', views.session_state, name='session_state'),
 ]
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Cached user loading for authenticated requests.
+
+Django's AuthenticationMiddleware fetches the user row on every request
+that carries a login session. ``CachedAuthenticationMiddleware`` replaces
+it and keeps the loaded user in the cache under the user id and the
+session auth hash, which is derived from the password hash: a password
+change gives a new key, and saving or deleting a ``Student`` evicts the
+entries for both its previous and its current password. Changes that skip
+``save()``, such as ``Student.objects.filter(...).update(is_active=False)``,
+send no signal: the cached user stays logged in for up to
+``USER_CACHE_TIMEOUT``. Save the students one by one, or call ``evict``
+for each, when that matters.
+
+A miss goes through ``django.contrib.auth.get_user``, so session
+verification, secret key fallbacks and logging out stale sessions behave
+exactly as before; only verified users are cached.
+"""
+
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+USER_CACHE_TIMEOUT = getattr(settings, 'USER_CACHE_TIMEOUT', 60 * 15)
+
+
+def user_key(user_id, session_hash):
+    return f'auth:user:{user_id}:{session_hash}'
+
+
+def load_user(request):
+    user_id = request.session.get(SESSION_KEY)
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    if user_id is None or not session_hash:
+        return auth.get_user(request)
+
+    key = user_key(user_id, session_hash)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+    return user
+
+
+def evict(user, previous_password=None):
+    """Drop the cached copies of ``user`` made under its current and previous password."""
+    keys = [user_key(user.pk, user.get_session_auth_hash())]
+    if previous_password and previous_password != user.password:
+        previous = type(user)(pk=user.pk, password=previous_password)
+        keys.append(user_key(user.pk, previous.get_session_auth_hash()))
+    cache.delete_many(keys)
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = load_user(request)
+    return request._cached_user
+
+
+async def auser(request):
+    # Shares the attribute with get_user, so templates reading request.user
+    # in an async view don't load the user again (synchronously)
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = await sync_to_async(load_user)(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = partial(auser, request)
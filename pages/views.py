@@ -1,12 +1,20 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
+from django.http import Http404, JsonResponse
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
 from testimonials.models import Testimonial
 from services.models import Service
 from courses.models import Course
+from courses.lookup import get_course_by_slug
 from events.models import Event
 from .models import (
     Student, TeamMember, ContactSubmission, NewsletterSubscription,
@@ -14,12 +22,23 @@ from .models import (
     AssignmentSubmission, Certificate, Announcement, Message, Payment
 )
 from .forms import ContactForm, NewsletterForm, QuoteForm, ServiceInquiryForm, StudentProfileForm, StudentRegistrationForm
+from .outbox import queue_mail
+from .page_cache import cached_page
+from .stats import aget_stats as aget_student_stats
+from .throttle import record_failure, throttled
 
-def home(request):
-    testimonials = Testimonial.objects.select_related().all()[:6]  # Limit testimonials for performance
-    services = Service.objects.select_related().all()
+async def _alist(queryset):
+    # Evaluate in the view: templates rendered from async views can't query
+    return [obj async for obj in queryset]
+
+@cached_page(Testimonial, Service, Course)
+async def home(request):
+    testimonials, services, courses = await asyncio.gather(
+        _alist(Testimonial.objects.select_related().all()[:6]),  # Limit testimonials for performance
+        _alist(Service.objects.select_related().all()),
+        _alist(Course.objects.select_related().all()[:8]),  # Limit courses for performance
+    )
     newsletter_form = NewsletterForm()
-    courses = Course.objects.select_related().all()[:8]  # Limit courses for performance
     context = {
         'testimonials': testimonials,
         'services': services,
@@ -28,6 +47,7 @@ def home(request):
     }
     return render(request, 'pages/home.html', context)
 
+@cached_page()
 def about(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -35,15 +55,15 @@ def about(request):
     }
     return render(request, 'pages/about.html', context)
 
+@cached_page(Service)
 def services(request):
     if request.method == 'POST':
         form = ServiceInquiryForm(request.POST)
         if form.is_valid():
-            # Save service inquiry to database
-            service_inquiry = form.save()
+            # Save service inquiry and queue the admin notification together
+            with transaction.atomic():
+                service_inquiry = form.save()
 
-            # Send email notification to admin
-            try:
                 subject = f'New Service Inquiry from {service_inquiry.name}'
                 message = f"""
 New service inquiry received:
@@ -58,18 +78,7 @@ Message:
 
 Submitted at: {service_inquiry.submitted_at}
                 """
-                from_email = settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@d-ictchannels.com'
-                recipient_list = [settings.ADMIN_EMAIL] if hasattr(settings, 'ADMIN_EMAIL') else ['carksonniit@gmail.com']
-
-                send_mail(
-                    subject,
-                    message,
-                    from_email,
-                    recipient_list,
-                    fail_silently=True,
-                )
-            except Exception as e:
-                print(f"Email notification failed: {e}")
+                queue_mail(subject, message)
 
             messages.success(request, 'Your service inquiry has been submitted successfully! We will get back to you soon.')
             return redirect('services')
@@ -85,8 +94,9 @@ Submitted at: {service_inquiry.submitted_at}
     }
     return render(request, 'pages/services.html', context)
 
-def courses(request):
-    courses = Course.objects.select_related().all()
+@cached_page(Course)
+async def courses(request):
+    courses = await _alist(Course.objects.select_related().all())
     newsletter_form = NewsletterForm()
     context = {
         'courses': courses,
@@ -94,20 +104,14 @@ def courses(request):
     }
     return render(request, 'pages/courses.html', context)
 
-def course_detail(request, course_slug):
-    try:
-        course = Course.objects.get(link=course_slug)
-    except Course.DoesNotExist:
-        # Try to find by title slug if link doesn't match
-        course = None
-        for c in Course.objects.all():
-            if c.link and c.link.lower().replace(' ', '-').replace('/', '') == course_slug:
-                course = c
-                break
-
-        if not course:
-            from django.http import Http404
-            raise Http404("Course not found")
+@cached_page(Course)
+async def course_detail(request, course_slug):
+    course = await sync_to_async(get_course_by_slug)(course_slug)
+    if not course:
+        raise Http404("Course not found")
+    if course_slug != course.slug:
+        # One URL per course: other spellings of the link go to the slug
+        return redirect('course_detail', course.slug, permanent=True)
 
     newsletter_form = NewsletterForm()
     context = {
@@ -119,6 +123,7 @@ def course_detail(request, course_slug):
     }
     return render(request, 'courses/course_detail.html', context)
 
+@cached_page()
 def courses_topup(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -129,6 +134,7 @@ def courses_topup(request):
     }
     return render(request, 'courses/topup.html', context)
 
+@cached_page()
 def courses_diploma(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -139,6 +145,7 @@ def courses_diploma(request):
     }
     return render(request, 'courses/diploma.html', context)
 
+@cached_page()
 def courses_certificate(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -149,6 +156,7 @@ def courses_certificate(request):
     }
     return render(request, 'courses/certificate.html', context)
 
+@cached_page()
 def courses_school(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -159,6 +167,7 @@ def courses_school(request):
     }
     return render(request, 'courses/school.html', context)
 
+@cached_page()
 def courses_siwes(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -169,6 +178,7 @@ def courses_siwes(request):
     }
     return render(request, 'courses/siwes.html', context)
 
+@cached_page()
 def courses_corporate(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -179,6 +189,7 @@ def courses_corporate(request):
     }
     return render(request, 'courses/corporate.html', context)
 
+@cached_page()
 def courses_customized(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -189,8 +200,9 @@ def courses_customized(request):
     }
     return render(request, 'courses/customized.html', context)
 
-def events(request):
-    events = Event.objects.select_related().all()
+@cached_page(Event)
+async def events(request):
+    events = await _alist(Event.objects.select_related().all())
     newsletter_form = NewsletterForm()
     context = {
         'events': events,
@@ -198,6 +210,8 @@ def events(request):
     }
     return render(request, 'pages/events.html', context)
 
+@cached_page()
+@throttled('contact', email_field='email')
 def contact(request):
     if request.method == 'POST':
         # Get form data from POST request
@@ -212,17 +226,16 @@ def contact(request):
             messages.error(request, 'Please fill in all required fields.')
             return redirect('contact')
 
-        # Save contact submission to database
-        contact_submission = ContactSubmission.objects.create(
-            fname=fname,
-            email=email,
-            phone=phone,
-            subject=subject,
-            message=message
-        )
-
-        # Send email notification to admin
-        try:
+        # Save contact submission and queue the admin notification together
+        with transaction.atomic():
+            contact_submission = ContactSubmission.objects.create(
+                fname=fname,
+                email=email,
+                phone=phone,
+                subject=subject,
+                message=message
+            )
+
             email_subject = f'New Contact Form Submission from {contact_submission.fname}'
             email_message = f"""
 New contact form submission received:
@@ -237,18 +250,7 @@ Message:
 
 Submitted at: {contact_submission.submitted_at}
             """
-            from_email = settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@d-ictchannels.com'
-            recipient_list = [settings.ADMIN_EMAIL] if hasattr(settings, 'ADMIN_EMAIL') else ['admin@d-ictchannels.com']
-
-            send_mail(
-                email_subject,
-                email_message,
-                from_email,
-                recipient_list,
-                fail_silently=True,
-            )
-        except Exception as e:
-            print(f"Email notification failed: {e}")
+            queue_mail(email_subject, email_message)
 
         messages.success(request, 'Your message has been sent successfully! We will get back to you soon.')
         return redirect('contact')
@@ -259,8 +261,9 @@ Submitted at: {contact_submission.submitted_at}
     }
     return render(request, 'pages/contact.html', context)
 
-def team(request):
-    team_members = TeamMember.objects.filter(is_active=True).select_related()
+@cached_page(TeamMember)
+async def team(request):
+    team_members = await _alist(TeamMember.objects.filter(is_active=True).select_related())
     newsletter_form = NewsletterForm()
     context = {
         'team_members': team_members,
@@ -268,8 +271,9 @@ def team(request):
     }
     return render(request, 'pages/team.html', context)
 
-def testimonial(request):
-    testimonials = Testimonial.objects.select_related().all()
+@cached_page(Testimonial)
+async def testimonial(request):
+    testimonials = await _alist(Testimonial.objects.select_related().all())
     newsletter_form = NewsletterForm()
     context = {
         'testimonials': testimonials,
@@ -277,6 +281,7 @@ def testimonial(request):
     }
     return render(request, 'pages/testimonial.html', context)
 
+@cached_page()
 def bank(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -310,6 +315,7 @@ def bank(request):
     }
     return render(request, 'pages/bank.html', context)
 
+@cached_page()
 def branches(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -340,6 +346,7 @@ def branches(request):
     }
     return render(request, 'pages/branches.html', context)
 
+@cached_page()
 def career(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -373,6 +380,7 @@ def career(request):
     }
     return render(request, 'pages/career.html', context)
 
+@cached_page()
 def faq(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -422,6 +430,7 @@ def faq(request):
     }
     return render(request, 'pages/faq.html', context)
 
+@cached_page()
 def software(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -429,6 +438,7 @@ def software(request):
     }
     return render(request, 'pages/software.html', context)
 
+@cached_page()
 def training(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -436,6 +446,18 @@ def training(request):
     }
     return render(request, 'pages/training.html', context)
 
+@never_cache
+def session_state(request):
+    """The per-visitor parts of the cached pages, fetched by base.html after load."""
+    user = request.user
+    return JsonResponse({
+        'authenticated': user.is_authenticated,
+        'name': (user.get_full_name() or user.username) if user.is_authenticated else '',
+        'csrf_token': get_token(request),
+        'messages': [{'text': str(m), 'tags': m.tags} for m in messages.get_messages(request)],
+    })
+
+@throttled('newsletter', email_field='subemail')
 def newsletter_signup(request):
     if request.method == 'POST':
         email = request.POST.get('subemail')
@@ -457,6 +479,7 @@ def newsletter_signup(request):
     # If not POST, redirect to home
     return redirect('home')
 
+@cached_page()
 def digital(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -464,6 +487,7 @@ def digital(request):
     }
     return render(request, 'pages/digital.html', context)
 
+@cached_page()
 def admission(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -500,15 +524,16 @@ def admission(request):
     }
     return render(request, 'pages/admission.html', context)
 
+@cached_page()
+@throttled('quote', email_field='email')
 def quote(request):
     if request.method == 'POST':
         form = QuoteForm(request.POST)
         if form.is_valid():
-            # Save quote submission to database
-            quote_submission = form.save()
+            # Save quote submission and queue the admin notification together
+            with transaction.atomic():
+                quote_submission = form.save()
 
-            # Send email notification to admin
-            try:
                 subject = f'New Quote Request from {quote_submission.name}'
                 message = f"""
 New quote request received:
@@ -523,18 +548,7 @@ Project Description:
 
 Submitted at: {quote_submission.submitted_at}
                 """
-                from_email = settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@d-ictchannels.com'
-                recipient_list = [settings.ADMIN_EMAIL] if hasattr(settings, 'ADMIN_EMAIL') else ['admin@d-ictchannels.com']
-
-                send_mail(
-                    subject,
-                    message,
-                    from_email,
-                    recipient_list,
-                    fail_silently=True,
-                )
-            except Exception as e:
-                print(f"Email notification failed: {e}")
+                queue_mail(subject, message)
 
             messages.success(request, 'Your quote request has been submitted successfully! We will get back to you soon.')
             return redirect('quote')
@@ -548,6 +562,7 @@ Submitted at: {quote_submission.submitted_at}
     }
     return render(request, 'pages/quote.html', context)
 
+@cached_page()
 def topup(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -558,6 +573,7 @@ def topup(request):
     }
     return render(request, 'pages/topup.html', context)
 
+@cached_page()
 def diploma(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -568,6 +584,7 @@ def diploma(request):
     }
     return render(request, 'pages/diploma.html', context)
 
+@cached_page()
 def certificate(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -578,6 +595,7 @@ def certificate(request):
     }
     return render(request, 'pages/certificate.html', context)
 
+@cached_page()
 def school(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -588,6 +606,7 @@ def school(request):
     }
     return render(request, 'pages/school.html', context)
 
+@cached_page()
 def siwes(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -598,6 +617,7 @@ def siwes(request):
     }
     return render(request, 'pages/siwes.html', context)
 
+@cached_page()
 def internship(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -608,6 +628,7 @@ def internship(request):
     }
     return render(request, 'pages/internship.html', context)
 
+@cached_page()
 def corporate(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -618,6 +639,7 @@ def corporate(request):
     }
     return render(request, 'pages/corporate.html', context)
 
+@cached_page()
 def customized(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -628,6 +650,7 @@ def customized(request):
     }
     return render(request, 'pages/customized.html', context)
 
+@cached_page()
 def mode(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -638,6 +661,7 @@ def mode(request):
     }
     return render(request, 'pages/mode.html', context)
 
+@cached_page()
 def fast(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -648,6 +672,7 @@ def fast(request):
     }
     return render(request, 'pages/fast.html', context)
 
+@cached_page()
 def seminar(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -658,6 +683,7 @@ def seminar(request):
     }
     return render(request, 'pages/seminar.html', context)
 
+@cached_page()
 def workshop(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -668,6 +694,7 @@ def workshop(request):
     }
     return render(request, 'pages/workshop.html', context)
 
+@cached_page()
 def scholarship(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -678,6 +705,7 @@ def scholarship(request):
     }
     return render(request, 'pages/scholarship.html', context)
 
+@cached_page()
 def exams(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -688,6 +716,7 @@ def exams(request):
     }
     return render(request, 'pages/exams.html', context)
 
+@cached_page()
 def blogs(request):
     newsletter_form = NewsletterForm()
     context = {
@@ -698,6 +727,7 @@ def blogs(request):
     }
     return render(request, 'pages/blogs.html', context)
 
+@throttled('login', email_field='un')
 def student_login(request):
     if request.method == 'POST':
         email = request.POST.get('un')  # email
@@ -711,6 +741,7 @@ def student_login(request):
             messages.success(request, f'Welcome back, {user.get_full_name() or user.username}!')
             return redirect('student_dashboard')
         else:
+            record_failure('login', email)
             messages.error(request, 'Invalid email or password.')
 
     newsletter_form = NewsletterForm()
@@ -726,82 +757,32 @@ def student_logout(request):
     return redirect('home')
 
 @login_required
-def student_dashboard(request):
-    if not isinstance(request.user, Student):
+async def student_dashboard(request):
+    user = await request.auser()
+    if not isinstance(user, Student):
         messages.error(request, 'Access denied. Student login required.')
         return redirect('student_login')
 
-    # Get student's enrollments
-    enrollments = Enrollment.objects.filter(student=request.user).select_related('course')
-    enrolled_courses = enrollments.count()
-
-    # Calculate average progress
-    if enrolled_courses > 0:
-        avg_progress = sum(e.progress_percentage for e in enrollments) // enrolled_courses
-    else:
-        avg_progress = 0
-
-    # Get pending assignments
-    pending_assignments = AssignmentSubmission.objects.filter(
-        student=request.user,
-        status__in=['pending', 'submitted']
-    ).count()
-
-    # Get certificates count
-    certificates_count = Certificate.objects.filter(student=request.user).count()
-
-    # Get recent enrollments (limit to 2 for display)
-    recent_enrollments = enrollments.order_by('-enrolled_at')[:2]
-
-    # Get recent activity (assignments and certificates)
-    recent_submissions = AssignmentSubmission.objects.filter(
-        student=request.user
-    ).select_related('assignment').order_by('-submitted_at')[:3]
-
-    recent_certificates = Certificate.objects.filter(
-        student=request.user
-    ).select_related('course').order_by('-issued_at')[:2]
-
-    # Combine and sort recent activities
-    activities = []
-    for sub in recent_submissions:
-        activities.append({
-            'type': 'assignment',
-            'title': f"Submitted: {sub.assignment.title}",
-            'date': sub.submitted_at,
-            'icon': 'fas fa-check-circle',
-            'color': 'bg-success'
-        })
-
-    for cert in recent_certificates:
-        activities.append({
-            'type': 'certificate',
-            'title': f"Earned Certificate: {cert.course.title}",
-            'date': cert.issued_at,
-            'icon': 'fas fa-certificate',
-            'color': 'bg-warning'
-        })
-
-    # Sort activities by date
-    activities.sort(key=lambda x: x['date'], reverse=True)
-    recent_activities = activities[:5]
-
-    # Get upcoming assignments (due in next 7 days)
-    from django.utils import timezone
-    from datetime import timedelta
-    upcoming_assignments = Assignment.objects.filter(
-        course__enrollments__student=request.user,
-        due_date__gte=timezone.now(),
-        due_date__lte=timezone.now() + timedelta(days=7)
-    ).distinct().order_by('due_date')[:3]
-
-    context = {
-        'enrolled_courses': enrolled_courses,
-        'avg_progress': avg_progress,
-        'pending_assignments': pending_assignments,
-        'certificates_count': certificates_count,
-        'recent_enrollments': recent_enrollments,
-        'recent_activities': recent_activities,
+    # Counters and recent lists are materialised in StudentStats; the
+    # upcoming assignments (due in next 7 days) don't depend on them
+    now = timezone.now()
+    student_stats, upcoming_assignments = await asyncio.gather(
+        aget_student_stats(user),
+        _alist(Assignment.objects.filter(
+            course__enrollments__student=user,
+            due_date__gte=now,
+            due_date__lte=now + timedelta(days=7)
+        ).distinct().order_by('due_date')[:3]),
+    )
+
+    context = {
+        'user': user,
+        'enrolled_courses': student_stats.enrolled_courses,
+        'avg_progress': student_stats.avg_progress,
+        'pending_assignments': student_stats.pending_assignments,
+        'certificates_count': student_stats.certificates_count,
+        'recent_enrollments': student_stats.recent_enrollments,
+        'recent_activities': student_stats.activity_list(),
         'upcoming_assignments': upcoming_assignments,
     }
     return render(request, 'pages/student_dashboard.html', context)
@@ -826,6 +807,7 @@ def edit_profile(request):
     }
     return render(request, 'pages/edit_profile.html', context)
 
+@throttled('register', email_field='email')
 def student_register(request):
     if request.user.is_authenticated:
         return redirect('student_dashboard')
@@ -5,6 +5,7 @@ class Service(models.Model):
     description = models.TextField()
     icon = models.CharField(max_length=50, default='fab fa-android')  # FontAwesome icon class
     page = models.CharField(max_length=100, blank=True, null=True)  # URL name for the service link
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -53,11 +53,16 @@
     });
 
 
-    // Facts counter
-    $('[data-toggle="counter-up"]').counterUp({
-        delay: 10,
-        time: 2000
-    });
+    // Facts counter (counterup is only bundled on pages that declare it)
+    var $counters = $('[data-toggle="counter-up"]');
+    if ($.fn.counterUp) {
+        $counters.counterUp({
+            delay: 10,
+            time: 2000
+        });
+    } else if ($counters.length) {
+        console.warn('counter-up markup without the counterup module; add {% block vendor_js %}counterup{% endblock %}');
+    }
     
     
     // Back to top button
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:46
+
+import dictchannel.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testimonials', '0002_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='testimonial',
+            name='image',
+            field=models.ImageField(storage=dictchannel.storage.blob_storage, upload_to='testimonials/'),
+        ),
+    ]
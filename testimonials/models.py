@@ -1,9 +1,12 @@
 from django.db import models
 
+from dictchannel.storage import blob_storage
+
 class Testimonial(models.Model):
     name = models.CharField(max_length=100)
     profession = models.CharField(max_length=100)
-    image = models.ImageField(upload_to='testimonials/')
+    image = models.ImageField(upload_to='testimonials/', storage=blob_storage)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     text = models.TextField()
 
     def __str__(self):